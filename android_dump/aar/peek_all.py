@@ -16,13 +16,20 @@ Poznámka: JVM deskriptory tisknu surově. Je to přesné a nezávislé.
 import sys
 import os
 import io
+import json
 import zipfile
 import hashlib
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import struct
 from glob import glob
 
+# sdílené moduly (dump_common/) leží v kořeni repozitáře
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common.output import check_compression, compressed_name, open_text_output
+
 # =========================
 # CONFIG  nastavení v kódu
 # =========================
@@ -48,6 +55,20 @@ PRINT_SYMBOL_SEARCH: bool = True
 PRINT_PUBLIC_API: bool = True
 PRINT_FULL_DETAIL: bool = True
 
+# f) formát výstupu: "txt" nebo "jsonl" (NDJSON: záznam aar, entry, jar_entry,
+#    class pro každou třídu hned po rozparsování, package na konci)
+OUTPUT_FORMAT: str = "txt"
+
+# g) komprese výstupu: None, "gzip", "xz" nebo "zstd" (vyžaduje balíček zstandard);
+#    zapisuje se rovnou komprimovaně a k názvu se přidá .gz/.xz/.zst.
+#    COMPRESSION_THREADS > 1 = jako pigz: bloky po COMPRESSION_BLOCK_BYTES se
+#    komprimují samostatně ve vláknech (samostatné gzip členy / xz streamy),
+#    zstd má vlastní vlákna. 0 = počet jader.
+OUTPUT_COMPRESSION: Optional[str] = None
+COMPRESSION_LEVEL: Optional[int] = None
+COMPRESSION_THREADS: int = 0
+COMPRESSION_BLOCK_BYTES: int = 1 << 20
+
 # -------------------------
 # Utility
 # -------------------------
@@ -72,6 +93,11 @@ def sha256_md5(path: str) -> tuple[str, str]:
             h2.update(chunk)
     return h1.hexdigest(), h2.hexdigest()
 
+def open_output(path: str):
+    """Textový proud do path, podle OUTPUT_COMPRESSION rovnou komprimovaný."""
+    return open_text_output(path, OUTPUT_COMPRESSION, COMPRESSION_LEVEL,
+                            COMPRESSION_THREADS, COMPRESSION_BLOCK_BYTES)
+
 # -------------------------
 # ClassFile parser
 # -------------------------
@@ -264,8 +290,28 @@ class ClassFile:
 # -------------------------
 # AAR zpracování
 # -------------------------
+def class_info(cf: ClassFile) -> Dict[str, Any]:
+    return {
+        "flags": cf.access_flags,
+        "flags_str": flags_to_str("class", cf.access_flags),
+        "super": cf.super_name(),
+        "ifaces": cf.interface_names(),
+        "fields": [{
+            "flags": f["flags"],
+            "flags_str": flags_to_str("field", f["flags"]),
+            "name": f["name"],
+            "desc": f["desc"],
+        } for f in cf.fields],
+        "methods": [{
+            "flags": m["flags"],
+            "flags_str": flags_to_str("method", m["flags"]),
+            "name": m["name"],
+            "desc": m["desc"],
+        } for m in cf.methods],
+    }
+
 def dump_aar(aar_path: str, out_path: str) -> None:
-    with open(out_path, "w", encoding="utf-8") as out:
+    with open_output(out_path) as out:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         out.write(f"== AAR DUMP ==\n")
         out.write(f"Soubor: {aar_path}\n")
@@ -307,25 +353,7 @@ def dump_aar(aar_path: str, out_path: str) -> None:
                     except Exception as e:
                         out.write(f"[CHYBA] {ce}: {e}\n")
                         continue
-                    cls_name = cf.fqcn()
-                    api[cls_name] = {
-                        "flags": cf.access_flags,
-                        "flags_str": flags_to_str("class", cf.access_flags),
-                        "super": cf.super_name(),
-                        "ifaces": cf.interface_names(),
-                        "fields": [{
-                            "flags": f["flags"],
-                            "flags_str": flags_to_str("field", f["flags"]),
-                            "name": f["name"],
-                            "desc": f["desc"],
-                        } for f in cf.fields],
-                        "methods": [{
-                            "flags": m["flags"],
-                            "flags_str": flags_to_str("method", m["flags"]),
-                            "name": m["name"],
-                            "desc": m["desc"],
-                        } for m in cf.methods],
-                    }
+                    api[cf.fqcn()] = class_info(cf)
 
                 packages: Dict[str, int] = {}
                 for cls in api.keys():
@@ -390,6 +418,47 @@ def dump_aar(aar_path: str, out_path: str) -> None:
                                 out.write(f"    {m['flags_str']:>20}  {m['name']}{m['desc']}\n")
                         out.write("\n")
 
+def dump_aar_jsonl(aar_path: str, out_path: str) -> None:
+    """Stejná data jako dump_aar, jeden JSON záznam na řádek; třídy se nedrží v paměti."""
+    with open_output(out_path) as out:
+        def emit(record: Dict[str, Any]) -> None:
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+
+        sha256, md5 = sha256_md5(aar_path)
+        emit({"type": "aar", "path": aar_path, "size": os.path.getsize(aar_path),
+              "sha256": sha256, "md5": md5, "generated": datetime.now().isoformat(timespec="seconds")})
+
+        with zipfile.ZipFile(aar_path, "r") as z:
+            for zi in z.infolist():
+                emit({"type": "entry", "name": zi.filename, "size": zi.file_size,
+                      "compressed": zi.compress_size, "stored": zi.compress_type == 0})
+            if "classes.jar" not in z.namelist():
+                emit({"type": "error", "message": "classes.jar nenalezen v AAR"})
+                return
+
+            jar_bytes = z.read("classes.jar")
+            with zipfile.ZipFile(io.BytesIO(jar_bytes), "r") as j:
+                packages: Dict[str, int] = {}
+                for zi in j.infolist():
+                    if PRINT_CLASSES_JAR_LIST:
+                        emit({"type": "jar_entry", "name": zi.filename, "size": zi.file_size,
+                              "compressed": zi.compress_size, "stored": zi.compress_type == 0})
+                    if not zi.filename.endswith(".class"):
+                        continue
+                    try:
+                        cf = ClassFile(j.read(zi))
+                    except Exception as e:
+                        emit({"type": "error", "entry": zi.filename, "message": str(e)})
+                        continue
+                    cls_name = cf.fqcn()
+                    pkg = ".".join(cls_name.split(".")[:-1])
+                    packages[pkg] = packages.get(pkg, 0) + 1
+                    emit({"type": "class", "name": cls_name, "entry": zi.filename, **class_info(cf)})
+
+                for pkg, count in sorted(packages.items(), key=lambda x: (-x[1], x[0])):
+                    emit({"type": "package", "name": pkg, "classes": count})
+
 def resolve_input_paths() -> List[str]:
     # 1) pokud jsou v CONFIG explicitní cesty, použij je
     if AAR_PATHS:
@@ -407,12 +476,21 @@ def main():
         print("Nebyl nalezen žádný AAR. Nastav AAR_PATHS v CONFIG nebo vlož soubory podle AAR_GLOB.")
         sys.exit(1)
 
+    if OUTPUT_FORMAT not in ("txt", "jsonl"):
+        print(f"Neznámý OUTPUT_FORMAT {OUTPUT_FORMAT!r} (txt nebo jsonl).")
+        sys.exit(1)
+    check_compression(OUTPUT_COMPRESSION)
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     for aar_path in paths:
         base = os.path.basename(aar_path)
         name, _ = os.path.splitext(base)
-        out_path = os.path.join(OUTPUT_DIR, f"{OUTPUT_PREFIX}{name}.txt")
-        dump_aar(aar_path, out_path)
+        out_path = os.path.join(OUTPUT_DIR, compressed_name(f"{OUTPUT_PREFIX}{name}.{OUTPUT_FORMAT}",
+                                                            OUTPUT_COMPRESSION))
+        if OUTPUT_FORMAT == "jsonl":
+            dump_aar_jsonl(aar_path, out_path)
+        else:
+            dump_aar(aar_path, out_path)
         print(f"Hotovo  uloženo do  {os.path.abspath(out_path)}")
 
 if __name__ == "__main__":
@@ -6,11 +6,24 @@ Uprav makra níže a spusť
 """
 
 from __future__ import annotations
+import hashlib
+import json
 import os
 from pathlib import Path
 from datetime import datetime
-import string
+import sys
+from functools import lru_cache
 import binascii
+from typing import NamedTuple
+
+# sdílené moduly (dump_common/) leží v kořeni repozitáře
+_REPO_DIR = str(Path(__file__).resolve().parent.parent)
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common import sniff
+from dump_common.sniff import sniff_magic
+from dump_common.output import COMPRESSION_SUFFIXES, check_compression, compressed_name, open_text_output
+from dump_common.output import open_binary_output as _open_binary_output
 
 # =========================
 # KONFIGURACE
@@ -26,6 +39,7 @@ TARGET_SUBDIR = "Kniha_20"
 AUTO_TIMESTAMP = False   # casove razitko v názvu
 OUTPUT_BASENAME = "dump"
 OUTPUT_DIR = BASE_DIR
+OUTPUT_BUFFER_BYTES = 1 << 20  # výstup se zapisuje průběžně přes tento buffer
 
 # Filtry
 EXCLUDE_DIRS = {
@@ -42,6 +56,31 @@ EXCLUDE_EXTS = {
     ".mp4", ".mov", ".avi", ".mp3", ".wav", ".ogg"
 }
 
+# Autodetekce typu projektu po podstromech: podle levných značek v kořeni
+# podstromu (ProjectVersion.txt, settings.gradle, *.sln, package.json) se přidají
+# výjimky daného profilu; platí pro celý podstrom a sčítají se s nadřazenými,
+# takže Unity projekt vnořený v Android repu přeskočí i svoje Library/.
+# Jména složek se porovnávají bez ohledu na velikost písmen (Obj/obj, Build/build).
+AUTO_PROFILES = True
+PROJECT_PROFILES = {
+    "unity": {
+        "dirs": {"Library", "Temp", "Obj", "Logs", "UserSettings", "Build", "Builds", "MemoryCaptures"},
+        "exts": {".meta", ".dll", ".pdb"},
+    },
+    "gradle": {
+        "dirs": {"build", ".gradle", ".cxx", ".externalNativeBuild", ".kotlin"},
+        "exts": set(),
+    },
+    "dotnet": {
+        "dirs": {"bin", "obj", ".vs", "packages", "TestResults"},
+        "exts": {".dll", ".pdb", ".exe", ".nupkg"},
+    },
+    "node": {
+        "dirs": {"node_modules", "dist", ".next", ".cache", "coverage"},
+        "exts": {".map"},
+    },
+}
+
 # Obsah souborů
 INCLUDE_FILE_CONTENTS = True
 CONTENT_MAX_BYTES = 200_000
@@ -51,6 +90,15 @@ TEXT_MIN_PRINTABLE_RATIO = 0.85
 INCLUDE_BINARY_PREVIEW = True
 BINARY_PREVIEW_BYTES = 1024
 SHOW_LINE_NUMBERS = False
+SNIFF_MAGIC = True  # známé binárky (PNG, ZIP, DEX…) jen metadata, bez náhledu
+# Shodný obsah (stejné SHA-256) se vypíše jen jednou, další kopie jsou
+# jednořádkový odkaz na první cestu. Porovnávají se jen textové soubory do
+# CONTENT_MAX_BYTES (hashuje se už načtený obsah, nic se nečte navíc);
+# soubory menší než DEDUP_MIN_BYTES se vypisují vždy celé. Pamatuje se
+# nejvýš DEDUP_MAX_FILES souborů, paměť tak nezávisí na velikosti projektu.
+DEDUP_CONTENTS = True
+DEDUP_MIN_BYTES = 128
+DEDUP_MAX_FILES = 20_000
 
 # Výpis
 INCLUDE_FILE_SIZE = True
@@ -62,6 +110,30 @@ MAX_DEPTH = None  # None bez limitu
 # Strom na začátku
 TREE_ASCII_ONLY = False  # True pokud chceš ASCII místo Unicode větví
 
+# Formát výstupu: "txt" (čitelný dump) nebo "jsonl" (jeden JSON záznam na řádek:
+# dump / dir / project / file / summary, zapisuje se průběžně)
+OUTPUT_FORMAT = "txt"
+
+# Komprese výstupu: None (čistý text), "gzip", "xz" nebo "zstd" (vyžaduje balíček
+# zstandard). K názvu se přidá .gz/.xz/.zst a zapisuje se rovnou komprimovaně,
+# bez dočasného nekomprimovaného souboru.
+# COMPRESSION_THREADS > 1 = jako pigz: výstup se dělí na bloky po
+# COMPRESSION_BLOCK_BYTES, každý se komprimuje samostatně ve vlákně a zapíše jako
+# samostatný gzip člen / xz stream (rozbalí je běžný gunzip / xz -d);
+# zstd používá vlastní vlákna knihovny. 0 = počet jader.
+OUTPUT_COMPRESSION = None
+COMPRESSION_LEVEL = None  # None = výchozí úroveň kodeku
+COMPRESSION_THREADS = 0
+COMPRESSION_BLOCK_BYTES = 1 << 20
+
+# Shardy (jen OUTPUT_FORMAT "txt"): při překročení SHARD_MAX_BYTES bajtů nebo
+# SHARD_MAX_LINES řádků pokračuje výstup do dalšího souboru dump_…_0001.txt,
+# _0002.txt… Blok souboru (hlavička + obsah) se nerozdělí, pokud se vejde do
+# prázdného shardu. Vedle vznikne …index.json: cesta -> shard, bajtový offset
+# a řádek (u komprese offset v rozbaleném shardu). None = jeden soubor.
+SHARD_MAX_BYTES = None
+SHARD_MAX_LINES = None
+
 # =========================
 # KONEC KONFIGURACE
 # =========================
@@ -77,76 +149,388 @@ def human_size(n: int) -> str:
     return f"{n} B"
 
 
-def format_mtime(path: Path) -> str:
+def format_mtime(ts: float | None) -> str:
+    if ts is None:
+        return "n/a"
     try:
-        ts = path.stat().st_mtime
         return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
     except Exception:
         return "n/a"
 
 
-def should_skip_dir(name: str) -> bool:
+class FileRecord(NamedTuple):
+    """Jeden soubor = jeden stat (z DirEntry); size/mtime None, pokud stat selhal."""
+    path: Path
+    size: int | None
+    mtime: float | None
+
+
+def file_record(entry: os.DirEntry) -> FileRecord:
+    try:
+        st = entry.stat()
+    except OSError:
+        return FileRecord(Path(entry.path), None, None)
+    return FileRecord(Path(entry.path), st.st_size, st.st_mtime)
+
+
+NO_PROFILES: frozenset[str] = frozenset()
+
+
+def detect_project_types(top: Path, names: set[str]) -> set[str]:
+    """Typy projektu s kořenem v top; names jsou jména z už načteného scandir."""
+    kinds = set()
+    if "ProjectSettings" in names and (top / "ProjectSettings" / "ProjectVersion.txt").is_file():
+        kinds.add("unity")
+    if "settings.gradle" in names or "settings.gradle.kts" in names:
+        kinds.add("gradle")
+    if any(n.endswith((".sln", ".csproj")) for n in names):
+        kinds.add("dotnet")
+    if "package.json" in names:
+        kinds.add("node")
+    return kinds
+
+
+def subtree_profiles(top: Path, entries: list[os.DirEntry],
+                     inherited: frozenset[str]) -> tuple[frozenset[str], frozenset[str]]:
+    """(profily platné pro podstrom top, nově detekované právě v top)."""
+    if not AUTO_PROFILES:
+        return inherited, NO_PROFILES
+    found = detect_project_types(top, {e.name for e in entries})
+    if found <= inherited:
+        return inherited, NO_PROFILES
+    return inherited | found, frozenset(found - inherited)
+
+
+@lru_cache(maxsize=None)
+def profile_excludes(kinds: frozenset[str]) -> tuple[frozenset[str], frozenset[str]]:
+    """Sjednocené (složky casefold, přípony lower) k vynechání pro danou sadu profilů."""
+    dirs, exts = set(EXCLUDE_DIRS), set(EXCLUDE_EXTS)
+    for kind in kinds:
+        dirs |= PROJECT_PROFILES[kind]["dirs"]
+        exts |= PROJECT_PROFILES[kind]["exts"]
+    return frozenset(d.casefold() for d in dirs), frozenset(e.lower() for e in exts)
+
+
+def should_skip_dir(name: str, kinds: frozenset[str] = NO_PROFILES) -> bool:
     if not INCLUDE_HIDDEN and name.startswith("."):
         return True
-    return name in EXCLUDE_DIRS
+    return name.casefold() in profile_excludes(kinds)[0]
 
 
-def should_skip_file(p: Path) -> bool:
+def should_skip_file(p: Path, kinds: frozenset[str] = NO_PROFILES) -> bool:
     if not INCLUDE_HIDDEN and p.name.startswith("."):
         return True
     if p.name in EXCLUDE_FILE_NAMES:
         return True
-    if p.suffix.lower() in EXCLUDE_EXTS:
+    if p.suffix.lower() in profile_excludes(kinds)[1]:
         return True
     return False
 
 
-def make_output_name(target_dir: Path) -> Path:
+def output_stem(target_dir: Path) -> str:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S") if AUTO_TIMESTAMP else ""
     middle = f"{target_dir.name}"
     parts = [OUTPUT_BASENAME, middle, ts]
-    name = "_".join([x for x in parts if x]) + ".txt"
-    return OUTPUT_DIR / name
+    return "_".join([x for x in parts if x])
 
 
-def is_probably_text(first_bytes: bytes) -> bool:
-    if b"\x00" in first_bytes:
-        return False
-    if not first_bytes:
-        return True
-    printable = set(bytes(string.printable, "ascii"))
-    kept = sum(b in printable for b in first_bytes)
-    ratio = kept / max(1, len(first_bytes))
-    return ratio >= TEXT_MIN_PRINTABLE_RATIO
+def output_ext() -> str:
+    ext = ".jsonl" if OUTPUT_FORMAT == "jsonl" else ".txt"
+    return compressed_name(ext, OUTPUT_COMPRESSION)
+
+
+def make_output_name(target_dir: Path) -> Path:
+    return OUTPUT_DIR / (output_stem(target_dir) + output_ext())
+
+
+# Výstupy dumpu v OUTPUT_DIR (nastaví dump_tree): (složka, prefix jména, přípony).
+# Když OUTPUT_DIR leží uvnitř cílové složky, průchod je vynechá, aby se právě
+# zapisovaný dump, jeho shardy ani starší dumpy téhož projektu nevypsaly samy do sebe.
+_OUTPUT_FILES: tuple[str, str, tuple[str, ...]] | None = None
+
 
+def set_output_files(target_dir: Path) -> None:
+    global _OUTPUT_FILES
+    prefix = "_".join(x for x in (OUTPUT_BASENAME, target_dir.name) if x)
+    exts = tuple(base + comp for base in (".txt", ".jsonl")
+                 for comp in ("", *COMPRESSION_SUFFIXES.values())) + (".index.json",)
+    _OUTPUT_FILES = (os.path.normcase(str(Path(OUTPUT_DIR).resolve())), prefix, exts)
 
-def read_text_preview(path: Path, limit: int) -> str:
-    data = path.read_bytes()[:limit]
-    return data.decode(CONTENT_ENCODING, errors="replace")
 
+def is_output_dir(folder: Path) -> bool:
+    return _OUTPUT_FILES is not None and os.path.normcase(str(folder)) == _OUTPUT_FILES[0]
 
-def read_binary_preview(path: Path, limit: int) -> str:
-    data = path.read_bytes()[:limit]
+
+def is_output_file(name: str) -> bool:
+    """Jméno vlastního výstupu; volat jen pro soubory přímo v OUTPUT_DIR (is_output_dir)."""
+    _out_dir, prefix, exts = _OUTPUT_FILES
+    return name.startswith(prefix) and name.endswith(exts)
+
+
+def is_probably_text(first_bytes: bytes) -> bool:
+    # stejné pravidlo jako visual_studio_dump (bajty >= 0x80 se počítají jako text)
+    return sniff.is_probably_text(first_bytes, TEXT_MIN_PRINTABLE_RATIO)
+
+
+def read_preview(path: Path, size: int | None, max_bytes: int) -> tuple[str | None, bool, bytes]:
+    """
+    Jedno otevření souboru: prvních TEXT_DETECT_BYTES slouží k detekci textu
+    a zároveň jako začátek obsahu; dočte se jen zbytek do limitu náhledu.
+    Vrací (známý binární formát | None, je_text, bajty náhledu); u známého
+    formátu se nic dalšího nečte.
+    """
+    with path.open("rb") as f:
+        head = f.read(TEXT_DETECT_BYTES)
+        magic = sniff_magic(head, size) if SNIFF_MAGIC else None
+        if magic is not None:
+            return magic, False, b""
+        is_text = is_probably_text(head)
+        if is_text:
+            limit = min(max_bytes, size or max_bytes)
+        else:
+            limit = BINARY_PREVIEW_BYTES if INCLUDE_BINARY_PREVIEW else 0
+        if limit <= len(head):
+            return None, is_text, head[:limit]
+        return None, is_text, head + f.read(limit - len(head))
+
+
+class ContentDedup:
+    """
+    Hledá textové soubory se stejným obsahem jako některý dřívější. Hashuje
+    celý obsah, který už načetl read_preview (soubor do limitu obsahu), takže
+    nic nečte navíc. Po max_files zapamatovaných souborech si nové nepřidává,
+    dřívější kopie se ale hledají dál.
+    """
+
+    def __init__(self, min_bytes: int, max_files: int) -> None:
+        self.min_bytes = min_bytes
+        self.max_files = max_files
+        self.first: dict[bytes, str] = {}  # SHA-256 -> popisek prvního souboru
+
+    def first_copy(self, data: bytes, label: str) -> str | None:
+        """Popisek dřívějšího souboru se stejným obsahem, jinak None (a soubor si zapamatuje)."""
+        if len(data) < self.min_bytes:
+            return None
+        digest = hashlib.sha256(data).digest()
+        original = self.first.get(digest)
+        if original is None and len(self.first) < self.max_files:
+            self.first[digest] = label
+        return original
+
+    def check(self, size: int | None, max_bytes: int, is_text: bool, data: bytes, label: str | None) -> str | None:
+        """first_copy jen pro text načtený celý (do max_bytes); jinak None."""
+        if label is None or not is_text or size is None or size > max_bytes or len(data) != size:
+            return None
+        return self.first_copy(data, label)
+
+
+def new_dedup() -> ContentDedup | None:
+    return ContentDedup(DEDUP_MIN_BYTES, DEDUP_MAX_FILES) if DEDUP_CONTENTS and INCLUDE_FILE_CONTENTS else None
+
+
+def format_hex_preview(data: bytes) -> str:
     hexstr = binascii.hexlify(data).decode("ascii")
     grouped = " ".join(hexstr[i:i+2] for i in range(0, len(hexstr), 2))
     return grouped
 
 
-def write_file_content_lines(lines: list[str], path: Path, max_bytes: int) -> None:
-    try:
-        size = path.stat().st_size
-    except Exception:
-        size = None
+class LineWriter:
+    """
+    Proudový zápis řádků přímo do souboru místo hromadění v list[str].
+    Má stejné append/extend jako seznam, výsledek je shodný s "\n".join(lines),
+    a paměť je konstantní bez ohledu na velikost projektu.
+    """
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def append(self, line: str) -> None:
+        if self.count:
+            self.stream.write("\n")
+        self.stream.write(line)
+        self.count += 1
+
+    def extend(self, lines) -> None:
+        for line in lines:
+            self.append(line)
+
+    # hranice bloku souboru; důležité jen pro ShardWriter
+    def begin_block(self, path: str) -> None:
+        pass
+
+    def end_block(self) -> None:
+        pass
+
+
+class ShardWriter:
+    """
+    Stejné rozhraní jako LineWriter, ale výstup dělí do {stem}_0001{ext},
+    {stem}_0002{ext}… podle max_bytes / max_lines. Řádky mezi begin_block a
+    end_block se drží v paměti (nejvýš jeden soubor do CONTENT_MAX_BYTES) a
+    zapíšou se celé do jednoho shardu; přes hranici jdou jen, když jsou větší
+    než celý shard. Každý řádek končí "\n", offsety v indexu jsou v bajtech.
+    """
+
+    def __init__(self, out_dir: Path, stem: str, ext: str,
+                 max_bytes: int | None, max_lines: int | None) -> None:
+        self.out_dir = out_dir
+        self.stem = stem
+        self.ext = ext
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.count = 0
+        self.shards: list[dict] = []
+        self.files: dict[str, dict] = {}
+        self.block: tuple[str, list[bytes]] | None = None
+        self.stream = None
+        self._next_shard()
+
+    def _next_shard(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+        name = f"{self.stem}_{len(self.shards) + 1:04d}{self.ext}"
+        self.stream = open_binary_output(self.out_dir / name)
+        self.shards.append({"file": name, "bytes": 0, "lines": 0})
+
+    def _fits(self, nbytes: int, nlines: int) -> bool:
+        cur = self.shards[-1]
+        return ((self.max_bytes is None or cur["bytes"] + nbytes <= self.max_bytes)
+                and (self.max_lines is None or cur["lines"] + nlines <= self.max_lines))
+
+    def _write(self, data: bytes) -> None:
+        if self.shards[-1]["lines"] and not self._fits(len(data), 1):
+            self._next_shard()
+        cur = self.shards[-1]
+        self.stream.write(data)
+        cur["bytes"] += len(data)
+        cur["lines"] += 1
+
+    def append(self, line: str) -> None:
+        data = (line + "\n").encode("utf-8")
+        if self.block is not None:
+            self.block[1].append(data)
+        else:
+            self._write(data)
+        self.count += 1
 
+    def extend(self, lines) -> None:
+        for line in lines:
+            self.append(line)
+
+    def begin_block(self, path: str) -> None:
+        self.end_block()
+        self.block = (path, [])
+
+    def end_block(self) -> None:
+        if self.block is None:
+            return
+        path, chunks = self.block
+        self.block = None
+        nbytes = sum(map(len, chunks))
+        if self.shards[-1]["lines"] and not self._fits(nbytes, len(chunks)):
+            self._next_shard()
+        first = len(self.shards)
+        cur = self.shards[-1]
+        entry = {"shard": cur["file"], "offset": cur["bytes"], "line": cur["lines"] + 1, "bytes": nbytes}
+        for data in chunks:
+            self._write(data)
+        if len(self.shards) > first:
+            entry["continues_in"] = [s["file"] for s in self.shards[first:]]
+        self.files[path] = entry
+
+    def close(self, index_path: Path, root: Path) -> None:
+        self.end_block()
+        self.stream.close()
+        # shardy navíc z delšího předchozího běhu by mátly konzumenty
+        n = len(self.shards) + 1
+        while (self.out_dir / f"{self.stem}_{n:04d}{self.ext}").is_file():
+            (self.out_dir / f"{self.stem}_{n:04d}{self.ext}").unlink()
+            n += 1
+        index = {
+            "root": str(root),
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "max_bytes": self.max_bytes,
+            "max_lines": self.max_lines,
+            "shards": self.shards,
+            "files": self.files,
+        }
+        index_path.write_text(json.dumps(index, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def open_output(path: Path):
+    """Textový proud do `path`; podle OUTPUT_COMPRESSION rovnou komprimovaný."""
+    return open_text_output(path, OUTPUT_COMPRESSION, COMPRESSION_LEVEL, COMPRESSION_THREADS,
+                            COMPRESSION_BLOCK_BYTES, OUTPUT_BUFFER_BYTES)
+
+
+def open_binary_output(path: Path):
+    """Binární proud do `path`; podle OUTPUT_COMPRESSION rovnou komprimovaný."""
+    return _open_binary_output(path, OUTPUT_COMPRESSION, COMPRESSION_LEVEL, COMPRESSION_THREADS,
+                               COMPRESSION_BLOCK_BYTES, OUTPUT_BUFFER_BYTES)
+
+
+class JsonlWriter:
+    """Proudový zápis NDJSON: každý záznam je jeden řádek, nic se nedrží v paměti."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def emit(self, record: dict) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False))
+        self.stream.write("\n")
+        self.count += 1
+
+
+def file_content_fields(rec: FileRecord, max_bytes: int, dedup: ContentDedup | None = None,
+                        label: str | None = None) -> dict:
+    """Obsah souboru jako pole JSON záznamu; stejná pravidla jako write_file_content_lines."""
+    size = rec.size
+    try:
+        magic, is_text, data = read_preview(rec.path, size, max_bytes)
+    except Exception as e:
+        return {"error": f"nelze číst: {e}"}
+
+    if magic is not None:
+        return {"kind": "binary", "format": magic}
+    original = dedup and dedup.check(size, max_bytes, is_text, data, label)
+    if original:
+        return {"duplicate_of": original}
+    if is_text:
+        try:
+            text = data.decode(CONTENT_ENCODING, errors="replace")
+        except Exception as e:
+            return {"kind": "text", "error": f"nelze dekódovat: {e}"}
+        return {"kind": "text", "content": text,
+                "truncated": size is not None and size > max_bytes}
+    if not INCLUDE_BINARY_PREVIEW:
+        return {"kind": "binary"}
+    return {"kind": "binary", "hex": format_hex_preview(data),
+            "truncated": size is not None and size > BINARY_PREVIEW_BYTES}
+
+
+def write_file_content_lines(lines: LineWriter, rec: FileRecord, max_bytes: int,
+                             dedup: ContentDedup | None = None, label: str | None = None) -> None:
+    size = rec.size
     try:
-        head = path.read_bytes()[:TEXT_DETECT_BYTES]
+        magic, is_text, data = read_preview(rec.path, size, max_bytes)
     except Exception as e:
         lines.append(f"    [OBSAH] nelze číst  chyba {e}")
         return
 
-    if is_probably_text(head):
+    if magic is not None:
+        lines.append(f"    [BINÁRNÍ SOUBOR: {magic}] obsah vynechán")
+        return
+
+    original = dedup and dedup.check(size, max_bytes, is_text, data, label)
+    if original:
+        lines.append(f"    [DUPLIKÁT] obsah shodný s {original}")
+        return
+
+    if is_text:
         try:
-            text = read_text_preview(path, min(max_bytes, size or max_bytes))
+            text = data.decode(CONTENT_ENCODING, errors="replace")
         except Exception as e:
             lines.append(f"    [OBSAH] nelze dekódovat  chyba {e}")
             return
@@ -165,11 +549,7 @@ def write_file_content_lines(lines: list[str], path: Path, max_bytes: int) -> No
         if not INCLUDE_BINARY_PREVIEW:
             lines.append("    [BINÁRNÍ SOUBOR] náhled vypnut")
             return
-        try:
-            hexpreview = read_binary_preview(path, BINARY_PREVIEW_BYTES)
-        except Exception as e:
-            lines.append(f"    [BINÁRNÍ SOUBOR] náhled nelze číst  chyba {e}")
-            return
+        hexpreview = format_hex_preview(data)
         lines.append("    === BINÁRNÍ NÁHLED HEX ===")
         lines.append(f"    {hexpreview}")
         if size is not None and size > BINARY_PREVIEW_BYTES:
@@ -184,9 +564,8 @@ def _tree_connectors():
         return ("├── ", "│   ", "    "), "└── "
 
 
-def build_hierarchy_lines(root: Path) -> list[str]:
-    """Vrátí strom adresářů a souborů od root se stejnými filtry."""
-    lines: list[str] = []
+def write_hierarchy_lines(lines: LineWriter, root: Path) -> None:
+    """Zapíše strom adresářů a souborů od root se stejnými filtry."""
     root_label = "." if RELATIVE_PATHS else str(root)
     lines.append(root_label)
 
@@ -197,16 +576,21 @@ def build_hierarchy_lines(root: Path) -> list[str]:
         branch, pipe, space = "├── ", "│   ", "    "
         last_branch = "└── "
 
-    def recurse(cur: Path, prefix: str, depth: int):
+    def recurse(cur: Path, prefix: str, depth: int, kinds: frozenset[str]):
+        # scandir: typ položky je v DirEntry, takže is_dir/is_file nestojí další stat
         try:
-            entries = list(cur.iterdir())
+            with os.scandir(cur) as it:
+                entries = list(it)
         except Exception:
             return
+        kinds, _ = subtree_profiles(cur, entries, kinds)
 
-        dirs = [e for e in entries if e.is_dir() and not should_skip_dir(e.name)]
+        dirs = [Path(e.path) for e in entries if e.is_dir() and not should_skip_dir(e.name, kinds)]
         dirs.sort(key=lambda p: p.name.lower())
 
-        files = [e for e in entries if e.is_file() and not should_skip_file(e)]
+        files = [Path(e.path) for e in entries if e.is_file() and not should_skip_file(Path(e.name), kinds)]
+        if is_output_dir(cur):
+            files = [p for p in files if not is_output_file(p.name)]
         files.sort(key=lambda p: p.name.lower())
 
         children = dirs + files
@@ -215,67 +599,116 @@ def build_hierarchy_lines(root: Path) -> list[str]:
             connector = last_branch if is_last else branch
             lines.append(prefix + connector + child.name)
 
-            if child.is_dir():
+            if idx < len(dirs):
                 if MAX_DEPTH is None or depth + 1 <= MAX_DEPTH:
                     new_prefix = prefix + (space if is_last else pipe)
-                    recurse(child, new_prefix, depth + 1)
+                    recurse(child, new_prefix, depth + 1, kinds)
+
+    recurse(root, "", 0, NO_PROFILES)
+
 
-    recurse(root, "", 0)
-    return lines
+def iter_dirs(top: Path, depth: int = 0, kinds: frozenset[str] = NO_PROFILES):
+    """
+    Jako os.walk(top) shora dolů se seřazenými jmény, ale vrací
+    (složka, [DirEntry nevynechaných souborů], nově detekované typy projektu).
+    DirEntry si pamatuje typ i stat, takže na soubor připadá jediný stat.
+    """
+    try:
+        with os.scandir(top) as it:
+            entries = list(it)
+    except OSError:
+        return
+    kinds, found = subtree_profiles(top, entries, kinds)
+    dirs, files = [], []
+    for e in entries:
+        try:
+            is_dir = e.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            dirs.append(e)
+        elif not should_skip_file(Path(e.name), kinds):
+            files.append(e)
+    if is_output_dir(top):
+        files = [e for e in files if not is_output_file(e.name)]
+    files.sort(key=lambda e: e.name.lower())
+    yield top, files, found
+
+    if MAX_DEPTH is not None and depth + 1 > MAX_DEPTH:
+        return
+    dirs = [d for d in dirs if not should_skip_dir(d.name, kinds) and not d.is_symlink()]
+    dirs.sort(key=lambda e: e.name.lower())
+    for d in dirs:
+        yield from iter_dirs(Path(d.path), depth + 1, kinds)
 
 
 def dump_tree(target_dir: Path) -> Path:
     if not target_dir.exists():
         raise FileNotFoundError(f"Cesta neexistuje  {target_dir}")
 
+    if OUTPUT_FORMAT not in ("txt", "jsonl"):
+        raise ValueError(f"Neznámý OUTPUT_FORMAT {OUTPUT_FORMAT!r} (txt nebo jsonl)")
+    check_compression(OUTPUT_COMPRESSION)
+    set_output_files(target_dir)
+
+    if SHARD_MAX_BYTES is not None or SHARD_MAX_LINES is not None:
+        if OUTPUT_FORMAT != "txt":
+            raise ValueError("Shardy (SHARD_MAX_BYTES / SHARD_MAX_LINES) jsou jen pro OUTPUT_FORMAT txt")
+        stem = output_stem(target_dir)
+        index_path = OUTPUT_DIR / f"{stem}.index.json"
+        shards = ShardWriter(OUTPUT_DIR, stem, output_ext(), SHARD_MAX_BYTES, SHARD_MAX_LINES)
+        try:
+            write_dump(shards, target_dir)
+        finally:
+            shards.close(index_path, target_dir)
+        return index_path
+
     out_path = make_output_name(target_dir)
-    lines: list[str] = []
+    with open_output(out_path) as stream:
+        if OUTPUT_FORMAT == "jsonl":
+            write_dump_jsonl(JsonlWriter(stream), target_dir)
+        else:
+            write_dump(LineWriter(stream), target_dir)
+    return out_path
 
+
+def write_dump(lines: LineWriter, target_dir: Path) -> None:
     # Hierarchie na začátku
     lines.append("===== HIERARCHIE =====")
-    lines.extend(build_hierarchy_lines(target_dir))
+    write_hierarchy_lines(lines, target_dir)
     lines.append("")
 
     total_files = 0
     total_dirs = 0
+    projects = []
+    dedup = new_dedup()
 
-    for current_root, dirnames, filenames in os.walk(target_dir):
-        rel = Path(current_root).relative_to(target_dir)
-        depth = 0 if rel.as_posix() == "." else len(rel.parts)
-        if MAX_DEPTH is not None and depth > MAX_DEPTH:
-            dirnames[:] = []
-            continue
-
-        dirnames[:] = [d for d in dirnames if not should_skip_dir(d)]
-        dirnames.sort(key=str.lower)
-        filenames.sort(key=str.lower)
-
-        folder_path = Path(current_root)
+    for folder_path, files, found in iter_dirs(target_dir):
         show_path = folder_path.relative_to(target_dir) if RELATIVE_PATHS else folder_path
         lines.append(f"[DIR] {show_path.as_posix()}")
         total_dirs += 1
+        if found:
+            projects.append(f"{', '.join(sorted(found))}: {show_path.as_posix()}")
 
-        for fname in filenames:
-            p = folder_path / fname
-            if should_skip_file(p):
-                continue
+        for entry in files:
+            rec = file_record(entry)
+            p = rec.path
 
             info = []
             if INCLUDE_FILE_SIZE:
-                try:
-                    info.append(human_size(p.stat().st_size))
-                except Exception:
-                    info.append("n/a")
+                info.append(human_size(rec.size) if rec.size is not None else "n/a")
             if INCLUDE_MTIME:
-                info.append(format_mtime(p))
+                info.append(format_mtime(rec.mtime))
             suffix = f"  [{' | '.join(info)}]" if info else ""
 
             rel_file = p.relative_to(target_dir) if RELATIVE_PATHS else p
+            lines.begin_block(rel_file.as_posix())
             lines.append(f"  {rel_file.as_posix()}{suffix}")
             total_files += 1
 
             if INCLUDE_FILE_CONTENTS:
-                write_file_content_lines(lines, p, CONTENT_MAX_BYTES)
+                write_file_content_lines(lines, rec, CONTENT_MAX_BYTES, dedup, rel_file.as_posix())
+            lines.end_block()
 
         lines.append("")
 
@@ -283,9 +716,39 @@ def dump_tree(target_dir: Path) -> Path:
     lines.append(f"Složka  {target_dir}")
     lines.append(f"Adresáře  {total_dirs}")
     lines.append(f"Soubory   {total_files}")
+    for project in projects:
+        lines.append(f"Projekt   {project}")
 
-    out_path.write_text("\n".join(lines), encoding="utf-8")
-    return out_path
+
+def write_dump_jsonl(out: JsonlWriter, target_dir: Path) -> None:
+    """Stejný průchod a filtry jako write_dump, jen jako záznamy NDJSON (bez stromu)."""
+    out.emit({"type": "dump", "tool": "android_dump/dump33", "root": str(target_dir),
+              "generated": datetime.now().isoformat(timespec="seconds")})
+    total_files = 0
+    total_dirs = 0
+    dedup = new_dedup()
+
+    for folder_path, files, found in iter_dirs(target_dir):
+        show_path = folder_path.relative_to(target_dir) if RELATIVE_PATHS else folder_path
+        out.emit({"type": "dir", "path": show_path.as_posix()})
+        total_dirs += 1
+        for kind in sorted(found):
+            out.emit({"type": "project", "kind": kind, "path": show_path.as_posix()})
+
+        for entry in files:
+            rec = file_record(entry)
+            rel_file = rec.path.relative_to(target_dir) if RELATIVE_PATHS else rec.path
+            record = {"type": "file", "path": rel_file.as_posix()}
+            if INCLUDE_FILE_SIZE:
+                record["size"] = rec.size
+            if INCLUDE_MTIME:
+                record["mtime"] = format_mtime(rec.mtime) if rec.mtime is not None else None
+            if INCLUDE_FILE_CONTENTS:
+                record.update(file_content_fields(rec, CONTENT_MAX_BYTES, dedup, record["path"]))
+            out.emit(record)
+            total_files += 1
+
+    out.emit({"type": "summary", "root": str(target_dir), "dirs": total_dirs, "files": total_files})
 
 
 def main() -> None:
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Společné pomůcky pro benchmarky: načtení dumperu přímo ze souboru a měření času."""
+
+from pathlib import Path
+import importlib.util
+import time
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+def load_dumper(rel_path: str, name: str | None = None):
+    """Načte skript (např. "unity_dump/dump44.py") jako modul bez spuštění main()."""
+    path = REPO_DIR / rel_path
+    name = name or "bench_" + path.stem
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def timed(fn, *args, repeat: int = 3):
+    """Nejlepší čas z `repeat` běhů (s) a výsledek posledního běhu."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mikrobenchmark: původní analýza skriptů (sedm regexů nad celým textem) vs.
+jednoprůchodový skener analyze_script_text z dump_scripts22.
+
+Dvě sady vstupů:
+  běžné   vygenerované C# skripty; třídy, struktury, enumy, rozhraní a příznaky
+          MonoBehaviour/ScriptableObject musí vyjít stejně (metody se
+          nesrovnávají – původní RE_METHOD počítal i některá volání)
+  dlouhé  jeden řádek s N identifikátory bez závorky (minifikovaný kód,
+          vygenerovaná data); RE_METHOD na něm backtrackuje kvadraticky,
+          skener roste lineárně
+  patologické  vstupy proti samotnému skeneru (nepárové >, hluboko vnořené
+          interpolované stringy, raw string s mnoha dírami)
+
+Spuštění:  python benchmarks/bench_analyze.py [počet_skriptů] [řádků_na_skript]
+"""
+
+import random
+import re
+import sys
+
+from _util import load_dumper, timed
+
+N_SCRIPTS = 20
+LINES_PER_SCRIPT = 2000
+LONG_LINE_WORDS = (1000, 2000, 4000)
+
+# kopie původních regexů (před jednoprůchodovým skenerem)
+RE_CLASS = re.compile(r'^\s*(?:public|internal|protected|private)?\s*(?:abstract\s+|static\s+|partial\s+)*class\s+([A-Za-z_]\w*)', re.MULTILINE)
+RE_STRUCT = re.compile(r'^\s*(?:public|internal|protected|private)?\s*struct\s+([A-Za-z_]\w*)', re.MULTILINE)
+RE_ENUM = re.compile(r'^\s*(?:public|internal|protected|private)?\s*enum\s+([A-Za-z_]\w*)', re.MULTILINE)
+RE_INTERFACE = re.compile(r'^\s*(?:public|internal|protected|private)?\s*interface\s+([A-Za-z_]\w*)', re.MULTILINE)
+RE_METHOD = re.compile(r'\b(?:public|private|protected|internal)?\s*(?:static\s+)?(?:async\s+)?[A-Za-z_\<\>\[\],\s]+\s+([A-Za-z_]\w*)\s*\(', re.MULTILINE)
+RE_MONO = re.compile(r'class\s+([A-Za-z_]\w*)\s*:\s*MonoBehaviour\b')
+RE_SCRIPTABLE = re.compile(r'class\s+([A-Za-z_]\w*)\s*:\s*ScriptableObject\b')
+
+# vstupy, na kterých by naivní skener byl kvadratický nebo přetekl zásobník
+PATHOLOGICAL = {
+    '">(" bez párového <': lambda n: "class A { " + ">(" * n,
+    'vnořené $"{': lambda n: "class A { string s = " + '$"{' * n + '}"' * n + "; }",
+    'díry v $"""…"""': lambda n: 'class A { string s = $"""' + "{a}" * n + '"""; }',
+}
+PATHOLOGICAL_SIZES = (4000, 8000, 16000)
+
+COMPARED_KEYS = ("classes", "structs", "enums", "interfaces", "is_mono", "is_scriptable")
+
+WORDS = ["player", "enemy", "health", "spawner", "camera", "score", "item", "level"]
+
+def reference_analyze(text: str):
+    lines = text.splitlines()
+    return {
+        "lines": len(lines),
+        "classes": RE_CLASS.findall(text),
+        "structs": RE_STRUCT.findall(text),
+        "enums": RE_ENUM.findall(text),
+        "interfaces": RE_INTERFACE.findall(text),
+        "methods": RE_METHOD.findall(text),
+        "is_mono": bool(RE_MONO.search(text)),
+        "is_scriptable": bool(RE_SCRIPTABLE.search(text)),
+    }
+
+def make_script(rng: random.Random, idx: int, n_lines: int) -> str:
+    base = rng.choice(["MonoBehaviour", "ScriptableObject", "Object"])
+    out = ["using UnityEngine;", "", "namespace Game", "{",
+           f"    public enum Mode{idx} {{ Idle, Run }}",
+           f"    public interface IScript{idx} {{ void Tick(); }}",
+           f"    public struct Data{idx} {{ public int value; }}",
+           f"    public class Generated{idx} : {base}", "    {"]
+    i = 0
+    while i < n_lines:
+        w = rng.choice(WORDS)
+        kind = rng.randrange(6)
+        if kind == 0:
+            out.append(f"        // {w} komentář {i}")
+        elif kind == 1:
+            out.append(f"        [SerializeField] private float {w}{i} = {rng.random():.3f}f;")
+        elif kind == 2:
+            out.append(f"        private string {w}{i} = \"{w} {{ není blok\";")
+        else:
+            out += [f"        public void {w.title()}{i}(int amount)", "        {",
+                    f"            if (amount > {i}) Debug.Log(\"{w}\");",
+                    f"            Spawn{w.title()}(amount, transform.position);",
+                    "        }"]
+            i += 4
+        i += 1
+    out += ["    }", "}"]
+    return "\n".join(out) + "\n"
+
+def make_long_line(n_words: int) -> str:
+    # dlouhá řada identifikátorů bez "(" – nejhorší případ pro RE_METHOD
+    # (jména bez číslic, aby [A-Za-z_…]+ pokrylo celý řádek)
+    return "public static readonly " + " ".join(WORDS[i % len(WORDS)] for i in range(n_words)) + ";\n"
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_SCRIPTS
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else LINES_PER_SCRIPT
+    mod = load_dumper("unity_dump/dump_scripts22.py")
+    rng = random.Random(25)
+    scripts = [make_script(rng, i, lines) for i in range(n)]
+    total_mb = sum(len(s) for s in scripts) / 1e6
+
+    t_ref, ref = timed(lambda: [reference_analyze(s) for s in scripts], repeat=1)
+    t_new, new = timed(lambda: [mod.analyze_script_text(s) for s in scripts])
+
+    for idx, (a, b) in enumerate(zip(ref, new)):
+        for key in COMPARED_KEYS:
+            if a[key] != b[key]:
+                raise SystemExit(f"Skript {idx}: '{key}' se liší: {a[key]!r} vs {b[key]!r}")
+    ref_methods = sum(len(r["methods"]) for r in ref)
+    new_methods = sum(len(r["methods"]) for r in new)
+
+    print(f"Skriptů: {n} x {lines} řádků, {total_mb:.1f} MB znaků")
+    print(f"regexy  : {t_ref:7.3f} s  {total_mb / t_ref:8.2f} MB/s  metod: {ref_methods}")
+    print(f"skener  : {t_new:7.3f} s  {total_mb / t_new:8.2f} MB/s  metod: {new_methods}  ({t_ref / t_new:.1f}x)")
+
+    print("\nDlouhý řádek bez závorky:")
+    print(f"{'slov':>6s} {'regexy s':>10s} {'skener s':>10s}")
+    for words in LONG_LINE_WORDS:
+        text = make_long_line(words)
+        t_ref, _ = timed(lambda: reference_analyze(text), repeat=1)
+        t_new, _ = timed(lambda: mod.analyze_script_text(text))
+        print(f"{words:6d} {t_ref:10.4f} {t_new:10.4f}")
+
+    print("\nPatologické vstupy skeneru (čas má růst lineárně):")
+    print(f"{'vstup':22s}" + "".join(f"{n:>10d}" for n in PATHOLOGICAL_SIZES))
+    for label, make in PATHOLOGICAL.items():
+        times = [timed(mod.analyze_script_text, make(n))[0] for n in PATHOLOGICAL_SIZES]
+        print(f"{label:22s}" + "".join(f"{t:10.4f}" for t in times))
+
+if __name__ == "__main__":
+    main()
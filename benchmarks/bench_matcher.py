@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mikrobenchmark: původní is_excluded (smyčka přes fnmatch) vs. ExcludeMatcher z dump44.
+Vygeneruje deterministický seznam Unity-like cest a změří počet testů za sekundu.
+
+Spuštění:  python benchmarks/bench_matcher.py [počet_cest]
+"""
+
+from pathlib import PurePosixPath
+import fnmatch
+import random
+import sys
+
+from _util import load_dumper, timed
+
+N_PATHS = 1_000_000
+
+DIRS = ["Assets", "Assets/Scripts", "Assets/Scripts/Player", "Assets/Prefabs", "Assets/Art/Textures",
+        "Library/ScriptAssemblies", "Library/Artifacts/3f", "Temp/Bee", "Packages/com.foo",
+        "ProjectSettings", "obj/Debug", "Logs", "Assets/Plugins/Android"]
+NAMES = ["Player", "Enemy", "GameManager", "Main", "UI_Button", "Terrain", "Boss", "Spawner"]
+EXTS = [".cs", ".meta", ".prefab", ".unity", ".asset", ".dll", ".png", ".log", ".mat", ".shader", ""]
+
+def make_paths(n: int) -> list[PurePosixPath]:
+    rng = random.Random(44)
+    out = []
+    for i in range(n):
+        d = rng.choice(DIRS)
+        if rng.random() < 0.3:
+            d += f"/Sub{rng.randrange(50)}"
+        out.append(PurePosixPath(f"{d}/{rng.choice(NAMES)}{i % 997}{rng.choice(EXTS)}"))
+    return out
+
+def reference_is_excluded(mod, rel_path) -> bool:
+    # kopie původní implementace (před kompilovaným matcherem)
+    for part in rel_path.parts:
+        if mod.norm_lower(part) in mod.EXCLUDE_DIRS:
+            return True
+    if mod.norm_lower(rel_path.name) in mod.EXCLUDE_FILES:
+        return True
+    if rel_path.suffix:
+        if mod.norm_lower(rel_path.suffix.lstrip(".")) in mod.EXCLUDE_EXTS:
+            return True
+    rel_as_posix = mod.norm_lower(rel_path.as_posix())
+    for pattern in mod.EXCLUDE_GLOBS:
+        if fnmatch.fnmatch(rel_as_posix, mod.norm_lower(pattern)):
+            return True
+    return False
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_PATHS
+    mod = load_dumper("unity_dump/dump44.py")
+    paths = make_paths(n)
+    posix = [p.as_posix() for p in paths]
+    matcher = mod.exclude_matcher()
+
+    t_ref, ref = timed(lambda: [reference_is_excluded(mod, p) for p in paths], repeat=1)
+    t_new, new = timed(lambda: [matcher(p) for p in paths])
+    t_str, new_str = timed(lambda: [matcher.match_posix(p) for p in posix])
+
+    if ref != new or ref != new_str:
+        diff = next(p for p, a, b in zip(paths, ref, new) if a != b)
+        raise SystemExit(f"Výsledky se liší, např. pro {diff}")
+
+    print(f"Cest: {n}, vyloučeno: {sum(ref)}")
+    print(f"fnmatch smyčka       : {t_ref:7.3f} s  {n / t_ref:12,.0f} cest/s")
+    print(f"ExcludeMatcher(Path) : {t_new:7.3f} s  {n / t_new:12,.0f} cest/s  ({t_ref / t_new:.1f}x)")
+    print(f"ExcludeMatcher(str)  : {t_str:7.3f} s  {n / t_str:12,.0f} cest/s  ({t_ref / t_str:.1f}x)")
+
+if __name__ == "__main__":
+    main()
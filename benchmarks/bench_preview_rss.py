@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kontrola paměti: náhled obsahu v android_dump/dump33 (read_preview) musí číst
+jen omezený začátek souboru, ne celý soubor.
+
+Vytvoří řídké (sparse) soubory o velikosti několika GB, které na disku skoro
+nic nezabírají:
+  text     textový začátek (TEXT_DETECT_BYTES), zbytek nuly -> náhled do CONTENT_MAX_BYTES
+  binární  samé nuly -> hex náhled BINARY_PREVIEW_BYTES
+a nad každým zavolá read_preview s velikostí ze stat. Špička RSS procesu
+(resource.getrusage) smí vzrůst nejvýš o RSS_LIMIT_MB; čtení celého souboru
+by ji zvedlo o gigabajty. Potřebuje modul resource (Linux/macOS).
+
+Spuštění:  python benchmarks/bench_preview_rss.py [velikost_GB]
+"""
+
+from pathlib import Path
+import sys
+import tempfile
+
+from _util import load_dumper, timed
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZE_GB = 4
+RSS_LIMIT_MB = 64
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux vrací KB, macOS bajty
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+def make_sparse(path: Path, size: int, head: bytes) -> None:
+    with path.open("wb") as f:
+        f.write(head)
+        f.truncate(size)
+
+def main():
+    if resource is None:
+        raise SystemExit("Modul resource není k dispozici (Windows), kontrolu RSS nelze provést.")
+    size_gb = float(sys.argv[1]) if len(sys.argv) > 1 else SIZE_GB
+    size = int(size_gb * (1 << 30))
+    mod = load_dumper("android_dump/dump33.py")
+    text_head = (b"val hodnota = \"text\"\n" * (mod.TEXT_DETECT_BYTES // 20 + 1))[:mod.TEXT_DETECT_BYTES]
+
+    with tempfile.TemporaryDirectory(prefix="preview_rss_") as tmp:
+        cases = {"text": Path(tmp) / "big.txt", "binární": Path(tmp) / "big.bin"}
+        make_sparse(cases["text"], size, text_head)
+        make_sparse(cases["binární"], size, b"")
+
+        print(f"Řídké soubory: {size / (1 << 30):.1f} GB, CONTENT_MAX_BYTES={mod.CONTENT_MAX_BYTES}, "
+              f"BINARY_PREVIEW_BYTES={mod.BINARY_PREVIEW_BYTES}")
+        failed = False
+        for label, path in cases.items():
+            st_size = path.stat().st_size
+            before = peak_rss_mb()
+            t, (magic, is_text, data) = timed(mod.read_preview, path, st_size, mod.CONTENT_MAX_BYTES)
+            growth = peak_rss_mb() - before
+            ok = growth <= RSS_LIMIT_MB and len(data) <= max(mod.CONTENT_MAX_BYTES, mod.BINARY_PREVIEW_BYTES)
+            failed |= not ok
+            print(f"{label:8s} text={is_text!s:5s} přečteno {len(data):>8} B  {t * 1000:7.2f} ms  "
+                  f"nárůst špičky RSS {growth:6.1f} MB  {'OK' if ok else 'CHYBA'}")
+
+    if failed:
+        raise SystemExit(f"Špička RSS vzrostla o víc než {RSS_LIMIT_MB} MB nebo náhled přesáhl limit.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mikrobenchmark: původní strip_comments_c_like (smyčka znak po znaku) vs.
+skener z dump_scripts22, který skáče regexem mezi komentáři a stringy.
+Vygeneruje deterministické velké C# skripty (komentáře, stringy, znaky),
+ověří shodný výstup a změří propustnost.
+
+Spuštění:  python benchmarks/bench_strip_comments.py [počet_skriptů] [řádků_na_skript]
+"""
+
+import random
+import sys
+
+from _util import load_dumper, timed
+
+N_SCRIPTS = 20
+LINES_PER_SCRIPT = 5000
+
+WORDS = ["player", "enemy", "health", "spawner", "camera", "score", "item", "level"]
+
+def make_script(rng: random.Random, n_lines: int) -> str:
+    out = ["using UnityEngine;", "", "/// <summary>", "/// Vygenerovaný skript.", "/// </summary>",
+           "public class Generated : MonoBehaviour", "{"]
+    for i in range(n_lines):
+        w = rng.choice(WORDS)
+        kind = rng.randrange(8)
+        if kind == 0:
+            out.append(f"    // {w} komentář {i} s \"uvozovkami\" a 'apostrofy'")
+        elif kind == 1:
+            out.append(f"    /* {w} {i}")
+            out.append(f"       pokračování */ private int {w}{i} = {i};")
+        elif kind == 2:
+            out.append(f"    private string {w}{i} = \"{w} // není komentář \\\" {i}\";")
+        elif kind == 3:
+            out.append(f"    private char {w}{i} = '\\'';  // znak")
+        elif kind == 4:
+            out.append(f"    public void {w.title()}{i}(int amount) {{ if (amount > {i}) Debug.Log(\"{w}\"); }}")
+        else:
+            out.append(f"    [SerializeField] private float {w}{i} = {rng.random():.3f}f;")
+    out.append("}")
+    return "\n".join(out) + "\n"
+
+def reference_strip(code: str) -> str:
+    # kopie původní implementace (před skenerem s regexy)
+    result = []
+    i = 0
+    n = len(code)
+
+    in_sl_comment = False
+    in_ml_comment = False
+    in_string = False
+    string_char = ''
+    escaped = False
+
+    while i < n:
+        ch = code[i]
+        nxt = code[i + 1] if i + 1 < n else ''
+
+        if in_sl_comment:
+            if ch == "\n":
+                in_sl_comment = False
+                result.append(ch)
+            i += 1
+            continue
+
+        if in_ml_comment:
+            if ch == "*" and nxt == "/":
+                in_ml_comment = False
+                i += 2
+            else:
+                if ch == "\n":
+                    result.append("\n")
+                i += 1
+            continue
+
+        if in_string:
+            result.append(ch)
+            if escaped:
+                escaped = False
+            else:
+                if ch == "\\":
+                    escaped = True
+                elif ch == string_char:
+                    in_string = False
+                    string_char = ''
+            i += 1
+            continue
+
+        if ch in ('"', "'"):
+            in_string = True
+            string_char = ch
+            result.append(ch)
+            i += 1
+        elif ch == "/" and nxt == "/":
+            in_sl_comment = True
+            i += 2
+        elif ch == "/" and nxt == "*":
+            in_ml_comment = True
+            i += 2
+        else:
+            result.append(ch)
+            i += 1
+
+    return "".join(result)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_SCRIPTS
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else LINES_PER_SCRIPT
+    mod = load_dumper("unity_dump/dump_scripts22.py")
+    rng = random.Random(24)
+    scripts = [make_script(rng, lines) for _ in range(n)]
+    total_mb = sum(len(s) for s in scripts) / 1e6
+
+    t_ref, ref = timed(lambda: [reference_strip(s) for s in scripts], repeat=1)
+    t_new, new = timed(lambda: [mod.strip_comments_c_like(s) for s in scripts])
+
+    if ref != new:
+        idx = next(i for i, (a, b) in enumerate(zip(ref, new)) if a != b)
+        raise SystemExit(f"Výsledky se liší ve skriptu {idx}")
+
+    print(f"Skriptů: {n} x {lines} řádků, {total_mb:.1f} MB znaků")
+    print(f"znak po znaku : {t_ref:7.3f} s  {total_mb / t_ref:8.2f} MB/s")
+    print(f"regex skener  : {t_new:7.3f} s  {total_mb / t_new:8.2f} MB/s  ({t_ref / t_new:.1f}x)")
+
+if __name__ == "__main__":
+    main()
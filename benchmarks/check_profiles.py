@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kontrola profilů projektů v android_dump/dump33 (AUTO_PROFILES).
+
+Vytvoří smíšené repo: Gradle v kořeni, v podsložkách Unity projekt, .NET řešení
+a Node balíček; generované složky mají různou velikost písmen (Library, obj,
+Obj, BUILD, Temp, bin, node_modules…). Projde ho stejně jako write_dump
+(iter_dirs) a ověří, že:
+  - soubory z generovaných složek každého profilu ve výstupu nejsou,
+  - zdrojové soubory tam jsou,
+  - profil platí jen ve svém podstromu (Library/ mimo Unity projekt zůstává),
+  - `py_dumps auto` neznámý kořen předá android dumperu.
+
+Spuštění:  python benchmarks/check_profiles.py
+"""
+
+from pathlib import Path
+import contextlib
+import io
+import tempfile
+
+from _util import load_dumper
+
+# cesta -> má se objevit ve výstupu?
+FILES = {
+    "settings.gradle.kts": True,
+    "app/src/Main.kt": True,
+    "app/build/out.txt": False,
+    "app/Build/out.txt": False,
+    "Library/notes.txt": True,            # mimo Unity projekt to není generovaná složka
+    "game/ProjectSettings/ProjectVersion.txt": True,
+    "game/Assets/Player.cs": True,
+    "game/Assets/Player.cs.meta": False,
+    "game/Library/cache.bin": False,
+    "game/Temp/x.txt": False,
+    "game/obj/Debug/a.txt": False,
+    "game/Obj/Release/a.txt": False,
+    "game/BUILD/game.txt": False,
+    "game/Logs/log.txt": False,
+    "tools/Tools.sln": True,
+    "tools/App/Program.cs": True,
+    "tools/App/bin/Debug/App.txt": False,
+    "tools/App/OBJ/App.txt": False,
+    "web/package.json": True,
+    "web/src/index.js": True,
+    "web/node_modules/lib/index.js": False,
+    "web/Dist/bundle.js": False,
+}
+
+def dumped_paths(mod, root: Path) -> set[str]:
+    seen = set()
+    for folder, files, _found in mod.iter_dirs(root):
+        for entry in files:
+            seen.add(Path(entry.path).relative_to(root).as_posix())
+    return seen
+
+def check_auto(root: Path) -> str:
+    cli = load_dumper("py_dumps.py", "check_py_dumps")
+    args = cli.build_parser().parse_args(["auto", str(root)])
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cli.resolve_auto(args).command
+
+def main():
+    mod = load_dumper("android_dump/dump33.py")
+    with tempfile.TemporaryDirectory(prefix="profiles_") as tmp:
+        root = Path(tmp) / "repo"
+        for rel in FILES:
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x\n", encoding="utf-8")
+        seen = dumped_paths(mod, root)
+        errors = [f"{'chybí' if expected else 'navíc'}: {rel}"
+                  for rel, expected in FILES.items() if (rel in seen) != expected]
+        # kořen bez značek (jen podprojekty) -> auto musí zvolit android
+        (root / "settings.gradle.kts").unlink()
+        command = check_auto(root)
+        if command != "android":
+            errors.append(f"auto zvolilo {command!r} místo 'android'")
+
+    for line in errors:
+        print(line)
+    if errors:
+        raise SystemExit(f"Profily: {len(errors)} chyb.")
+    print(f"Profily OK: {len(FILES)} cest, auto -> {command}")
+
+if __name__ == "__main__":
+    main()
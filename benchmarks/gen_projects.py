@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generátor syntetických projektů pro benchmarky dumperů.
+
+Deterministicky (pevný seed, pevné mtime) vytvoří realistické stromy:
+  unity/   Unity projekt: Assets se skripty a .meta páry, prefaby a scény
+           v řádu MB, Packages, ProjectSettings a Library/ s ~200k soubory
+  gradle/  vícemodulový Gradle (Android) projekt s build/ a .gradle/
+  wpf/     WPF řešení (.sln, .csproj, XAML) s bin/ a obj/
+
+--scale zmenší/zvětší počty souborů i velikosti (1.0 = plná velikost,
+0.01 pro rychlý test). Stejné parametry => bajtově stejný strom.
+
+Spuštění:  python benchmarks/gen_projects.py CÍL [--scale 1.0] [--only unity,gradle,wpf]
+"""
+
+from pathlib import Path
+import argparse
+import hashlib
+import os
+import random
+import shutil
+
+SEED = 16
+FIXED_MTIME = 1_700_000_000  # pevný čas, aby manifesty a cache byly mezi běhy stejné
+
+# plné velikosti pro scale = 1.0
+UNITY_SCRIPTS = 1500
+UNITY_PREFABS = 400
+UNITY_SCENES = 6
+UNITY_SCENE_BYTES = 4_000_000
+UNITY_TEXTURES = 300
+UNITY_LIBRARY_FILES = 200_000
+GRADLE_MODULES = 12
+GRADLE_SOURCES_PER_MODULE = 150
+GRADLE_BUILD_FILES_PER_MODULE = 2000
+WPF_PROJECTS = 6
+WPF_VIEWS_PER_PROJECT = 60
+WPF_BIN_FILES_PER_PROJECT = 400
+
+WORDS = ["Player", "Enemy", "Inventory", "Weapon", "Health", "Spawner", "Camera", "Audio",
+         "Input", "Quest", "Dialog", "Save", "Level", "Boss", "Item", "Shop", "Map", "Score"]
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+PE_HEADER = b"MZ\x90\x00\x03\x00\x00\x00\x04\x00\x00\x00\xff\xff\x00\x00"
+
+
+class Writer:
+    """Zapisuje soubory pod root a nastavuje jim pevné mtime."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files = 0
+        self.bytes = 0
+
+    def write(self, rel: str, data: str | bytes) -> None:
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+        os.utime(path, (FIXED_MTIME, FIXED_MTIME))
+        self.files += 1
+        self.bytes += len(data)
+
+
+def scaled(n: int, scale: float) -> int:
+    return max(1, int(n * scale))
+
+
+def guid_for(name: str) -> str:
+    return hashlib.md5(name.encode("utf-8")).hexdigest()
+
+
+def cs_class(rng: random.Random, name: str, base: str, namespace: str) -> str:
+    fields = "\n".join(
+        f"    [SerializeField] private float {rng.choice(WORDS).lower()}{i} = {rng.randrange(100)}f;"
+        for i in range(rng.randrange(2, 8))
+    )
+    methods = "\n\n".join(
+        f"    // {rng.choice(WORDS)} logika\n"
+        f"    public void {rng.choice(WORDS)}{i}(int amount)\n    {{\n"
+        f"        if (amount > {rng.randrange(50)}) {{ Debug.Log(\"{name} {i}\"); }}\n"
+        f"        /* TODO: {rng.choice(WORDS)} */\n    }}"
+        for i in range(rng.randrange(3, 12))
+    )
+    return (f"using UnityEngine;\n\nnamespace {namespace}\n{{\n"
+            f"public class {name} : {base}\n{{\n{fields}\n\n{methods}\n}}\n}}\n")
+
+
+def meta_for(guid: str) -> str:
+    return f"fileFormatVersion: 2\nguid: {guid}\nMonoImporter:\n  serializedVersion: 2\n"
+
+
+def yaml_object(rng: random.Random, file_id: int, script_guid: str | None) -> str:
+    lines = [f"--- !u!114 &{file_id}", "MonoBehaviour:", "  m_ObjectHideFlags: 0",
+             f"  m_GameObject: {{fileID: {file_id + 1}}}"]
+    if script_guid:
+        lines.append(f"  m_Script: {{fileID: 11500000, guid: {script_guid}, type: 3}}")
+    lines.append(f"  m_Text: {rng.choice(WORDS)} {rng.randrange(1000)}")
+    lines.append(f"  m_LocalPosition: {{x: {rng.random():.3f}, y: {rng.random():.3f}, z: 0}}")
+    return "\n".join(lines) + "\n"
+
+
+def gen_unity(root: Path, scale: float, rng: random.Random) -> Writer:
+    w = Writer(root)
+    w.write("ProjectSettings/ProjectVersion.txt", "m_EditorVersion: 2022.3.20f1\n")
+    w.write("ProjectSettings/EditorBuildSettings.asset",
+            "%YAML 1.1\nEditorBuildSettings:\n  m_Scenes:\n" +
+            "".join(f"  - enabled: 1\n    path: Assets/Scenes/Level{i}.unity\n"
+                    for i in range(scaled(UNITY_SCENES, scale))))
+    w.write("Packages/manifest.json",
+            '{\n  "dependencies": {\n    "com.unity.textmeshpro": "3.0.6",\n'
+            '    "com.unity.inputsystem": "1.7.0"\n  }\n}\n')
+
+    script_guids = []
+    for i in range(scaled(UNITY_SCRIPTS, scale)):
+        folder = rng.choice(["Player", "Enemies", "UI", "Systems", "Editor", "Plugins/Vendor"])
+        name = f"{rng.choice(WORDS)}{rng.choice(WORDS)}{i}"
+        base = rng.choice(["MonoBehaviour", "MonoBehaviour", "ScriptableObject", "object"])
+        rel = f"Assets/Scripts/{folder}/{name}.cs"
+        guid = guid_for(rel)
+        script_guids.append(guid)
+        w.write(rel, cs_class(rng, name, base, f"Game.{folder.replace('/', '.')}"))
+        w.write(rel + ".meta", meta_for(guid))
+
+    for i in range(scaled(UNITY_PREFABS, scale)):
+        rel = f"Assets/Prefabs/{rng.choice(WORDS)}_{i}.prefab"
+        body = "%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n" + "".join(
+            yaml_object(rng, 1000 + k * 2, rng.choice(script_guids) if k % 3 == 0 else None)
+            for k in range(rng.randrange(5, 40)))
+        w.write(rel, body)
+        w.write(rel + ".meta", meta_for(guid_for(rel)))
+
+    scene_bytes = scaled(UNITY_SCENE_BYTES, scale)
+    for i in range(scaled(UNITY_SCENES, scale)):
+        rel = f"Assets/Scenes/Level{i}.unity"
+        parts = ["%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"]
+        size, k = 0, 0
+        while size < scene_bytes:
+            chunk = yaml_object(rng, 10_000 + k * 2, rng.choice(script_guids) if k % 5 == 0 else None)
+            chunk += "  m_Name: TextMeshProUGUI\n" if k % 50 == 0 else ""
+            parts.append(chunk)
+            size += len(chunk)
+            k += 1
+        w.write(rel, "".join(parts))
+        w.write(rel + ".meta", meta_for(guid_for(rel)))
+
+    for i in range(scaled(UNITY_TEXTURES, scale)):
+        rel = f"Assets/Art/Textures/tex_{i}.png"
+        w.write(rel, PNG_HEADER + rng.randbytes(rng.randrange(2_000, 60_000)))
+        w.write(rel + ".meta", meta_for(guid_for(rel)))
+
+    # Library/: hodně malých artefaktů rozházených do hash složek (jako skutečné Artifacts)
+    for i in range(scaled(UNITY_LIBRARY_FILES, scale)):
+        h = guid_for(f"lib{i}")
+        w.write(f"Library/Artifacts/{h[:2]}/{h}", rng.randbytes(rng.randrange(64, 512)))
+    w.write("Library/ScriptAssemblies/Assembly-CSharp.dll", PE_HEADER + rng.randbytes(200_000))
+    w.write("Temp/UnityLockfile", "")
+    w.write("Logs/AssetImportWorker0.log", "Import\n" * 500)
+    w.write("Assembly-CSharp.csproj", "<Project Sdk=\"Microsoft.NET.Sdk\"></Project>\n")
+    w.write("Game.sln", "Microsoft Visual Studio Solution File, Format Version 12.00\n")
+    return w
+
+
+def kotlin_class(rng: random.Random, pkg: str, name: str) -> str:
+    funs = "\n\n".join(
+        f"    fun {rng.choice(WORDS).lower()}{i}(x: Int): Int {{\n        return x * {rng.randrange(9)}\n    }}"
+        for i in range(rng.randrange(2, 10)))
+    return f"package {pkg}\n\nclass {name} {{\n{funs}\n}}\n"
+
+
+def gen_gradle(root: Path, scale: float, rng: random.Random) -> Writer:
+    w = Writer(root)
+    # počet modulů/projektů roste jen s odmocninou, aby i malý scale zůstal vícemodulový
+    modules = ["app"] + [f"feature-{rng.choice(WORDS).lower()}{i}"
+                         for i in range(scaled(GRADLE_MODULES, scale ** 0.5) - 1)]
+    w.write("settings.gradle.kts",
+            'rootProject.name = "Kniha"\n' + "".join(f'include(":{m}")\n' for m in modules))
+    w.write("build.gradle.kts", 'plugins { id("com.android.application") version "8.2.0" apply false }\n')
+    w.write("gradle.properties", "org.gradle.jvmargs=-Xmx2048m\nandroid.useAndroidX=true\n")
+    w.write("local.properties", "sdk.dir=/opt/android-sdk\n")
+    w.write("gradle/wrapper/gradle-wrapper.properties", "distributionUrl=gradle-8.5-bin.zip\n")
+    w.write("gradle/wrapper/gradle-wrapper.jar", b"PK\x03\x04" + rng.randbytes(40_000))
+
+    for m in modules:
+        pkg = "cz.kniha." + m.replace("-", "_")
+        w.write(f"{m}/build.gradle.kts", 'plugins { id("com.android.library") }\n'
+                f'android {{ namespace = "{pkg}" }}\n')
+        w.write(f"{m}/src/main/AndroidManifest.xml", '<manifest package="%s"/>\n' % pkg)
+        for i in range(scaled(GRADLE_SOURCES_PER_MODULE, scale)):
+            name = f"{rng.choice(WORDS)}{i}"
+            if i % 3:
+                w.write(f"{m}/src/main/java/{pkg.replace('.', '/')}/{name}.kt", kotlin_class(rng, pkg, name))
+            else:
+                w.write(f"{m}/src/main/res/layout/layout_{name.lower()}.xml",
+                        '<LinearLayout xmlns:android="http://schemas.android.com/apk/res/android"/>\n')
+        for i in range(scaled(GRADLE_SOURCES_PER_MODULE // 5, scale)):
+            w.write(f"{m}/src/main/res/drawable/ic_{i}.png", PNG_HEADER + rng.randbytes(rng.randrange(500, 8_000)))
+        for i in range(scaled(GRADLE_BUILD_FILES_PER_MODULE, scale)):
+            w.write(f"{m}/build/intermediates/javac/debug/classes/C{i}.class",
+                    b"\xca\xfe\xba\xbe" + rng.randbytes(rng.randrange(200, 3_000)))
+    for i in range(scaled(2000, scale)):
+        w.write(f".gradle/8.5/fileHashes/part{i}.bin", rng.randbytes(256))
+    return w
+
+
+def gen_wpf(root: Path, scale: float, rng: random.Random) -> Writer:
+    w = Writer(root)
+    projects = [f"Kniha.{rng.choice(WORDS)}{i}" for i in range(scaled(WPF_PROJECTS, scale ** 0.5))]
+    w.write("Kniha.sln", "Microsoft Visual Studio Solution File, Format Version 12.00\n" + "".join(
+        f'Project("{{FAE04EC0}}") = "{p}", "{p}\\{p}.csproj", "{{{guid_for(p)}}}"\nEndProject\n'
+        for p in projects))
+    w.write("README.md", "# Kniha\n\nSyntetické WPF řešení pro benchmark.\n")
+    for p in projects:
+        w.write(f"{p}/{p}.csproj", '<Project Sdk="Microsoft.NET.Sdk">\n  <PropertyGroup>\n'
+                '    <UseWPF>true</UseWPF>\n  </PropertyGroup>\n</Project>\n')
+        w.write(f"{p}/App.config", "<configuration/>\n")
+        for i in range(scaled(WPF_VIEWS_PER_PROJECT, scale)):
+            view = f"{rng.choice(WORDS)}View{i}"
+            w.write(f"{p}/Views/{view}.xaml",
+                    f'<UserControl x:Class="{p}.{view}">\n' +
+                    "".join(f'  <TextBlock Text="{rng.choice(WORDS)}"/>\n' for _ in range(rng.randrange(5, 40))) +
+                    "</UserControl>\n")
+            w.write(f"{p}/Views/{view}.xaml.cs", "﻿" + cs_class(rng, view, "UserControl", p))
+            w.write(f"{p}/obj/Debug/Views/{view}.g.cs", f"// <auto-generated/>\npartial class {view} {{}}\n")
+        for i in range(scaled(WPF_BIN_FILES_PER_PROJECT, scale)):
+            w.write(f"{p}/bin/Debug/net8.0-windows/Lib{i}.dll", PE_HEADER + rng.randbytes(rng.randrange(1_000, 20_000)))
+    return w
+
+
+GENERATORS = {"unity": gen_unity, "gradle": gen_gradle, "wpf": gen_wpf}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generátor syntetických projektů pro benchmarky.")
+    parser.add_argument("target", type=Path, help="cílová složka (obsah se přepíše)")
+    parser.add_argument("--scale", type=float, default=1.0, help="násobek počtu a velikosti souborů")
+    parser.add_argument("--only", default=",".join(GENERATORS), help="čárkami oddělené typy projektů")
+    args = parser.parse_args()
+
+    for kind in args.only.split(","):
+        root = args.target / kind
+        if root.exists():
+            shutil.rmtree(root)
+        w = GENERATORS[kind](root, args.scale, random.Random(f"{SEED}:{kind}:{args.scale}"))
+        print(f"{kind:7s} {w.files:8d} souborů  {w.bytes / 1e6:9.1f} MB  -> {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark všech variant dumperů nad projekty z gen_projects.py.
+
+Každá varianta běží v samostatném podprocesu (čistá paměť i cache modulů),
+který změří:
+  wall_s      čas běhu main()
+  cpu_s       uživatelský + systémový čas procesu
+  syscr/syscw počet read/write syscallů (/proc/self/io, jen Linux)
+  rchar       bajty přečtené přes read() včetně page cache
+  read_bytes  bajty skutečně načtené z disku
+  max_rss_kb  špičková paměť procesu
+Výsledky se uloží jako JSON, aby šly porovnat dva běhy (--compare).
+
+Spuštění:
+  python benchmarks/gen_projects.py /tmp/bench --scale 0.1
+  python benchmarks/run_bench.py /tmp/bench -o before.json
+  python benchmarks/run_bench.py /tmp/bench -o after.json --compare before.json
+"""
+
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from _util import REPO_DIR, load_dumper
+
+# varianta -> (typ projektu, skript, funkce vracející přepsané konstanty)
+VARIANTS = {
+    "unity/dump":          ("unity", "unity_dump/dump.py",
+                            lambda root, out: {"ROOT_DIR": root, "OUTPUT_FILE": out / "dump.txt"}),
+    "unity/dump22":        ("unity", "unity_dump/dump22.py",
+                            lambda root, out: {"ROOT_DIR": root, "OUTPUT_FILE": out / "dump.txt"}),
+    "unity/dump33":        ("unity", "unity_dump/dump33.py",
+                            lambda root, out: {"ROOT_DIR": root, "OUTPUT_FILE": str(out / "dump.txt")}),
+    "unity/dump44":        ("unity", "unity_dump/dump44.py",
+                            lambda root, out: {"ROOT_DIR": root, "OUTPUT_FILE": str(out / "dump.txt")}),
+    "unity/dump_scripts":  ("unity", "unity_dump/dump_scripts.py",
+                            lambda root, out: {"ROOT_DIR": root, "OUTPUT_FILE": str(out / "dump.txt")}),
+    "unity/dump_scripts22": ("unity", "unity_dump/dump_scripts22.py",
+                             lambda root, out: {"ROOT_DIR": root, "OUTPUT_FILE": str(out / "dump.txt")}),
+    "gradle/dump":         ("gradle", "android_dump/dump.py",
+                            lambda root, out: {"TARGET_SUBDIR": str(root), "OUTPUT_DIR": out}),
+    "gradle/dump22":       ("gradle", "android_dump/dump22.py",
+                            lambda root, out: {"TARGET_SUBDIR": str(root), "OUTPUT_DIR": out}),
+    "gradle/dump33":       ("gradle", "android_dump/dump33.py",
+                            lambda root, out: {"TARGET_SUBDIR": str(root), "OUTPUT_DIR": out}),
+    "wpf/dump":            ("wpf", "visual_studio_dump/dump.py",
+                            lambda root, out: {"SOURCE_FOLDER": str(root), "OUTPUT_FILENAME": str(out / "dump.txt")}),
+    "wpf/dump22":          ("wpf", "visual_studio_dump/dump22.py",
+                            lambda root, out: {"SOURCE_FOLDER": str(root), "OUTPUT_FILENAME": str(out / "dump.txt")}),
+    "wpf/dump33":          ("wpf", "visual_studio_dump/dump33.py",
+                            lambda root, out: {"SOURCE_FOLDER": str(root), "OUTPUT_FOLDER": str(out)}),
+}
+
+
+def read_proc_io() -> dict:
+    """Čítače I/O vlastního procesu; mimo Linux prázdný slovník."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+def max_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_child(variant: str, root: Path, out_dir: Path) -> dict:
+    """Tělo podprocesu: načte dumper, přepíše konstanty, změří main()."""
+    _, rel_path, overrides = VARIANTS[variant]
+    module = load_dumper(rel_path)
+    for name, value in overrides(root, out_dir).items():
+        setattr(module, name, value)
+
+    io_before = read_proc_io()
+    cpu_before = time.process_time()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.main()
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu_before
+    io_after = read_proc_io()
+
+    output_bytes = sum(p.stat().st_size for p in out_dir.rglob("*") if p.is_file())
+    result = {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4), "max_rss_kb": max_rss_kb(),
+              "output_bytes": output_bytes}
+    for key in ("syscr", "syscw", "rchar", "wchar", "read_bytes"):
+        if key in io_after:
+            result[key] = io_after[key] - io_before.get(key, 0)
+    return result
+
+
+def run_variant(variant: str, projects: Path, repeat: int) -> dict:
+    """Spustí variantu `repeat`x v podprocesu a vrátí nejrychlejší běh."""
+    kind = VARIANTS[variant][0]
+    root = projects / kind
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="dump_bench_") as tmp:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", variant, str(root), tmp],
+                capture_output=True, text=True, cwd=Path(__file__).parent,
+            )
+            if proc.returncode != 0:
+                return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "selhalo"}
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["wall_s"])
+    best["runs_wall_s"] = [r["wall_s"] for r in runs]
+    return best
+
+
+def print_table(results: dict, baseline: dict | None) -> None:
+    print(f"{'varianta':22s} {'wall s':>8s} {'cpu s':>8s} {'syscr':>9s} {'rchar MB':>9s} {'RSS MB':>8s}  změna")
+    for variant, r in results.items():
+        if "error" in r:
+            print(f"{variant:22s} CHYBA: {r['error']}")
+            continue
+        delta = ""
+        base = (baseline or {}).get(variant)
+        if base and "wall_s" in base and base["wall_s"] > 0:
+            delta = f"{r['wall_s'] / base['wall_s']:.2f}x"
+        rchar = r.get("rchar")
+        rss = r.get("max_rss_kb")
+        print(f"{variant:22s} {r['wall_s']:8.3f} {r['cpu_s']:8.3f} {r.get('syscr', '-')!s:>9s} "
+              f"{(f'{rchar / 1e6:.1f}' if rchar is not None else '-'):>9s} "
+              f"{(f'{rss / 1024:.1f}' if rss is not None else '-'):>8s}  {delta}")
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        result = run_child(sys.argv[2], Path(sys.argv[3]), Path(sys.argv[4]))
+        print(json.dumps(result))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark variant dumperů nad syntetickými projekty.")
+    parser.add_argument("projects", type=Path, help="složka vytvořená gen_projects.py")
+    parser.add_argument("-o", "--output", type=Path, help="uložit výsledky jako JSON")
+    parser.add_argument("--only", help="čárkami oddělené varianty nebo typy (např. unity,wpf/dump33)")
+    parser.add_argument("--repeat", type=int, default=3, help="počet běhů na variantu (bere se nejlepší)")
+    parser.add_argument("--compare", type=Path, help="JSON z předchozího běhu pro porovnání")
+    args = parser.parse_args()
+
+    selected = list(VARIANTS)
+    if args.only:
+        wanted = args.only.split(",")
+        selected = [v for v in selected if v in wanted or v.split("/")[0] in wanted]
+    selected = [v for v in selected if (args.projects / VARIANTS[v][0]).is_dir()]
+
+    results = {}
+    for variant in selected:
+        results[variant] = run_variant(variant, args.projects.resolve(), args.repeat)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+    print_table(results, baseline)
+
+    if args.output:
+        doc = {
+            "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "projects": str(args.projects.resolve()),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Uloženo do {args.output}")
+
+
+if __name__ == "__main__":
+    main()
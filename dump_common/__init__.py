@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+Sdílené moduly dumperů (unity_dump, android_dump, visual_studio_dump).
+
+Skripty zůstávají samostatně spustitelné: každý si před importem přidá kořen
+repozitáře do sys.path. Konfigurace (makra) zůstává ve skriptech, sem patří
+jen kód, který byl mezi nimi kopírovaný.
+"""
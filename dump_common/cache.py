@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite cache odvozených dat (SHA256, GUID, výsledky analýzy…) mezi běhy.
+
+Používají unity_dump/dump44.py a dump_scripts22.py (soubor CACHE_FILE_NAME
+vedle výstupu). Verze schématu je v PRAGMA user_version, takže otevření
+existující cache je jen jedno čtení pragmy; migrace proběhne jednou.
+"""
+
+from pathlib import Path
+import json
+import sqlite3
+import time
+
+# 1 = tabulka "derived" bez kořene projektu, 2 = "derived_by_root"
+SCHEMA_VERSION = 2
+
+def _migrate(db: sqlite3.Connection, version: int) -> None:
+    with db:
+        if version < 2:
+            db.execute("DROP TABLE IF EXISTS derived")  # starší schéma bez kořene projektu
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS derived_by_root ("
+            " root TEXT, kind TEXT, path TEXT, size INTEGER, mtime_ns INTEGER, inode INTEGER,"
+            " value TEXT, last_used REAL, PRIMARY KEY (root, kind, path))"
+        )
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+class DerivedCache:
+    """
+    Klíč = (kořen projektu, druh, relativní cesta) + podpis souboru (size,
+    mtime_ns, inode); jakmile se podpis změní, je to miss. Kořen v klíči
+    odděluje projekty, které se dumpují do stejné výstupní složky. Záznamy
+    nepoužité déle než max_age_days se při close() smažou. S db_path=None je
+    cache vypnutá a jen počítá missy.
+    """
+    def __init__(self, db_path: Path | None, root: Path | None = None, max_age_days: float = 30):
+        self.root = str(root.resolve()) if root is not None else ""
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.db = None
+        self._now = time.time()
+        self._touched: list[tuple[float, str, str, str]] = []
+        self._puts: list[tuple] = []
+        if db_path is None:
+            return
+        try:
+            self.db = sqlite3.connect(str(db_path))
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise sqlite3.DatabaseError(f"novější schéma (verze {version})")
+            if version < SCHEMA_VERSION:
+                _migrate(self.db, version)
+        except sqlite3.Error as e:
+            print(f"[cache] vypnuta, nelze otevřít {db_path}: {e}")
+            if self.db is not None:
+                self.db.close()
+            self.db = None
+
+    def get(self, kind: str, path: str, sig: tuple[int, int, int]):
+        if self.db is None:
+            self.misses += 1
+            return None
+        row = self.db.execute(
+            "SELECT value FROM derived_by_root"
+            " WHERE root=? AND kind=? AND path=? AND size=? AND mtime_ns=? AND inode=?",
+            (self.root, kind, path, *sig),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.append((self._now, self.root, kind, path))
+        return json.loads(row[0])
+
+    def put(self, kind: str, path: str, sig: tuple[int, int, int], value) -> None:
+        if self.db is not None:
+            self._puts.append((self.root, kind, path, *sig, json.dumps(value), self._now))
+
+    def close(self) -> None:
+        if self.db is None:
+            return
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO derived_by_root VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                self._puts)
+            self.db.executemany("UPDATE derived_by_root SET last_used=? WHERE root=? AND kind=? AND path=?",
+                                self._touched)
+            cur = self.db.execute(
+                "DELETE FROM derived_by_root WHERE last_used < ?",
+                (self._now - self.max_age_days * 86400,),
+            )
+            self.evicted = cur.rowcount
+        self.db.close()
+        self.db = None
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Vylučování cest (EXCLUDE_DIRS/FILES/EXTS/GLOBS) a průchod stromem s prořezáním.
+
+Používají unity_dump/dump22.py, dump33.py, dump44.py a dump_scripts22.py;
+každý skript si z vlastních maker sestaví jeden ExcludeMatcher.
+"""
+
+from pathlib import Path
+import fnmatch
+import os
+import re
+
+def norm_lower(s: str) -> str:
+    return s.casefold()
+
+# "**/*.dll" a "**/Temp/**" jdou otestovat bez regexu (viz GlobSet)
+_RE_GLOB_SUFFIX = re.compile(r"\*\*/\*(\.[^*?\[\]/]+)")
+_RE_GLOB_SEGMENT = re.compile(r"\*\*/([^*?\[\]/]+)/\*\*")
+
+class GlobSet:
+    """
+    Sada glob vzorů zkompilovaná jednou. Výsledek odpovídá smyčce
+    `any(fnmatch.fnmatch(cesta, vzor) ...)` nad casefold cestou, jen bez
+    opakovaného překladu vzorů:
+    - "**/*.ext"  -> cesta obsahuje "/" a končí ".ext"
+    - "**/dir/**" -> cesta obsahuje "/dir/"
+    - ostatní     -> jeden společný regex (fnmatch.translate spojené přes |)
+    """
+    def __init__(self, patterns):
+        suffixes, segments, rest, dir_rest = [], [], [], []
+        for pattern in patterns:
+            pat = norm_lower(pattern)
+            if m := _RE_GLOB_SUFFIX.fullmatch(pat):
+                suffixes.append(m.group(1))
+            elif m := _RE_GLOB_SEGMENT.fullmatch(pat):
+                segments.append(f"/{m.group(1)}/")
+            else:
+                rest.append(fnmatch.translate(pat))
+                if pat.endswith("*"):
+                    dir_rest.append(rest[-1])
+        self.suffixes = tuple(suffixes)
+        self.segments = tuple(segments)
+        self.regex = re.compile("|".join(rest)) if rest else None
+        # vzory končící "*": když matchnou "složka/", matchnou i cokoliv uvnitř
+        self.dir_regex = re.compile("|".join(dir_rest)) if dir_rest else None
+
+    def match(self, rel_lower: str) -> bool:
+        if self.suffixes and rel_lower.endswith(self.suffixes) and "/" in rel_lower:
+            return True
+        for seg in self.segments:
+            if seg in rel_lower:
+                return True
+        return self.regex is not None and self.regex.match(rel_lower) is not None
+
+    def match_dir(self, rel_dir_lower: str) -> bool:
+        """True, pokud vzory zaručeně vyloučí VŠECHNY cesty pod složkou."""
+        prefix = rel_dir_lower + "/"
+        for seg in self.segments:
+            if seg in prefix:
+                return True
+        return self.dir_regex is not None and self.dir_regex.match(prefix) is not None
+
+def match_any_glob(rel_path: Path, patterns) -> bool:
+    if not isinstance(patterns, GlobSet):
+        patterns = GlobSet(patterns)
+    return patterns.match(rel_path.as_posix().casefold())
+
+class ExcludeMatcher:
+    """EXCLUDE_DIRS/FILES/EXTS/GLOBS převedené na množiny + GlobSet; jedna kontrola na cestu."""
+    def __init__(self, dirs, files, exts, globs):
+        self.dirs = frozenset(norm_lower(d) for d in dirs)
+        self.files = frozenset(norm_lower(f) for f in files)
+        self.exts = frozenset(norm_lower(e) for e in exts)
+        self.globs = GlobSet(globs)
+
+    def match_posix(self, rel_posix: str) -> bool:
+        rel_lower = norm_lower(rel_posix)
+        parts = rel_lower.split("/")
+        if not self.dirs.isdisjoint(parts):
+            return True
+        name = parts[-1]
+        if name in self.files:
+            return True
+        # stejné jako Path.suffix: ".gitignore" ani "soubor." příponu nemají
+        dot = name.rfind(".")
+        if 0 < dot < len(name) - 1 and name[dot + 1:] in self.exts:
+            return True
+        return self.globs.match(rel_lower)
+
+    def __call__(self, rel_path: Path) -> bool:
+        return self.match_posix(rel_path.as_posix())
+
+    def prunes_dir(self, rel_dir_posix: str) -> bool:
+        """Lze složku při průchodu úplně přeskočit? (jméno v EXCLUDE_DIRS nebo adresářový glob)"""
+        rel_lower = norm_lower(rel_dir_posix)
+        if rel_lower.rpartition("/")[2] in self.dirs:
+            return True
+        return self.globs.match_dir(rel_lower)
+
+def new_walk_stats() -> dict[str, int]:
+    """Počítadla průchodu (skripty je vypisují do patičky dumpu)."""
+    return {"listed_dirs": 0, "pruned_dirs": 0}
+
+def scan_dir(abs_dir: str, stats: dict[str, int]) -> list[os.DirEntry]:
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = list(it)
+    except OSError:
+        return []
+    stats["listed_dirs"] += 1
+    return entries
+
+def walk_files(root: Path, matcher: ExcludeMatcher, stats: dict[str, int],
+               dirs: list[str] | None = None):
+    """
+    Vygeneruje (relativní posix cesta, DirEntry) všech nevyloučených souborů pod root.
+    Používá os.scandir a do složek zamítnutých EXCLUDE_DIRS / adresářovým globem
+    vůbec nevstoupí (Library/, Temp/, obj/ se tak ani nelistují, ani nestatují).
+    Do `dirs` (pokud je zadán) přidá relativní cesty nevyloučených složek, včetně
+    těch přeskočených adresářovým globem (strom je ukáže, ale nevstoupí do nich).
+    """
+    stack = [("", str(root))]
+    while stack:
+        rel_dir, abs_dir = stack.pop()
+        subdirs = []
+        for entry in scan_dir(abs_dir, stats):
+            rel = rel_dir + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if dirs is not None and not matcher.match_posix(rel):
+                        dirs.append(rel)
+                    if matcher.prunes_dir(rel):
+                        stats["pruned_dirs"] += 1
+                    else:
+                        subdirs.append((rel + "/", entry.path))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if not matcher.match_posix(rel):
+                yield rel, entry
+        # obrácené pořadí na zásobník => složky se procházejí v pořadí scandir
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Komprimovaný výstup dumperů (OUTPUT_COMPRESSION = None, "gzip", "xz", "zstd").
+
+Používají unity_dump/dump44.py, android_dump/dump33.py (včetně shardů),
+android_dump/aar/peek_all.py a visual_studio_dump/dump33.py. Makra
+(OUTPUT_COMPRESSION, COMPRESSION_LEVEL, COMPRESSION_THREADS,
+COMPRESSION_BLOCK_BYTES) zůstávají ve skriptech a předávají se sem.
+Neznámý kodek i chybějící zstandard hlásí jediné místo, check_compression();
+skripty ho volají na začátku main(), ještě než cokoli zapíšou.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import gzip
+import io
+import lzma
+import os
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "xz": ".xz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "xz": 6, "zstd": 3}
+
+def check_compression(compression: str | None) -> None:
+    """SystemExit, pokud kodek neznáme nebo pro něj chybí balíček."""
+    if compression is None:
+        return
+    if compression not in COMPRESSION_SUFFIXES:
+        raise SystemExit(f"Chyba: neznámá OUTPUT_COMPRESSION {compression!r} (None, gzip, xz, zstd).")
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise SystemExit("Chyba: OUTPUT_COMPRESSION = 'zstd' vyžaduje balíček zstandard "
+                             "(pip install zstandard).") from None
+
+def compressed_name(name: str, compression: str | None) -> str:
+    """Jméno výstupu s příponou kodeku (dump.txt -> dump.txt.gz)."""
+    return name + COMPRESSION_SUFFIXES.get(compression, "")
+
+class ParallelBlockWriter(io.RawIOBase):
+    """
+    Binární proud, který data dělí na bloky a každý komprimuje samostatně ve
+    vlákně (zlib i lzma uvolňují GIL); bloky jdou ven v původním pořadí
+    a rozpracovaných je nejvýš 2 * threads.
+    """
+
+    def __init__(self, raw, compress, threads: int, block_bytes: int) -> None:
+        super().__init__()
+        self.raw = raw
+        self.compress = compress
+        self.block_bytes = block_bytes
+        self.buf = bytearray()
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+        self.pending: deque = deque()
+        self.max_pending = 2 * threads
+        self.blocks = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self.raw.fileno()
+
+    def write(self, data) -> int:
+        self.buf += data
+        while len(self.buf) >= self.block_bytes:
+            self._submit(bytes(self.buf[:self.block_bytes]))
+            del self.buf[:self.block_bytes]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self.pending.append(self.pool.submit(self.compress, block))
+        self.blocks += 1
+        while len(self.pending) > self.max_pending:
+            self.raw.write(self.pending.popleft().result())
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            # prázdný výstup = jeden prázdný člen, jinak by ho gunzip odmítl
+            if self.buf or not self.blocks:
+                self._submit(bytes(self.buf))
+                self.buf.clear()
+            while self.pending:
+                self.raw.write(self.pending.popleft().result())
+        finally:
+            self.pool.shutdown()
+            self.raw.close()
+            super().close()
+
+def open_binary_output(path: str | Path, compression: str | None, level: int | None = None,
+                       threads: int = 0, block_bytes: int = 1 << 20, buffer_bytes: int = 1 << 20):
+    """
+    Binární proud do `path`, podle `compression` rovnou komprimovaný.
+    threads = 0 znamená os.cpu_count(); gzip/xz s víc vlákny komprimují po
+    blocích v ParallelBlockWriter (jako pigz/pixz), zstd má vlákna vlastní.
+    """
+    check_compression(compression)
+    if compression is None:
+        return open(path, "wb", buffering=buffer_bytes)
+    threads = threads or os.cpu_count() or 1
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+
+    if compression == "zstd":
+        import zstandard
+        cctx = zstandard.ZstdCompressor(level=level, threads=threads if threads > 1 else 0)
+        return cctx.stream_writer(open(path, "wb"), closefd=True)
+    if threads > 1:
+        if compression == "gzip":
+            compress = lambda block: gzip.compress(block, level, mtime=0)
+        else:
+            compress = lambda block: lzma.compress(block, preset=level)
+        return io.BufferedWriter(ParallelBlockWriter(open(path, "wb"), compress, threads, block_bytes),
+                                 buffer_bytes)
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=level)
+    return lzma.open(path, "wb", preset=level)
+
+def open_text_output(path: str | Path, compression: str | None, level: int | None = None,
+                     threads: int = 0, block_bytes: int = 1 << 20, buffer_bytes: int = 1 << 20):
+    """Textový proud (UTF-8) do `path`; komprese viz open_binary_output."""
+    if compression is None:
+        return open(path, "w", encoding="utf-8", errors="replace", buffering=buffer_bytes)
+    binary = open_binary_output(path, compression, level, threads, block_bytes, buffer_bytes)
+    return io.TextIOWrapper(binary, encoding="utf-8", errors="replace")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Rozpoznání obsahu podle prvních bajtů souboru: text vs. binární data
+a známé binární formáty (signatury).
+
+Používají android_dump/dump33.py a visual_studio_dump/dump.py, aby o tom, co
+je text a co známá binárka, rozhodovala stejná pravidla. Práh (podíl textových
+bajtů) zůstává makrem TEXT_MIN_PRINTABLE_RATIO v každém skriptu.
+"""
+
+import string
+import struct
+
+# ASCII tisknutelné znaky + bajty >= 0x80 (UTF-8 sekvence, např. diakritika).
+# bytes.translate je smaže najednou v C, zbytek jsou "binární" bajty.
+TEXT_BYTES = bytes(string.printable, "ascii") + bytes(range(0x80, 0x100))
+
+def is_probably_text(head: bytes, min_ratio: float) -> bool:
+    """Bez NUL a aspoň min_ratio textových bajtů; prázdný soubor je text."""
+    if b"\x00" in head:
+        return False
+    if not head:
+        return True
+    kept = len(head) - len(head.translate(None, TEXT_BYTES))
+    return kept / len(head) >= min_ratio
+
+# Známé binární formáty podle prvních bajtů (stačí prvních 16 B, žádné dekódování).
+# "MZ" tu není: tak může začínat i obyčejný text, PE se ověřuje zvlášť (is_pe).
+MAGIC_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"PK\x03\x04", "ZIP/JAR/AAR"),
+    (b"PK\x05\x06", "ZIP"),
+    (b"\x7fELF", "ELF"),
+    (b"dex\n", "DEX"),
+    (b"\xca\xfe\xba\xbe", "Java class"),
+    (b"\x1f\x8b", "gzip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"7z\xbc\xaf\x27\x1c", "7z"),
+    (b"Rar!\x1a\x07", "RAR"),
+    (b"%PDF-", "PDF"),
+    (b"UnityFS\x00", "Unity AssetBundle"),
+    (b"OggS", "Ogg"),
+    (b"fLaC", "FLAC"),
+    (b"RIFF", "RIFF (wav/webp/avi)"),
+]
+MAGIC_HEAD_BYTES = 16
+
+def is_pe(head: bytes) -> bool:
+    """
+    PE (exe/dll/sys): "MZ" + e_lfanew (uint32 LE na 0x3C) ukazuje na "PE\\0\\0"
+    uvnitř načteného začátku souboru. Samotné "MZ" nestačí.
+    """
+    if not head.startswith(b"MZ") or len(head) < 0x40:
+        return False
+    (pe_offset,) = struct.unpack_from("<I", head, 0x3C)
+    return 0x40 <= pe_offset <= len(head) - 4 and head[pe_offset:pe_offset + 4] == b"PE\x00\x00"
+
+def is_unity_serialized(head: bytes, size: int | None) -> bool:
+    """Binárně serializovaný Unity soubor (.asset/.unity/.prefab v režimu Force Binary)."""
+    if len(head) < 16:
+        return False
+    metadata_size, file_size, version, data_offset = struct.unpack(">IIII", head[:16])
+    if 22 <= version <= 64:
+        # od verze 22 jsou velikosti v 64bit polích dál, tady zůstávají nuly
+        return metadata_size == 0 and file_size == 0 and data_offset == 0
+    if 9 <= version < 22:
+        if size is not None and file_size != size:
+            return False
+        return 0 < metadata_size < file_size and metadata_size < data_offset <= file_size
+    return False
+
+def sniff_magic(head: bytes, size: int | None = None) -> str | None:
+    """
+    Název formátu podle signatury v prvních MAGIC_HEAD_BYTES bajtech, jinak None.
+    `head` má být celý už načtený začátek souboru (kvůli hlavičce PE).
+    """
+    start = head[:MAGIC_HEAD_BYTES]
+    for signature, kind in MAGIC_SIGNATURES:
+        if start.startswith(signature):
+            return kind
+    if is_pe(head):
+        return "PE (exe/dll)"
+    if start.startswith(b"BZh") and start[3:4].isdigit():
+        return "bzip2"
+    if is_unity_serialized(start, size):
+        return "Unity serialized"
+    return None
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jednotný vstupní bod pro všechny dumpery.
+
+    python py_dumps.py android CESTA [--out-dir ...]
+    python py_dumps.py unity CESTA [-o ...] [--since-manifest ...]
+    python py_dumps.py unity-scripts CESTA [-o ...]
+    python py_dumps.py vs CESTA [--out-dir ...]
+    python py_dumps.py aar [SOUBORY.aar ...] [--glob ...]
+    python py_dumps.py auto CESTA [--out-dir ...]
+
+Každý přepínač má `dest` shodný s konstantou (makrem) v daném skriptu;
+po načtení backendu se hodnoty jen přepíšou a zavolá se jeho main().
+Backend se importuje až po parsování argumentů, takže --help a chybné
+argumenty nic těžkého nenačítají.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# podpříkaz -> skript s backendem (relativně ke kořeni repozitáře)
+BACKENDS = {
+    "android": "android_dump/dump33.py",
+    "unity": "unity_dump/dump44.py",
+    "unity-scripts": "unity_dump/dump_scripts22.py",
+    "vs": "visual_studio_dump/dump33.py",
+    "aar": "android_dump/aar/peek_all.py",
+}
+
+
+# typ projektu (podle značek v kořeni) -> podpříkaz; pořadí = priorita,
+# Unity generuje .sln/.csproj, proto je před dotnet
+AUTO_BACKENDS = (
+    ("unity", "unity"),
+    ("gradle", "android"),
+    ("dotnet", "vs"),
+)
+
+
+def detect_project_type(root: str) -> str | None:
+    """Typ projektu podle levných značek v kořeni (jeden scandir, bez čtení obsahu)."""
+    try:
+        with os.scandir(root) as it:
+            names = {e.name for e in it}
+    except OSError:
+        return None
+    if "ProjectSettings" in names and os.path.isfile(os.path.join(root, "ProjectSettings", "ProjectVersion.txt")):
+        return "unity"
+    if "settings.gradle" in names or "settings.gradle.kts" in names:
+        return "gradle"
+    if any(n.endswith((".sln", ".csproj")) for n in names):
+        return "dotnet"
+    if "package.json" in names:
+        return "node"
+    return None
+
+
+def load_backend(command: str):
+    """
+    Načte skript backendu ze souboru (bez spuštění jeho __main__ bloku).
+    Modul dostane jméno podle souboru a jeho složka jde do sys.path, aby ho
+    procesy poolu (spawn na Windows/macOS) uměly naimportovat znovu.
+    """
+    path = os.path.join(REPO_DIR, BACKENDS[command])
+    directory, filename = os.path.split(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = os.path.splitext(filename)[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def abs_path(value: str) -> str:
+    return os.path.abspath(os.path.expanduser(value))
+
+
+def as_path(value: str):
+    from pathlib import Path
+    return Path(abs_path(value))
+
+
+def add_off_switch(p: argparse.ArgumentParser, flag: str, dest: str, help: str) -> None:
+    p.add_argument(flag, dest=dest, action="store_const", const=False, default=None, help=help)
+
+
+def add_on_switch(p: argparse.ArgumentParser, flag: str, dest: str, help: str) -> None:
+    p.add_argument(flag, dest=dest, action="store_const", const=True, default=None, help=help)
+
+
+def add_format_option(p: argparse.ArgumentParser, dest: str = "OUTPUT_FORMAT") -> None:
+    p.add_argument("--format", dest=dest, choices=("txt", "jsonl"),
+                   help="formát výstupu: txt (výchozí) nebo jsonl (jeden JSON záznam na řádek)")
+
+
+def add_compression_options(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--compress", dest="OUTPUT_COMPRESSION", choices=("gzip", "xz", "zstd"),
+                   help="zapisovat výstup rovnou komprimovaný (zstd vyžaduje balíček zstandard)")
+    p.add_argument("--compress-threads", dest="COMPRESSION_THREADS", type=int, metavar="N",
+                   help="vlákna pro kompresi po blocích (1 = jeden stream, 0 = počet jader)")
+
+
+def add_shard_options(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--shard-bytes", dest="SHARD_MAX_BYTES", type=int, metavar="N",
+                   help="rozdělit výstup do shardů po nejvýš N bajtech (+ index.json)")
+    p.add_argument("--shard-lines", dest="SHARD_MAX_LINES", type=int, metavar="N",
+                   help="rozdělit výstup do shardů po nejvýš N řádcích (+ index.json)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="py_dumps",
+        description="Textové dumpy projektů (Android, Unity, Visual Studio, AAR).",
+    )
+    sub = parser.add_subparsers(dest="command", metavar="PŘÍKAZ")
+    sub.required = True
+
+    # --- android_dump/dump33.py
+    p = sub.add_parser("android", help="strom a obsah souborů Android projektu")
+    p.add_argument("TARGET_SUBDIR", metavar="CESTA", type=abs_path, help="kořen projektu")
+    p.add_argument("--out-dir", dest="OUTPUT_DIR", type=as_path, help="složka pro výstup")
+    p.add_argument("--basename", dest="OUTPUT_BASENAME", help="název výstupu bez přípony")
+    add_on_switch(p, "--timestamp", "AUTO_TIMESTAMP", "časové razítko v názvu výstupu")
+    p.add_argument("--max-depth", dest="MAX_DEPTH", type=int, help="maximální hloubka stromu")
+    add_off_switch(p, "--no-contents", "INCLUDE_FILE_CONTENTS", "jen strom, bez obsahu souborů")
+    p.add_argument("--content-max-bytes", dest="CONTENT_MAX_BYTES", type=int,
+                   help="limit náhledu obsahu na soubor")
+    add_on_switch(p, "--hidden", "INCLUDE_HIDDEN", "zahrnout skryté soubory a složky")
+    add_on_switch(p, "--ascii", "TREE_ASCII_ONLY", "ASCII větve stromu místo Unicode")
+    add_off_switch(p, "--no-dedup", "DEDUP_CONTENTS", "vypsat i soubory se shodným obsahem")
+    add_off_switch(p, "--no-profiles", "AUTO_PROFILES",
+                   "nepřidávat výjimky podle typu projektu detekovaného v podstromech")
+    add_format_option(p)
+    add_compression_options(p)
+    add_shard_options(p)
+
+    # --- unity_dump/dump44.py
+    p = sub.add_parser("unity", help="kompletní dump Unity projektu")
+    p.add_argument("ROOT_DIR", metavar="CESTA", type=as_path, help="kořen Unity projektu")
+    p.add_argument("-o", "--output", dest="OUTPUT_FILE", type=abs_path,
+                   help="výstupní soubor nebo složka (podporuje {project}, {date}, {ts})")
+    add_off_switch(p, "--no-zip", "CREATE_MIN_ZIP", "nevytvářet ZIP s minimálním repro")
+    p.add_argument("--workers", dest="IO_WORKERS", type=int, help="počet vláken pro čtení")
+    add_off_switch(p, "--no-cache", "USE_CACHE", "nepoužívat SQLite cache")
+    add_on_switch(p, "--manifest", "WRITE_MANIFEST",
+                  "zapsat manifest pro --since-manifest (první běh hashuje všechny soubory)")
+    add_off_switch(p, "--no-dedup", "DEDUP_SCRIPTS", "vypsat i skripty se shodným obsahem")
+    p.add_argument("--since-manifest", dest="SINCE_MANIFEST", type=abs_path,
+                   help="delta dump proti dřívějšímu manifestu")
+    add_format_option(p)
+    add_compression_options(p)
+
+    # --- unity_dump/dump_scripts22.py
+    p = sub.add_parser("unity-scripts", help="kompaktní dump skriptů Unity projektu")
+    p.add_argument("ROOT_DIR", metavar="CESTA", type=as_path, help="kořen Unity projektu")
+    p.add_argument("-o", "--output", dest="OUTPUT_FILE", type=abs_path,
+                   help="výstupní soubor nebo složka (podporuje {project}, {date}, {ts})")
+    add_on_switch(p, "--tree", "INCLUDE_TREE", "přidat limitovaný strom složek")
+    add_on_switch(p, "--yaml", "INCLUDE_YAML_ASSETS", "přidat prefaby, scény a další YAML assety")
+    add_on_switch(p, "--noisy", "INCLUDE_NOISY", "zahrnout i shadery (.shader, .cginc, .hlsl…), složky Shaders, Gizmos,"
+                  " Editor Default Resources a TextMesh Pro (generované a vendor skripty zůstávají vynechané)")
+    p.add_argument("--max-lines", dest="MAX_TOTAL_LINES", type=int, help="limit řádků výstupu")
+    p.add_argument("--max-chars", dest="MAX_TOTAL_CHARS", type=int, help="limit znaků výstupu")
+    p.add_argument("--max-tokens", dest="MAX_TOTAL_TOKENS", type=int,
+                   help="limit výstupu v odhadovaných tokenech LLM")
+    add_on_switch(p, "--plan", "PLAN_SNIPPETS",
+                  "ukázky vybrat plánováním rozpočtu (knapsack) místo postupného plnění")
+    add_off_switch(p, "--no-dedup", "DEDUP_SNIPPETS", "ukázat i skripty se shodným obsahem")
+    p.add_argument("--script-workers", dest="SCRIPT_WORKERS", type=int, metavar="N",
+                   help="procesy pro analýzu a ukázky skriptů (1 = sériově, 0 = počet jader)")
+    add_shard_options(p)
+    add_off_switch(p, "--no-cache", "USE_CACHE", "nepoužívat SQLite cache")
+    add_on_switch(p, "--manifest", "WRITE_MANIFEST",
+                  "zapsat manifest pro --since-manifest (první běh hashuje všechny skripty)")
+    p.add_argument("--since-manifest", dest="SINCE_MANIFEST", type=abs_path,
+                   help="delta dump proti dřívějšímu manifestu")
+    add_format_option(p)
+
+    # --- visual_studio_dump/dump33.py
+    p = sub.add_parser("vs", help="dump zdrojových kódů Visual Studio řešení")
+    p.add_argument("SOURCE_FOLDER", metavar="CESTA", type=abs_path, help="složka s řešením")
+    p.add_argument("--out-dir", dest="OUTPUT_FOLDER", type=abs_path,
+                   help="složka pro výstup (výchozí je složka řešení)")
+    p.add_argument("--output-name", dest="OUTPUT_FILENAME", help="název výstupního souboru")
+    p.add_argument("--max-file-bytes", dest="MAX_FILE_BYTES", type=int,
+                   help="větší soubory se zkrátí na začátek a konec")
+    add_off_switch(p, "--no-dedup", "DEDUP_CONTENTS", "vypsat i soubory se shodným obsahem")
+    add_format_option(p)
+    add_compression_options(p)
+
+    # --- android_dump/aar/peek_all.py
+    p = sub.add_parser("aar", help="rozbor AAR knihoven (třídy, metody, API)")
+    p.add_argument("AAR_PATHS", metavar="SOUBOR", nargs="*", type=abs_path, help="AAR soubory")
+    p.add_argument("--glob", dest="AAR_GLOB", help="vzor pro vyhledání AAR, pokud nejsou zadány soubory")
+    p.add_argument("--out-dir", dest="OUTPUT_DIR", type=abs_path, help="složka pro výstup")
+    p.add_argument("--prefix", dest="OUTPUT_PREFIX", help="prefix názvu výstupních souborů")
+    add_format_option(p)
+    add_compression_options(p)
+
+    # --- autodetekce
+    p = sub.add_parser("auto", help="vybere dumper podle typu projektu v CESTA")
+    p.add_argument("path", metavar="CESTA", type=abs_path, help="kořen projektu")
+    p.add_argument("--out-dir", dest="out_dir", type=abs_path, help="složka pro výstup")
+    add_format_option(p, "out_format")
+
+    return parser
+
+
+def resolve_auto(args: argparse.Namespace) -> argparse.Namespace:
+    """Přeloží `auto CESTA` na argumenty odpovídajícího podpříkazu."""
+    kind = detect_project_type(args.path)
+    command = dict(AUTO_BACKENDS).get(kind, "android")
+    print(f"Detekováno: {kind or 'neznámý typ'} -> {command} ({BACKENDS[command]})")
+    if command == "android" and kind != "gradle":
+        # smíšené repo / node: android dumper detekuje typ v každém podstromu sám
+        print("Výjimky (Library/, node_modules/, bin/obj…) se přidají podle projektů nalezených v podsložkách.")
+
+    argv = [command, args.path]
+    if args.out_dir:
+        # unity bere složku v -o a vytvoří v ní dump_{project}_{ts}.txt
+        argv += ["-o" if command == "unity" else "--out-dir", args.out_dir]
+    if args.out_format:
+        argv += ["--format", args.out_format]
+    return build_parser().parse_args(argv)
+
+
+def apply_overrides(module, args: argparse.Namespace) -> None:
+    """Přepíše konstanty backendu hodnotami, které byly opravdu zadány."""
+    for name, value in vars(args).items():
+        if name.isupper() and value is not None:
+            setattr(module, name, value)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command == "auto":
+        args = resolve_auto(args)
+
+    if args.command == "aar":
+        # peek_all bere AAR_PATHS přednostně a jinak čte sys.argv, proto
+        # se glob rozbalí tady a backend dostane vždy explicitní seznam
+        if not args.AAR_PATHS:
+            args.AAR_PATHS = None
+            if args.AAR_GLOB:
+                from glob import glob
+                args.AAR_PATHS = sorted(glob(args.AAR_GLOB))
+
+    if args.command == "vs" and args.OUTPUT_FOLDER is None:
+        args.OUTPUT_FOLDER = ""
+
+    module = load_backend(args.command)
+    apply_overrides(module, args)
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,13 @@
 
 from pathlib import Path
 from datetime import datetime
-import fnmatch
+import sys
+
+# sdílené moduly (dump_common/) leží v kořeni repozitáře
+_REPO_DIR = str(Path(__file__).resolve().parent.parent)
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common.matcher import ExcludeMatcher, new_walk_stats, walk_files as _walk_files
 
 # === Nastavení (změň podle potřeby) ==========================================
 # ROOT_DIR = Path(r"C:\Users\volny\Documents\the last human\the-last-human")   # <- kořenová složka
@@ -45,8 +51,14 @@ EXCLUDE_GLOBS = {
 }
 # ============================================================================
 
-def norm_lower(s: str) -> str:
-    return s.casefold()
+_EXCLUDE_MATCHER = None
+
+def exclude_matcher() -> ExcludeMatcher:
+    # sestaví se až při prvním použití, aby šla makra přepsat před main()
+    global _EXCLUDE_MATCHER
+    if _EXCLUDE_MATCHER is None:
+        _EXCLUDE_MATCHER = ExcludeMatcher(EXCLUDE_DIRS, EXCLUDE_FILES, EXCLUDE_EXTS, EXCLUDE_GLOBS)
+    return _EXCLUDE_MATCHER
 
 def is_excluded(rel_path: Path) -> bool:
     """
@@ -56,40 +68,18 @@ def is_excluded(rel_path: Path) -> bool:
     - přesný název souboru v EXCLUDE_FILES
     - příponu souboru v EXCLUDE_EXTS
     - glob vzory v EXCLUDE_GLOBS (vůči relativní cestě)
+    Pravidla se kompilují jednou (ExcludeMatcher), ne pro každý soubor znovu.
     """
-    # 1) části cesty (složky) – case-insensitive
-    for part in rel_path.parts:
-        if norm_lower(part) in EXCLUDE_DIRS:
-            return True
-
-    # 2) přesný název souboru
-    name_lower = norm_lower(rel_path.name)
-    if name_lower in EXCLUDE_FILES:
-        return True
-
-    # 3) přípona (bez tečky)
-    if rel_path.suffix:
-        ext = norm_lower(rel_path.suffix.lstrip("."))
-        if ext in EXCLUDE_EXTS:
-            return True
-
-    # 4) glob vzory
-    #   Path.match je case-sensitive na *některých* platformách; proto srovnáme
-    #   s POSIX-like stringem a použijeme fnmatch (case-insensitive).
-    rel_as_posix = norm_lower(rel_path.as_posix())
-    for pattern in EXCLUDE_GLOBS:
-        if fnmatch.fnmatch(rel_as_posix, norm_lower(pattern)):
-            return True
-
-    return False
+    return exclude_matcher()(rel_path)
+
+# Počítadla průchodu
+WALK_STATS = new_walk_stats()
 
 def iter_all_files(root: Path):
     """Vygeneruje relativní cesty všech souborů pod root (rekurzivně) s ignorováním."""
-    for p in root.rglob("*"):
-        if p.is_file():
-            rel = p.relative_to(root)
-            if not is_excluded(rel):
-                yield rel
+    # do vyloučených složek (Library/, Temp/…) vůbec nevstoupí, místo rglob + filtru
+    for rel, _entry in _walk_files(root, exclude_matcher(), WALK_STATS):
+        yield Path(rel)
 
 def write_tree(dir_path: Path, out, prefix: str = "", root: Path = None):
     """
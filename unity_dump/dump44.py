@@ -3,11 +3,27 @@
 
 from pathlib import Path
 from datetime import datetime
-import fnmatch
+import contextlib
 import hashlib
 import json
+import os
 import re
+import sys
+import threading
+import time
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+# sdílené moduly (dump_common/) leží v kořeni repozitáře
+_REPO_DIR = str(Path(__file__).resolve().parent.parent)
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common.matcher import ExcludeMatcher, new_walk_stats, norm_lower
+from dump_common.matcher import scan_dir as _scan_dir, walk_files as _walk_files
+from dump_common.cache import DerivedCache
+from dump_common.output import check_compression, compressed_name, open_text_output
 
 # === Nastavení (změň podle potřeby) ==========================================
 ROOT_DIR = Path(r"C:\Users\volny\Documents\unity tutorial\Prvni_hra")
@@ -41,6 +57,7 @@ EXCLUDE_DIRS = {
 # 2) Ignorované přesné názvy souborů (bez cest)
 EXCLUDE_FILES = {
     "dump.txt",
+    ".dump_cache.sqlite",
 }
 
 # 3) Ignorované přípony (bez tečky)
@@ -62,37 +79,291 @@ EXCLUDE_GLOBS = {
 # 5) Jaké přípony považovat za "skripty" a zda omezit velikost při výpisu
 SCRIPT_EXTS = {"cs", "js", "ts", "shader", "compute", "cginc"}
 MAX_SCRIPT_BYTES = 2_000_000  # bezpečnostní limit na čtení obsahu
+
+# 6) Paralelní čtení a hashování (I/O + hashlib uvolňuje GIL); 0/1 = sériově
+IO_WORKERS = 8
+
+# 7) Cache odvozených dat (hashe, GUIDy, reference) mezi běhy – SQLite vedle výstupu
+USE_CACHE = True
+CACHE_FILE_NAME = ".dump_cache.sqlite"
+CACHE_MAX_AGE_DAYS = 30
+
+# 8) Manifest (cesta, velikost, mtime, sha256) vedle výstupu a delta režim:
+#    SINCE_MANIFEST = cesta k manifestu předchozího dumpu -> vypíše jen přidané,
+#    změněné a smazané soubory (lze zadat i jako --since-manifest PATH).
+#    WRITE_MANIFEST je volitelný: první manifest hashuje všechny soubory indexu,
+#    další už jen ty se změněnou velikostí/mtime (delta režim ho zapisuje vždy).
+WRITE_MANIFEST = False
+SINCE_MANIFEST = None
+
+# 9) Profilování: wall/CPU čas, stat/open a přečtené/zapsané bajty po sekcích
+#    + PROFILE_TOP_FILES nejpomalejších souborů. Patička dumpu a JSON vedle
+#    výstupu (*.profile.json); vypnuto = jen prázdná volání.
+PROFILE = False
+PROFILE_TOP_FILES = 15
+
+# 10) Formát výstupu: "txt" (Markdown-like dump) nebo "jsonl" (NDJSON, jeden
+#     záznam na řádek: dump/project/dir/file/script/script_ref/ui_tmp/hash/...,
+#     zapisuje se průběžně; přípona výstupu se změní na .jsonl)
+OUTPUT_FORMAT = "txt"
+
+# 11) Komprese výstupu: None, "gzip", "xz" nebo "zstd" (vyžaduje balíček zstandard);
+#     k názvu se přidá .gz/.xz/.zst, zapisuje se rovnou komprimovaně (manifest,
+#     profil a ZIP zůstávají beze změny). COMPRESSION_THREADS > 1 = jako pigz:
+#     bloky po COMPRESSION_BLOCK_BYTES se komprimují samostatně ve vláknech
+#     (samostatné gzip členy / xz streamy); zstd má vlastní vlákna. 0 = počet jader.
+OUTPUT_COMPRESSION = None
+COMPRESSION_LEVEL = None  # None = výchozí úroveň kodeku
+COMPRESSION_THREADS = 0
+COMPRESSION_BLOCK_BYTES = 1 << 20
+
+# 12) Duplicitní skripty: stejný SHA256 (počítá se pro každý skript tak jako tak)
+#     => obsah se vypíše jen u první cesty, další kopie odkazují na ni.
+#     Menší než DEDUP_MIN_BYTES se vypisují vždy.
+DEDUP_SCRIPTS = True
+DEDUP_MIN_BYTES = 128
 # ============================================================================
 
 GUID_RE = re.compile(r"guid:\s*([0-9a-fA-F]{32})")
 SCRIPT_GUID_RE = re.compile(r"m_Script:\s*\{[^}]*guid:\s*([0-9a-fA-F]{32})", re.MULTILINE)
 
-def norm_lower(s: str) -> str:
-    return s.casefold()
+_EXCLUDE_MATCHER = None
+
+def exclude_matcher() -> ExcludeMatcher:
+    # sestaví se až při prvním použití, aby šla makra přepsat před main()
+    global _EXCLUDE_MATCHER
+    if _EXCLUDE_MATCHER is None:
+        _EXCLUDE_MATCHER = ExcludeMatcher(EXCLUDE_DIRS, EXCLUDE_FILES, EXCLUDE_EXTS, EXCLUDE_GLOBS)
+    return _EXCLUDE_MATCHER
 
 def is_excluded(rel_path: Path) -> bool:
-    for part in rel_path.parts:
-        if norm_lower(part) in EXCLUDE_DIRS:
-            return True
-    name_lower = norm_lower(rel_path.name)
-    if name_lower in EXCLUDE_FILES:
-        return True
-    if rel_path.suffix:
-        ext = norm_lower(rel_path.suffix.lstrip("."))
-        if ext in EXCLUDE_EXTS:
-            return True
-    rel_as_posix = norm_lower(rel_path.as_posix())
-    for pattern in EXCLUDE_GLOBS:
-        if fnmatch.fnmatch(rel_as_posix, norm_lower(pattern)):
-            return True
-    return False
+    return exclude_matcher()(rel_path)
+
+# Počítadla průchodu (vypisují se do patičky dumpu)
+WALK_STATS = new_walk_stats()
+
+# NEW: profilování sekcí a souborů
+_NULL_CTX = contextlib.nullcontext()
+
+class NullProfiler:
+    """Vypnuté profilování: háčky nic nedělají a nic nealokují."""
+    enabled = False
+
+    def section(self, name: str):
+        return _NULL_CTX
+
+    def file(self, path, nbytes: int = 0):
+        return _NULL_CTX
+
+    def count_stat(self, n: int = 1) -> None:
+        pass
+
+    def count_open(self) -> None:
+        pass
+
+    def count_write(self, nbytes: int) -> None:
+        pass
+
+PROFILER = NullProfiler()
+
+def read_project_text(path: Path) -> str:
+    """read_text(errors="replace") jednoho souboru projektu; započte open do profilu."""
+    PROFILER.count_open()
+    return path.read_text(encoding="utf-8", errors="replace")
+
+def read_proc_io() -> dict[str, int]:
+    """Čítače I/O procesu z /proc/self/io (jen Linux, jinak prázdné)."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+class Profiler:
+    """
+    Sekce: wall a CPU čas, stat (volající přes count_stat), open (file() a
+    read_project_text – tedy otevření souborů projektu dumperem, ne výstup ani
+    cache), přečtené bajty (file()), zapsané bajty (přírůstek výstupu + count_write).
+    Nic globálního (audit hook apod.) neinstaluje, takže jde použít i v procesu,
+    který dumper jen importuje.
+    Vlákna ordered_map se započítají do sekce, která právě běží.
+    """
+    enabled = True
+
+    def __init__(self, root: Path, out):
+        self.root = root
+        self.out = out
+        self.sections: list[dict] = []
+        self.slow_files: list[tuple[float, str, str]] = []
+        self._lock = threading.Lock()
+        self._current: dict | None = None
+        self._t0 = time.perf_counter()
+
+    def _output_size(self) -> int:
+        self.out.flush()
+        return os.fstat(self.out.fileno()).st_size
+
+    @contextlib.contextmanager
+    def section(self, name: str):
+        stats = {"name": name, "wall_s": 0.0, "cpu_s": 0.0, "stat": 0, "open": 0,
+                 "files_read": 0, "bytes_read": 0, "bytes_written": 0}
+        written0 = self._output_size()
+        io0 = read_proc_io()
+        prev, self._current = self._current, stats
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats["wall_s"] = round(time.perf_counter() - t0, 4)
+            stats["cpu_s"] = round(time.process_time() - c0, 4)
+            self._current = prev
+            stats["bytes_written"] += self._output_size() - written0
+            io1 = read_proc_io()
+            for key in ("syscr", "rchar", "wchar"):
+                if key in io1:
+                    stats[key] = io1[key] - io0.get(key, 0)
+            self.sections.append(stats)
+
+    @contextlib.contextmanager
+    def file(self, path, nbytes: int = 0):
+        """Čtení jednoho souboru (uvnitř bloku se otevře právě jednou)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            with self._lock:
+                cur = self._current
+                if cur is not None:
+                    cur["files_read"] += 1
+                    cur["open"] += 1
+                    cur["bytes_read"] += nbytes
+                self.slow_files.append((dt, str(path), cur["name"] if cur else ""))
+                if len(self.slow_files) > 1024 + PROFILE_TOP_FILES:
+                    self.slow_files.sort(reverse=True)
+                    del self.slow_files[PROFILE_TOP_FILES:]
+
+    def _add(self, key: str, n: int) -> None:
+        with self._lock:
+            if self._current is not None:
+                self._current[key] += n
+
+    def count_stat(self, n: int = 1) -> None:
+        self._add("stat", n)
+
+    def count_open(self) -> None:
+        self._add("open", 1)
+
+    def count_write(self, nbytes: int) -> None:
+        self._add("bytes_written", nbytes)
+
+    def top_files(self) -> list[dict]:
+        top = sorted(self.slow_files, reverse=True)[:PROFILE_TOP_FILES]
+        out = []
+        for dt, path, section in top:
+            try:
+                path = Path(path).relative_to(self.root).as_posix()
+            except ValueError:
+                pass
+            out.append({"path": path, "seconds": round(dt, 4), "section": section})
+        return out
+
+    def report(self) -> dict:
+        return {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "total_wall_s": round(time.perf_counter() - self._t0, 4),
+            "sections": self.sections,
+            "slow_files": self.top_files(),
+        }
+
+def write_profile(out, profiler: Profiler) -> None:
+    """Patička s profilem; sekce nad ní (a samotná patička) už nejsou změřené."""
+    out.write("## Profil běhu\n")
+    out.write(f"{'sekce':<22} {'wall s':>8} {'CPU s':>8} {'stat':>7} {'open':>6} {'čteno B':>12} {'zapsáno B':>12}\n")
+    for sec in profiler.sections:
+        out.write(f"{sec['name']:<22} {sec['wall_s']:>8.3f} {sec['cpu_s']:>8.3f} {sec['stat']:>7} "
+                  f"{sec['open']:>6} {sec['bytes_read']:>12} {sec['bytes_written']:>12}\n")
+    top = profiler.top_files()
+    if top:
+        out.write(f"\nNejpomalejší soubory (top {len(top)}):\n")
+        for item in top:
+            out.write(f"- {item['seconds']:.4f} s  {item['path']}  [{item['section']}]\n")
+    out.write("\n")
+
+def profile_path_for(output: Path) -> Path:
+    return output.with_name(output.stem + ".profile.json")
+
+def save_profile(output: Path, profiler: Profiler) -> None:
+    profile_path_for(output).write_text(json.dumps(profiler.report(), ensure_ascii=False, indent=1),
+                                        encoding="utf-8")
+
+def scan_dir(abs_dir: str) -> list[os.DirEntry]:
+    return _scan_dir(abs_dir, WALK_STATS)
+
+def walk_files(root: Path, dirs: list[str] | None = None):
+    """(relativní posix cesta, DirEntry) nevyloučených souborů; prořezaný průchod z dump_common.matcher."""
+    return _walk_files(root, exclude_matcher(), WALK_STATS, dirs)
 
 def iter_all_files(root: Path):
-    for p in root.rglob("*"):
-        if p.is_file():
-            rel = p.relative_to(root)
-            if not is_excluded(rel):
-                yield rel
+    for rel, _entry in walk_files(root):
+        yield Path(rel)
+
+class FileEntry(NamedTuple):
+    rel: Path
+    size: int
+    mtime: float
+    ext: str  # přípona bez tečky, casefold ("" = bez přípony)
+    mtime_ns: int = 0
+    inode: int = 0
+
+    @property
+    def sig(self) -> tuple[int, int, int]:
+        """Podpis pro DerivedCache: změní se s obsahem (velikost, čas, inode)."""
+        return (self.size, self.mtime_ns, self.inode)
+
+class FileIndex:
+    """
+    Jeden průchod stromem -> seznam FileEntry (+ seznam složek) v paměti.
+    Všechny sekce (seznam, strom, skripty, GUID, prefaby, scény, TMP, hashe, ZIP)
+    čtou z indexu místo dalšího rglob / scandir + is_excluded + stat.
+    """
+    def __init__(self, root: Path):
+        self.root = root
+        self.entries: list[FileEntry] = []
+        self.by_path: dict[str, FileEntry] = {}
+        self.dirs: list[str] = []  # relativní posix cesty složek
+        self.listed_dirs = 0       # skutečně provedené scandir
+        self.stat_calls = 0        # skutečně provedené DirEntry.stat()
+        self.passes = 0            # kolik sekcí si vzalo soubory z indexu
+        self._scan()
+
+    def _scan(self):
+        dirs_before = WALK_STATS["listed_dirs"]
+        for rel_posix, dir_entry in walk_files(self.root, self.dirs):
+            self.stat_calls += 1
+            try:
+                st = dir_entry.stat()
+            except OSError:
+                continue
+            rel = Path(rel_posix)
+            entry = FileEntry(rel, st.st_size, st.st_mtime, rel.suffix.lstrip(".").casefold(),
+                              st.st_mtime_ns, st.st_ino)
+            self.entries.append(entry)
+            self.by_path[rel_posix] = entry
+        PROFILER.count_stat(self.stat_calls)
+        self.listed_dirs = WALK_STATS["listed_dirs"] - dirs_before
+
+    def files(self, pred=None) -> list[FileEntry]:
+        """Vrátí (volitelně filtrované) záznamy; žádný další průchod ani stat."""
+        self.passes += 1
+        if pred is None:
+            return list(self.entries)
+        return [e for e in self.entries if pred(e)]
+
+def open_cache(output: Path, root: Path) -> DerivedCache:
+    if not USE_CACHE:
+        return DerivedCache(None)
+    return DerivedCache(output.parent / CACHE_FILE_NAME, root, CACHE_MAX_AGE_DAYS)
 
 def is_script(rel_path: Path) -> bool:
     return rel_path.suffix and rel_path.suffix.lstrip(".").casefold() in SCRIPT_EXTS
@@ -104,58 +375,150 @@ def sha256_file(path: Path) -> str:
             h.update(chunk)
     return h.hexdigest()
 
-def write_tree(dir_path: Path, out, prefix: str = "", root: Path = None):
-    if root is None:
-        root = dir_path
-    entries = []
-    for e in dir_path.iterdir():
-        rel = e.relative_to(root)
-        if not is_excluded(rel):
-            entries.append(e)
-    entries.sort(key=lambda e: (e.is_file(), e.name.lower()))
-    total = len(entries)
-    for i, entry in enumerate(entries):
+def ordered_map(fn, items, workers: int | None = None):
+    """
+    Jako map(fn, items), ale fn běží v thread poolu o `workers` vláknech.
+    Výsledky vrací ve vstupním pořadí (deterministický výstup) a rozpracovaných
+    úloh je nejvýš 2 * workers, takže v paměti je jen okno přečtených souborů.
+    """
+    workers = IO_WORKERS if workers is None else workers
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def load_script(job: tuple[Path, int, str | None]):
+    """
+    Jedno čtení skriptu: SHA256 i text ze stejných bajtů (text jen do MAX_SCRIPT_BYTES).
+    Známý digest (z cache) se nepočítá znovu; velký soubor se pak vůbec nečte.
+    Vrací (digest | výjimka, text | výjimka | None); běží ve vlákně ordered_map.
+    """
+    path, size, digest = job
+    if size > MAX_SCRIPT_BYTES:
+        if digest is not None:
+            return digest, None
+        try:
+            with PROFILER.file(path, size):
+                return sha256_file(path), None
+        except Exception as e:
+            return e, None
+    try:
+        with PROFILER.file(path, size):
+            data = path.read_bytes()
+    except Exception as e:
+        return e, e
+    # stejné jako read_text(errors="replace"): univerzální konce řádků
+    text = data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    return digest or hashlib.sha256(data).hexdigest(), text
+
+def sha256_job(job: tuple[Path, str | None, int]):
+    path, digest, size = job
+    if digest is not None:
+        return digest
+    try:
+        with PROFILER.file(path, size):
+            return sha256_file(path)
+    except Exception as e:
+        return e
+
+def hash_entries(root: Path, entries: list[FileEntry], cache: DerivedCache):
+    """SHA256 (nebo výjimka) pro každý záznam ve vstupním pořadí; cache + thread pool."""
+    jobs = [(root / e.rel, cache.get("sha256", e.rel.as_posix(), e.sig), e.size) for e in entries]
+    for entry, (_path, cached, _size), h in zip(entries, jobs, ordered_map(sha256_job, jobs)):
+        if cached is None and isinstance(h, str):
+            cache.put("sha256", entry.rel.as_posix(), entry.sig, h)
+        yield h
+
+def write_tree(index: FileIndex, out):
+    """Stromová hierarchie z FileIndex (složky i soubory); disk se znovu neprochází."""
+    tree: dict = {}  # jméno -> podstrom (složka) nebo None (soubor)
+    for rel_dir in index.dirs:
+        node = tree
+        for part in rel_dir.split("/"):
+            node = node.setdefault(part, {})
+    for entry in index.entries:
+        *parents, name = entry.rel.parts
+        node = tree
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[name] = None
+    write_tree_node(tree, out, "")
+
+def write_tree_node(node: dict, out, prefix: str):
+    names = sorted(node, key=lambda n: (node[n] is None, n.lower()))
+    total = len(names)
+    for i, name in enumerate(names):
         connector = "└── " if i == total - 1 else "├── "
-        line = f"{prefix}{connector}{entry.name}\n"
-        out.write(line)
-        if entry.is_dir():
+        out.write(f"{prefix}{connector}{name}\n")
+        if node[name] is not None:
             extension = "    " if i == total - 1 else "│   "
-            write_tree(entry, out, prefix + extension, root)
+            write_tree_node(node[name], out, prefix + extension)
 
-def write_scripts_section(root: Path, out):
-    out.write("## Skripty a jejich obsah\n")
-    scripts = [p for p in iter_all_files(root) if is_script(p)]
+def iter_script_contents(root: Path, scripts: list[FileEntry], cache: DerivedCache):
+    """(záznam, digest | výjimka, text | výjimka | None) ve vstupním pořadí; cache + thread pool."""
+    jobs = [(root / e.rel, e.size, cache.get("sha256", e.rel.as_posix(), e.sig)) for e in scripts]
+    for entry, job, (digest, text) in zip(scripts, jobs, ordered_map(load_script, jobs)):
+        if job[2] is None and isinstance(digest, str):
+            cache.put("sha256", entry.rel.as_posix(), entry.sig, digest)
+        yield entry, digest, text
+
+def first_copy(first_by_digest: dict[str, str], entry: FileEntry, digest) -> str | None:
+    """Cesta dřívějšího skriptu se stejným SHA256, jinak None (a zapamatuje si tenhle)."""
+    if not DEDUP_SCRIPTS or not isinstance(digest, str) or entry.size < DEDUP_MIN_BYTES:
+        return None
+    first = first_by_digest.setdefault(digest, entry.rel.as_posix())
+    return first if first != entry.rel.as_posix() else None
+
+def write_script_blocks(root: Path, out, scripts: list[FileEntry], cache: DerivedCache) -> int:
+    """Hlavička + SHA256 + obsah každého skriptu (v daném pořadí); vrací počet řádků."""
     total_lines = 0
-    out.write(f"Celkem skriptů: {len(scripts)}\n\n")
-    for rel in sorted(scripts, key=lambda p: p.as_posix().lower()):
-        abs_path = root / rel
-        try:
-            size = abs_path.stat().st_size
-        except OSError:
-            size = None
+    first_by_digest: dict[str, str] = {}
+    for entry, digest, text in iter_script_contents(root, scripts, cache):
+        rel = entry.rel
         header = f"### {rel.as_posix()}\n"
         out.write(header)
         # NEW: hash
-        try:
-            h = sha256_file(abs_path)
-            out.write(f"(SHA256: {h})\n")
-        except Exception as e:
-            out.write(f"(SHA256 error: {e})\n")
-        if size is not None and size > MAX_SCRIPT_BYTES:
+        if isinstance(digest, Exception):
+            out.write(f"(SHA256 error: {digest})\n")
+        else:
+            out.write(f"(SHA256: {digest})\n")
+        if entry.size > MAX_SCRIPT_BYTES:
             out.write(f"(Soubor přesáhl limit {MAX_SCRIPT_BYTES} B, obsah nevypsán.)\n\n")
             continue
-        try:
-            text = abs_path.read_text(encoding="utf-8", errors="replace")
-        except Exception as e:
-            out.write(f"(Nelze přečíst soubor: {e})\n\n")
+        if isinstance(text, Exception):
+            out.write(f"(Nelze přečíst soubor: {text})\n\n")
             continue
         lines = text.count("\n") + (0 if text.endswith("\n") else 1 if text else 0)
         total_lines += lines
+        # NEW: duplicita -> jen odkaz
+        original = first_copy(first_by_digest, entry, digest)
+        if original:
+            out.write(f"(Stejný obsah jako {original}, nevypsán.)\n\n")
+            continue
         out.write("```" + rel.suffix.lstrip(".") + "\n")
         out.write(text)
         if not text.endswith("\n"):
             out.write("\n")
         out.write("```\n\n")
+    return total_lines
+
+def script_entries(index: FileIndex) -> list[FileEntry]:
+    scripts = index.files(lambda e: e.ext in SCRIPT_EXTS)
+    scripts.sort(key=lambda e: e.rel.as_posix().lower())
+    return scripts
+
+def write_scripts_section(root: Path, out, index: FileIndex, cache: DerivedCache):
+    out.write("## Skripty a jejich obsah\n")
+    scripts = script_entries(index)
+    out.write(f"Celkem skriptů: {len(scripts)}\n\n")
+    total_lines = write_script_blocks(root, out, scripts, cache)
     out.write(f"Souhrn řádků ve skriptech: {total_lines}\n\n")
 
 # NEW: verze Unity
@@ -164,7 +527,7 @@ def write_unity_version(root: Path, out):
     out.write("## Unity verze\n")
     if pv.exists():
         try:
-            txt = pv.read_text(encoding="utf-8", errors="replace")
+            txt = read_project_text(pv)
             out.write(txt.strip() + "\n\n")
         except Exception as e:
             out.write(f"(Nelze přečíst ProjectVersion.txt: {e})\n\n")
@@ -177,7 +540,7 @@ def write_packages(root: Path, out):
     man = root / "Packages" / "manifest.json"
     if man.exists():
         try:
-            data = json.loads(man.read_text(encoding="utf-8", errors="replace"))
+            data = json.loads(read_project_text(man))
             deps = data.get("dependencies", {})
             for k in sorted(deps):
                 out.write(f"- {k}: {deps[k]}\n")
@@ -191,7 +554,7 @@ def write_packages(root: Path, out):
     lock = root / "Packages" / "packages-lock.json"
     if lock.exists():
         try:
-            data = json.loads(lock.read_text(encoding="utf-8", errors="replace"))
+            data = json.loads(read_project_text(lock))
             deps = data.get("dependencies", {})
             for k in sorted(deps):
                 v = deps[k].get("version")
@@ -204,6 +567,19 @@ def write_packages(root: Path, out):
         out.write("(packages-lock.json nenalezen)\n\n")
 
 # NEW: scény v buildu
+def parse_build_scenes(txt: str) -> list[dict]:
+    """[{"path": ..., "enabled": ...}] z EditorBuildSettings.asset (velmi jednoduchý parser)."""
+    scenes = []
+    current = {}
+    for line in txt.splitlines():
+        line = line.strip()
+        if line.startswith("- path:"):
+            current = {"path": line.split(":", 1)[1].strip()}
+            scenes.append(current)
+        elif line.startswith("enabled:") and current is not None:
+            current["enabled"] = line.split(":", 1)[1].strip()
+    return scenes
+
 def write_build_scenes(root: Path, out):
     out.write("## Scény v build nastavení\n")
     ebs = root / "ProjectSettings" / "EditorBuildSettings.asset"
@@ -211,17 +587,7 @@ def write_build_scenes(root: Path, out):
         out.write("(EditorBuildSettings.asset nenalezen)\n\n")
         return
     try:
-        txt = ebs.read_text(encoding="utf-8", errors="replace")
-        # velmi jednoduchý parser
-        scenes = []
-        current = {}
-        for line in txt.splitlines():
-            line = line.strip()
-            if line.startswith("- path:"):
-                current = {"path": line.split(":", 1)[1].strip()}
-                scenes.append(current)
-            elif line.startswith("enabled:") and current is not None:
-                current["enabled"] = line.split(":", 1)[1].strip()
+        scenes = parse_build_scenes(read_project_text(ebs))
         if scenes:
             for i, s in enumerate(scenes):
                 out.write(f"{i:02d}. {s.get('path')} (enabled={s.get('enabled')})\n")
@@ -232,38 +598,53 @@ def write_build_scenes(root: Path, out):
         out.write(f"(Chyba při čtení EditorBuildSettings.asset: {e})\n\n")
 
 # NEW: GUID mapa skriptů
-def build_guid_map_for_scripts(root: Path):
+def build_guid_map_for_scripts(root: Path, index: FileIndex, cache: DerivedCache):
     guid_to_script = {}
-    for rel in iter_all_files(root):
-        if rel.suffix == ".meta" and rel.as_posix().lower().endswith(".cs.meta"):
-            abs_meta = root / rel
+    for entry in index.files(lambda e: e.ext == "meta"):
+        rel_posix = entry.rel.as_posix()
+        if not rel_posix.lower().endswith(".cs.meta"):
+            continue
+        cached = cache.get("guid", rel_posix, entry.sig)
+        if cached is None:
             try:
-                txt = abs_meta.read_text(encoding="utf-8", errors="replace")
-                m = GUID_RE.search(txt)
-                if m:
-                    guid = m.group(1).lower()
-                    script_path = rel.with_suffix("").with_suffix("")  # .cs.meta -> .cs
-                    # Pozn.: .with_suffix("") odstraní ".meta", druhé odstraní ".cs"
-                    # Bezpečněji:
-                    script_path = Path(rel.as_posix()[:-5])  # odříznout ".meta"
-                    guid_to_script[guid] = script_path.as_posix()[:-3] + ".cs"
+                with PROFILER.file(entry.rel, entry.size):
+                    txt = (root / entry.rel).read_text(encoding="utf-8", errors="replace")
             except Exception:
-                pass
+                continue
+            m = GUID_RE.search(txt)
+            cached = {"guid": m.group(1).lower() if m else None}
+            cache.put("guid", rel_posix, entry.sig, cached)
+        if cached["guid"]:
+            # odříznout ".meta" a normalizovat příponu skriptu na ".cs"
+            guid_to_script[cached["guid"]] = rel_posix[:-5][:-3] + ".cs"
     return guid_to_script
 
 # NEW: Rozbor prefabů a scén -> jaké skripty jsou připojené
-def write_asset_script_references(root: Path, out, guid_map):
-    def list_refs(rel_paths, title):
-        out.write(title + "\n")
-        count = 0
-        for rel in sorted(rel_paths, key=lambda p: p.as_posix().lower()):
-            abs_path = root / rel
+def iter_asset_script_guids(root: Path, entries: list[FileEntry], cache: DerivedCache):
+    """(záznam, seřazené GUIDy m_Script | výjimka) pro prefaby/scény, seřazeno podle cesty."""
+    for entry in sorted(entries, key=lambda e: e.rel.as_posix().lower()):
+        rel = entry.rel
+        guids = cache.get("script_guids", rel.as_posix(), entry.sig)
+        if guids is None:
             try:
-                txt = abs_path.read_text(encoding="utf-8", errors="replace")
+                with PROFILER.file(rel, entry.size):
+                    txt = (root / rel).read_text(encoding="utf-8", errors="replace")
             except Exception as e:
-                out.write(f"- {rel.as_posix()} (nelze číst: {e})\n")
+                yield entry, e
+                continue
+            guids = sorted(set(SCRIPT_GUID_RE.findall(txt)))
+            cache.put("script_guids", rel.as_posix(), entry.sig, guids)
+        yield entry, guids
+
+def write_asset_script_references(root: Path, out, guid_map, index: FileIndex, cache: DerivedCache):
+    def list_refs(entries, title):
+        out.write(title + "\n")
+        count = 0
+        for entry, guids in iter_asset_script_guids(root, entries, cache):
+            rel = entry.rel
+            if isinstance(guids, Exception):
+                out.write(f"- {rel.as_posix()} (nelze číst: {guids})\n")
                 continue
-            guids = set(SCRIPT_GUID_RE.findall(txt))
             if not guids:
                 continue
             count += 1
@@ -275,70 +656,87 @@ def write_asset_script_references(root: Path, out, guid_map):
         if count == 0:
             out.write("(Nenalezeny žádné odkazy na MonoBehaviour skripty)\n\n")
 
-    prefabs = [p for p in iter_all_files(root) if p.suffix.lower() == ".prefab"]
-    scenes  = [p for p in iter_all_files(root) if p.suffix.lower() == ".unity"]
+    prefabs = index.files(lambda e: e.ext == "prefab")
+    scenes  = index.files(lambda e: e.ext == "unity")
 
     list_refs(prefabs, "## Prefaby → připojené skripty")
     list_refs(scenes,  "## Scény → připojené skripty")
 
 # NEW: Heuristiky pro TMP/UI
-def write_ui_tmp_checks(root: Path, out):
-    out.write("## UI/TMP kontroly (heuristické)\n")
+TMP_TOKENS = ["TextMeshProUGUI", "TextMeshPro", "Canvas"]
+
+def ui_tmp_checks(root: Path, index: FileIndex, cache: DerivedCache) -> tuple[bool, bool, dict[str, int]]:
+    """(TMP v manifestu, složka Assets/TextMesh Pro, počty scén/prefabů s tokenem)."""
     # 1) balíček TMP v manifestu
     man = root / "Packages" / "manifest.json"
     has_tmp_pkg = False
     if man.exists():
         try:
-            deps = json.loads(man.read_text(encoding="utf-8", errors="replace")).get("dependencies", {})
+            deps = json.loads(read_project_text(man)).get("dependencies", {})
             has_tmp_pkg = "com.unity.textmeshpro" in deps
         except Exception:
             pass
-    out.write(f"- com.unity.textmeshpro v manifestu: {'ANO' if has_tmp_pkg else 'NEBO NEZJIŠTĚNO'}\n")
 
     # 2) existuje složka TextMesh Pro?
     has_tmp_folder = (root / "Assets" / "TextMesh Pro").exists()
-    out.write(f"- Assets/TextMesh Pro složka existuje: {'ANO' if has_tmp_folder else 'NE'}\n")
 
     # 3) grep klíčových tokenů v scénách/prefabech
-    tokens = ["TextMeshProUGUI", "TextMeshPro", "Canvas"]
+    tokens = TMP_TOKENS
     occurrences = {t: 0 for t in tokens}
-    for rel in iter_all_files(root):
-        if rel.suffix.lower() in {".unity", ".prefab"}:
+    for entry in index.files(lambda e: e.ext in {"unity", "prefab"}):
+        found = cache.get("tmp_tokens", entry.rel.as_posix(), entry.sig)
+        if found is None:
             try:
-                txt = (root / rel).read_text(encoding="utf-8", errors="replace")
-                for t in tokens:
-                    if t in txt:
-                        occurrences[t] += 1
+                with PROFILER.file(entry.rel, entry.size):
+                    txt = (root / entry.rel).read_text(encoding="utf-8", errors="replace")
             except Exception:
-                pass
-    for t in tokens:
+                continue
+            found = [t for t in tokens if t in txt]
+            cache.put("tmp_tokens", entry.rel.as_posix(), entry.sig, found)
+        for t in found:
+            if t in occurrences:
+                occurrences[t] += 1
+    return has_tmp_pkg, has_tmp_folder, occurrences
+
+def write_ui_tmp_checks(root: Path, out, index: FileIndex, cache: DerivedCache):
+    out.write("## UI/TMP kontroly (heuristické)\n")
+    has_tmp_pkg, has_tmp_folder, occurrences = ui_tmp_checks(root, index, cache)
+    out.write(f"- com.unity.textmeshpro v manifestu: {'ANO' if has_tmp_pkg else 'NEBO NEZJIŠTĚNO'}\n")
+    out.write(f"- Assets/TextMesh Pro složka existuje: {'ANO' if has_tmp_folder else 'NE'}\n")
+    for t in TMP_TOKENS:
         out.write(f"- Výskyt „{t}“ ve scénách/prefabech: {occurrences[t]}\n")
     out.write("\n")
 
 # NEW: Hash a velikosti důležitých souborů
-def write_key_files_hashes(root: Path, out):
-    out.write("## Kontrolní součty klíčových souborů\n")
-    key_globs = [
+def key_file_entries(index: FileIndex) -> list[FileEntry]:
+    """Klíčové soubory projektu + scény a prefaby v Assets, seřazené podle cesty."""
+    key_files = [
         "ProjectSettings/ProjectVersion.txt",
         "ProjectSettings/ProjectSettings.asset",
         "ProjectSettings/EditorBuildSettings.asset",
         "Packages/manifest.json",
         "Packages/packages-lock.json",
-        "Assets/**/*.unity",
-        "Assets/**/*.prefab",
     ]
-    matched = set()
-    for pattern in key_globs:
-        for p in root.glob(pattern):
-            if p.is_file():
-                matched.add(p)
-    for p in sorted(matched, key=lambda x: x.as_posix().lower()):
-        try:
-            h = sha256_file(p)
-            size = p.stat().st_size
-            out.write(f"- {p.relative_to(root).as_posix()} | {size} B | SHA256 {h}\n")
-        except Exception as e:
-            out.write(f"- {p.relative_to(root).as_posix()} | error: {e}\n")
+    # dříve Assets/**/*.unity a Assets/**/*.prefab přes root.glob -> teď z indexu
+    matched = {
+        e.rel.as_posix(): e
+        for e in index.files(lambda e: e.ext in {"unity", "prefab"} and e.rel.parts[:1] == ("Assets",))
+    }
+    for key in key_files:
+        if key in index.by_path:
+            matched[key] = index.by_path[key]
+    ordered = sorted(matched, key=str.lower)
+    return [matched[k] for k in ordered]
+
+def write_key_files_hashes(root: Path, out, index: FileIndex, cache: DerivedCache):
+    out.write("## Kontrolní součty klíčových souborů\n")
+    entries = key_file_entries(index)
+    for entry, h in zip(entries, hash_entries(root, entries, cache)):
+        rel_posix = entry.rel.as_posix()
+        if isinstance(h, Exception):
+            out.write(f"- {rel_posix} | error: {h}\n")
+        else:
+            out.write(f"- {rel_posix} | {entry.size} B | SHA256 {h}\n")
     out.write("\n")
 
 def resolve_output_path(root: Path) -> Path:
@@ -353,35 +751,304 @@ def resolve_output_path(root: Path) -> Path:
             p = p / f"dump_{root.name}_{ts}.txt"
         elif not p.suffix:
             p = p / f"dump_{root.name}_{ts}.txt"
+    if OUTPUT_FORMAT == "jsonl":
+        p = p.with_suffix(".jsonl")
     p.parent.mkdir(parents=True, exist_ok=True)
     return p
 
 # NEW: vytvoření ZIPu minimálního repro
-def create_min_zip(root: Path, dump_path: Path):
+def create_min_zip(root: Path, dump_path: Path, index: FileIndex):
     now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     zip_name = ZIP_NAME_TEMPLATE.format(project=root.name, ts=now)
     zip_path = dump_path.parent / zip_name
+    prefixes = tuple(item.strip("/") + "/" for item in ZIP_INCLUDE)
+    exact = {item.strip("/") for item in ZIP_INCLUDE}
+    def wanted(e: FileEntry) -> bool:
+        rel = e.rel.as_posix()
+        return rel in exact or rel.startswith(prefixes)
+
+    # Library atp. už index vyfiltroval (is_excluded); každý soubor max. jednou
+    selected = index.files(wanted)
     with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
-        for item in ZIP_INCLUDE:
-            p = root / item
-            if p.is_file():
-                z.write(p, p.relative_to(root).as_posix())
-            elif p.is_dir():
-                for file in p.rglob("*"):
-                    if file.is_file():
-                        rel = file.relative_to(root).as_posix()
-                        # nepřidávej Library atp., pro jistotu filtr:
-                        if not is_excluded(Path(rel)):
-                            z.write(file, rel)
+        for entry in sorted(selected, key=lambda e: e.rel.as_posix()):
+            with PROFILER.file(entry.rel, entry.size):
+                z.write(root / entry.rel, entry.rel.as_posix())
+    if PROFILER.enabled:
+        PROFILER.count_write(zip_path.stat().st_size)
     return zip_path
 
-def main():
-    root = ROOT_DIR
-    if not root.exists() or not root.is_dir():
-        raise SystemExit(f"Chyba: '{root}' neexistuje nebo to není složka.")
-    output = resolve_output_path(root)
+def write_cache_stats(out, cache: DerivedCache):
+    out.write("## Cache odvozených dat\n")
+    if not USE_CACHE:
+        out.write("(vypnuto)\n\n")
+        return
+    out.write(f"- Zásahy (hit): {cache.hits}\n")
+    out.write(f"- Výpadky (miss): {cache.misses}\n")
+    out.write(f"- Smazáno starých záznamů: {cache.evicted}\n\n")
+
+def write_index_stats(out, index: FileIndex):
+    out.write("## Statistika indexu souborů\n")
+    out.write(f"- Souborů v indexu: {len(index.entries)}\n")
+    out.write(f"- Složek v indexu: {len(index.dirs)}\n")
+    out.write(f"- Volání scandir: {index.listed_dirs}\n")
+    out.write(f"- Volání stat: {index.stat_calls}\n")
+    out.write(f"- Sekcí obsloužených z indexu: {index.passes}\n")
+    out.write(f"- Přeskočené (vyloučené) složky: {WALK_STATS['pruned_dirs']}\n\n")
+
+# NEW: manifest a delta dump
+def manifest_path_for(output: Path) -> Path:
+    return output.with_name(output.stem + ".manifest.json")
+
+def load_manifest(path: Path) -> dict[str, list]:
+    """rel_posix -> [size, mtime_ns, sha256]; chybějící/poškozený manifest = prázdný."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def save_manifest(path: Path, root: Path, files: dict[str, list]) -> None:
+    data = {
+        "root": str(root.resolve()),
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "files": files,
+    }
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    path.write_bytes(raw)
+    PROFILER.count_write(len(raw))
+
+def build_manifest(root: Path, index: FileIndex, cache: DerivedCache, previous: dict[str, list]):
+    """
+    Manifest všech souborů indexu. Soubor se stejnou velikostí a mtime_ns jako
+    v `previous` převezme starý hash bez čtení; ostatní se hashují (cache + pool).
+    """
+    files = {}
+    todo = []
+    for e in index.files():
+        key = e.rel.as_posix()
+        old = previous.get(key)
+        if old and old[0] == e.size and old[1] == e.mtime_ns:
+            files[key] = old
+        else:
+            todo.append(e)
+    for e, h in zip(todo, hash_entries(root, todo, cache)):
+        if isinstance(h, str):
+            files[e.rel.as_posix()] = [e.size, e.mtime_ns, h]
+    return files
+
+def diff_manifests(old: dict[str, list], new: dict[str, list]):
+    added = sorted(new.keys() - old.keys(), key=str.lower)
+    deleted = sorted(old.keys() - new.keys(), key=str.lower)
+    modified = sorted((k for k in new.keys() & old.keys() if new[k][2] != old[k][2]), key=str.lower)
+    return added, modified, deleted
+
+def write_delta_dump(root: Path, out, index: FileIndex, cache: DerivedCache, previous: dict[str, list]):
+    """Jen změny proti předchozímu manifestu; práce úměrná počtu změněných souborů."""
+    files = build_manifest(root, index, cache, previous)
+    added, modified, deleted = diff_manifests(previous, files)
+    out.write("## Změny od předchozího dumpu\n")
+    out.write(f"Přidáno: {len(added)}, změněno: {len(modified)}, smazáno: {len(deleted)}, "
+              f"beze změny: {len(files) - len(added) - len(modified)}\n\n")
+    for title, paths in (("Přidané", added), ("Změněné", modified), ("Smazané", deleted)):
+        out.write(f"### {title}\n")
+        for p in paths:
+            out.write(f"- {p}\n")
+        out.write("\n" if paths else "(žádné)\n\n")
+
+    changed = [index.by_path[p] for p in added + modified if index.by_path[p].ext in SCRIPT_EXTS]
+    out.write("## Přidané a změněné skripty\n")
+    out.write(f"Celkem skriptů: {len(changed)}\n\n")
+    total_lines = write_script_blocks(root, out, changed, cache)
+    out.write(f"Souhrn řádků ve změněných skriptech: {total_lines}\n\n")
+    return files
+
+# NEW: komprimovaný výstup (dump_common/output.py)
+def compressed_path(output: Path) -> Path:
+    return output.with_name(compressed_name(output.name, OUTPUT_COMPRESSION))
 
-    with output.open("w", encoding="utf-8", errors="replace") as f:
+def open_output(path: Path):
+    """Textový proud do `path`; podle OUTPUT_COMPRESSION rovnou komprimovaný."""
+    return open_text_output(path, OUTPUT_COMPRESSION, COMPRESSION_LEVEL,
+                            COMPRESSION_THREADS, COMPRESSION_BLOCK_BYTES)
+
+# NEW: výstup JSON Lines
+class JsonlWriter:
+    """Proudový zápis NDJSON: každý záznam je jeden řádek, nic se nedrží v paměti."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def emit(self, record: dict) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False))
+        self.stream.write("\n")
+        self.count += 1
+
+def read_json_file(path: Path):
+    """Obsah JSON souboru, nebo None (chybí / nejde přečíst)."""
+    try:
+        return json.loads(read_project_text(path))
+    except (OSError, ValueError):
+        return None
+
+def project_record(root: Path) -> dict:
+    """Verze Unity, balíčky a scény v buildu jako jeden záznam."""
+    record = {"type": "project", "unity_version": None, "packages": None,
+              "packages_lock": None, "build_scenes": None}
+    try:
+        txt = read_project_text(root / "ProjectSettings" / "ProjectVersion.txt")
+        for line in txt.splitlines():
+            if line.startswith("m_EditorVersion:"):
+                record["unity_version"] = line.split(":", 1)[1].strip()
+                break
+    except OSError:
+        pass
+    manifest = read_json_file(root / "Packages" / "manifest.json")
+    if isinstance(manifest, dict):
+        record["packages"] = manifest.get("dependencies", {})
+    lock = read_json_file(root / "Packages" / "packages-lock.json")
+    if isinstance(lock, dict):
+        record["packages_lock"] = {k: {"version": v.get("version"), "source": v.get("source")}
+                                   for k, v in lock.get("dependencies", {}).items()}
+    try:
+        ebs = root / "ProjectSettings" / "EditorBuildSettings.asset"
+        record["build_scenes"] = parse_build_scenes(read_project_text(ebs))
+    except OSError:
+        pass
+    return record
+
+def emit_files(out: JsonlWriter, index: FileIndex) -> None:
+    """Záznam "dir" při prvním výskytu složky (včetně předků), pak "file"."""
+    seen_dirs = set()
+    for entry in index.files():
+        parents = []
+        for parent in entry.rel.parents:
+            key = parent.as_posix()
+            if key == "." or key in seen_dirs:
+                break
+            seen_dirs.add(key)
+            parents.append(key)
+        for key in reversed(parents):
+            out.emit({"type": "dir", "path": key})
+        out.emit({"type": "file", "path": entry.rel.as_posix(), "size": entry.size,
+                  "mtime": datetime.fromtimestamp(entry.mtime).isoformat(timespec="seconds")})
+
+def emit_scripts(out: JsonlWriter, root: Path, scripts: list[FileEntry], cache: DerivedCache) -> None:
+    first_by_digest: dict[str, str] = {}
+    for entry, digest, text in iter_script_contents(root, scripts, cache):
+        record = {"type": "script", "path": entry.rel.as_posix(), "size": entry.size}
+        if isinstance(digest, Exception):
+            record["sha256_error"] = str(digest)
+        else:
+            record["sha256"] = digest
+        if entry.size > MAX_SCRIPT_BYTES:
+            record["skipped"] = f"přesáhl limit {MAX_SCRIPT_BYTES} B"
+        elif isinstance(text, Exception):
+            record["error"] = str(text)
+        else:
+            record["lines"] = text.count("\n") + (0 if text.endswith("\n") else 1 if text else 0)
+            original = first_copy(first_by_digest, entry, digest)
+            if original:
+                record["duplicate_of"] = original
+            else:
+                record["content"] = text
+        out.emit(record)
+
+def emit_script_refs(out: JsonlWriter, root: Path, guid_map, index: FileIndex, cache: DerivedCache) -> None:
+    for kind, ext in (("prefab", "prefab"), ("scene", "unity")):
+        entries = index.files(lambda e: e.ext == ext)
+        for entry, guids in iter_asset_script_guids(root, entries, cache):
+            if isinstance(guids, Exception):
+                out.emit({"type": "script_ref", "asset": entry.rel.as_posix(), "asset_kind": kind,
+                          "error": str(guids)})
+                continue
+            for g in sorted(guids):
+                out.emit({"type": "script_ref", "asset": entry.rel.as_posix(), "asset_kind": kind,
+                          "guid": g, "script": guid_map.get(g.lower())})
+
+def write_jsonl_dump(root: Path, out: JsonlWriter, index: FileIndex, cache: DerivedCache) -> None:
+    """Stejná data jako textový dump (bez ASCII stromu), záznam po záznamu."""
+    with PROFILER.section("seznam souborů"):
+        emit_files(out, index)
+    with PROFILER.section("skripty"):
+        emit_scripts(out, root, script_entries(index), cache)
+    with PROFILER.section("guid mapa"):
+        guid_map = build_guid_map_for_scripts(root, index, cache)
+        for guid in sorted(guid_map):
+            out.emit({"type": "guid", "guid": guid, "script": guid_map[guid]})
+    with PROFILER.section("reference skriptů"):
+        emit_script_refs(out, root, guid_map, index, cache)
+    with PROFILER.section("UI/TMP"):
+        has_tmp_pkg, has_tmp_folder, occurrences = ui_tmp_checks(root, index, cache)
+        out.emit({"type": "ui_tmp", "tmp_package": has_tmp_pkg, "tmp_folder": has_tmp_folder,
+                  "assets_with_token": occurrences})
+    with PROFILER.section("hashe klíčových"):
+        entries = key_file_entries(index)
+        for entry, h in zip(entries, hash_entries(root, entries, cache)):
+            record = {"type": "hash", "path": entry.rel.as_posix(), "size": entry.size}
+            if isinstance(h, Exception):
+                record["error"] = str(h)
+            else:
+                record["sha256"] = h
+            out.emit(record)
+
+def write_delta_jsonl(root: Path, out: JsonlWriter, index: FileIndex, cache: DerivedCache,
+                      previous: dict[str, list]):
+    """write_delta_dump jako NDJSON: záznam "change" na soubor + "script" pro změněné skripty."""
+    files = build_manifest(root, index, cache, previous)
+    added, modified, deleted = diff_manifests(previous, files)
+    for status, paths in (("added", added), ("modified", modified), ("deleted", deleted)):
+        for p in paths:
+            out.emit({"type": "change", "status": status, "path": p})
+    changed = [index.by_path[p] for p in added + modified if index.by_path[p].ext in SCRIPT_EXTS]
+    emit_scripts(out, root, changed, cache)
+    out.emit({"type": "delta", "added": len(added), "modified": len(modified), "deleted": len(deleted),
+              "unchanged": len(files) - len(added) - len(modified)})
+    return files
+
+def emit_stats(out: JsonlWriter, index: FileIndex | None, cache: DerivedCache) -> None:
+    record = {"type": "stats"}
+    if index is not None:
+        record.update(files=len(index.entries), dirs=len(index.dirs), listed_dirs=index.listed_dirs,
+                      stat_calls=index.stat_calls, passes=index.passes,
+                      pruned_dirs=WALK_STATS["pruned_dirs"])
+    if USE_CACHE:
+        record.update(cache_hits=cache.hits, cache_misses=cache.misses, cache_evicted=cache.evicted)
+    out.emit(record)
+
+def write_txt_delta(root: Path, f, output: Path, since: Path):
+    f.write("# DELTA DUMP souborů\n")
+    f.write(f"Kořenová složka: {root.resolve()}\n")
+    f.write(f"Vygenerováno: {datetime.now().isoformat(timespec='seconds')}\n")
+    f.write(f"Proti manifestu: {since.resolve()}\n\n")
+    with PROFILER.section("index"):
+        index = FileIndex(root)
+        cache = open_cache(output, root)
+    with PROFILER.section("delta"):
+        files = write_delta_dump(root, f, index, cache, load_manifest(since))
+    with PROFILER.section("cache"):
+        cache.close()
+    write_cache_stats(f, cache)
+    if PROFILER.enabled:
+        write_profile(f, PROFILER)
+    return files
+
+def write_jsonl_delta(root: Path, out: JsonlWriter, output: Path, since: Path):
+    out.emit({"type": "dump", "tool": "unity_dump/dump44", "mode": "delta", "root": str(root.resolve()),
+              "since": str(since.resolve()), "generated": datetime.now().isoformat(timespec="seconds")})
+    with PROFILER.section("index"):
+        index = FileIndex(root)
+        cache = open_cache(output, root)
+    with PROFILER.section("delta"):
+        files = write_delta_jsonl(root, out, index, cache, load_manifest(since))
+    with PROFILER.section("cache"):
+        cache.close()
+    emit_stats(out, None, cache)
+    if PROFILER.enabled:
+        out.emit({"type": "profile", **PROFILER.report()})
+    return files
+
+def write_txt_dump(root: Path, f, output: Path):
+    with PROFILER.section("hlavička"):
         # Hlavička
         f.write("# DUMP souborů a hierarchie\n")
         f.write(f"Kořenová složka: {root.resolve()}\n")
@@ -396,38 +1063,133 @@ def main():
         # Scény v buildu
         write_build_scenes(root, f)
 
-        # Plochý seznam souborů
+    # Jeden průchod stromem pro všechny sekce níže
+    with PROFILER.section("index"):
+        index = FileIndex(root)
+        cache = open_cache(output, root)
+
+    # Plochý seznam souborů
+    with PROFILER.section("seznam souborů"):
         f.write("## Seznam souborů (relativní cesty)\n")
         count = 0
-        for rel_file in iter_all_files(root):
-            f.write(rel_file.as_posix() + "\n")
+        for entry in index.files():
+            f.write(entry.rel.as_posix() + "\n")
             count += 1
         f.write(f"\nCelkem souborů: {count}\n\n")
 
-        # Stromová hierarchie
+    # Stromová hierarchie
+    with PROFILER.section("write_tree"):
         f.write("## Stromová hierarchie\n")
         f.write(f"{root.name}\n")
-        write_tree(root, f)
+        write_tree(index, f)
         f.write("\n")
 
-        # Výpis skriptů + obsah
-        write_scripts_section(root, f)
+    # Výpis skriptů + obsah
+    with PROFILER.section("skripty"):
+        write_scripts_section(root, f, index, cache)
+
+    # GUID mapa a reference v prefabech/scénách
+    with PROFILER.section("guid mapa"):
+        guid_map = build_guid_map_for_scripts(root, index, cache)
+    with PROFILER.section("reference skriptů"):
+        write_asset_script_references(root, f, guid_map, index, cache)
+
+    # Heuristiky pro TMP/UI
+    with PROFILER.section("UI/TMP"):
+        write_ui_tmp_checks(root, f, index, cache)
+
+    # Hash vybraných souborů
+    with PROFILER.section("hashe klíčových"):
+        write_key_files_hashes(root, f, index, cache)
+    return index, cache
+
+def write_jsonl_full(root: Path, out: JsonlWriter, output: Path):
+    out.emit({"type": "dump", "tool": "unity_dump/dump44", "mode": "full", "root": str(root.resolve()),
+              "generated": datetime.now().isoformat(timespec="seconds")})
+    with PROFILER.section("hlavička"):
+        out.emit(project_record(root))
+    with PROFILER.section("index"):
+        index = FileIndex(root)
+        cache = open_cache(output, root)
+    write_jsonl_dump(root, out, index, cache)
+    return index, cache
+
+def finish_dump(root: Path, output: Path, index: FileIndex, cache: DerivedCache):
+    """ZIP, manifest a zavření cache (společné pro oba formáty); vrací cestu ZIPu nebo None."""
+    zip_path = None
+    if CREATE_MIN_ZIP:
+        with PROFILER.section("create_min_zip"):
+            zip_path = create_min_zip(root, output, index)
+
+    # Manifest pro příští --since-manifest (nezměněné soubory se nehashují znovu)
+    if WRITE_MANIFEST:
+        with PROFILER.section("manifest"):
+            manifest_path = manifest_path_for(output)
+            files = build_manifest(root, index, cache, load_manifest(manifest_path))
+            save_manifest(manifest_path, root, files)
 
-        # GUID mapa a reference v prefabech/scénách
-        guid_map = build_guid_map_for_scripts(root)
-        write_asset_script_references(root, f, guid_map)
+    with PROFILER.section("cache"):
+        cache.close()
+    return zip_path
+
+def main():
+    global PROFILER
+    if OUTPUT_FORMAT not in ("txt", "jsonl"):
+        raise SystemExit(f"Chyba: neznámý OUTPUT_FORMAT {OUTPUT_FORMAT!r} (txt nebo jsonl).")
+    check_compression(OUTPUT_COMPRESSION)
+    root = ROOT_DIR
+    if not root.exists() or not root.is_dir():
+        raise SystemExit(f"Chyba: '{root}' neexistuje nebo to není složka.")
+    output = resolve_output_path(root)
+    manifest_path = manifest_path_for(output)
+    written = compressed_path(output)
 
-        # Heuristiky pro TMP/UI
-        write_ui_tmp_checks(root, f)
+    if SINCE_MANIFEST:
+        since = Path(SINCE_MANIFEST)
+        if not since.is_file():
+            raise SystemExit(f"Chyba: manifest '{since}' neexistuje.")
+        with open_output(written) as f:
+            PROFILER = Profiler(root, f) if PROFILE else NullProfiler()
+            if OUTPUT_FORMAT == "jsonl":
+                files = write_jsonl_delta(root, JsonlWriter(f), output, since)
+            else:
+                files = write_txt_delta(root, f, output, since)
+        save_manifest(manifest_path, root, files)
+        if PROFILER.enabled:
+            save_profile(output, PROFILER)
+        print(f"Hotovo. Delta výstup zapsán do: {written.resolve()}")
+        return
 
-        # Hash vybraných souborů
-        write_key_files_hashes(root, f)
+    with open_output(written) as f:
+        PROFILER = Profiler(root, f) if PROFILE else NullProfiler()
+
+        if OUTPUT_FORMAT == "jsonl":
+            out = JsonlWriter(f)
+            index, cache = write_jsonl_full(root, out, output)
+            zip_path = finish_dump(root, output, index, cache)
+            emit_stats(out, index, cache)
+            if PROFILER.enabled:
+                out.emit({"type": "profile", **PROFILER.report()})
+        else:
+            index, cache = write_txt_dump(root, f, output)
+            zip_path = finish_dump(root, output, index, cache)
+            # Kolik práce ušetřil sdílený index a cache
+            write_index_stats(f, index)
+            write_cache_stats(f, cache)
+            # Kam šel čas (jen s PROFILE = True)
+            if PROFILER.enabled:
+                write_profile(f, PROFILER)
 
-    print(f"Hotovo. Výstup zapsán do: {output.resolve()}")
+    if PROFILER.enabled:
+        save_profile(output, PROFILER)
+    print(f"Hotovo. Výstup zapsán do: {written.resolve()}")
 
     if CREATE_MIN_ZIP:
-        zip_path = create_min_zip(root, output)
         print(f"Vytvořen ZIP s minimálním repro: {zip_path.resolve()}")
 
 if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--since-manifest":
+        SINCE_MANIFEST = sys.argv[2]
+    elif len(sys.argv) > 1:
+        raise SystemExit("Použití: dump44.py [--since-manifest CESTA]")
     main()
@@ -7,8 +7,18 @@ Bez-argumentový dump jen skriptů (default), s volitelnými sekcemi řízenými
 
 from pathlib import Path
 from datetime import datetime
-import fnmatch, hashlib, re
+import contextlib, hashlib, json, math, operator, os, pickle, re, sys, time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# sdílené moduly (dump_common/) leží v kořeni repozitáře
+_REPO_DIR = str(Path(__file__).resolve().parent.parent)
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common.matcher import ExcludeMatcher, GlobSet, match_any_glob, new_walk_stats, norm_lower
+from dump_common.matcher import scan_dir as _scan_dir, walk_files as _walk_files
+from dump_common.cache import DerivedCache
 
 # ===================== MAKRA / NASTAVENÍ =====================
 
@@ -36,6 +46,20 @@ INCLUDE_NOISY = False
 # (lehce navýšené, ať se méně často ořezává)
 MAX_TOTAL_LINES = 12000
 MAX_TOTAL_CHARS = 2_000_000
+# Rozpočet v (přibližných) tokenech LLM, odhad viz estimate_tokens; None = bez limitu
+MAX_TOTAL_TOKENS = None
+# Ukázky kódu: False = původní hladové plnění v abecedním pořadí, True = nejdřív
+# změřit všechny bloky a vybrat je knapsackem (co nejvíc pokrytých skriptů,
+# pak co nejvíc řádků)
+PLAN_SNIPPETS = False
+# nejvýš tolik dílků rozpočtu v DP; menší rozpočet se plánuje přesně po
+# řádcích / znacích / tokenech (víc = přesnější, pomalejší)
+PLAN_RESOLUTION = 6000
+# Skripty se stejným obsahem (stejná velikost, pak stejné SHA-256) se ukážou
+# jen jednou, další kopie jsou jednořádkový odkaz na první cestu; porovnávají
+# se jen textové soubory do MAX_SCRIPT_BYTES (větší stejně nemají ukázku)
+DEDUP_SNIPPETS = True
+DEDUP_MIN_BYTES = 128
 MAX_SNIPPET_HEAD = 500
 MAX_SNIPPET_TAIL = 500
 MAX_SNIPPETS = 500
@@ -83,7 +107,7 @@ YAML_EXTS = {".unity", ".prefab", ".anim", ".controller", ".asset", ".mat"}
 EXCLUDE_DIRS = {d.casefold() for d in {
     ".git", "node_modules", "__pycache__", "library", "logs", "temp", "obj", "build"
 }}
-EXCLUDE_FILES = {f.casefold() for f in {"dump.txt"}}
+EXCLUDE_FILES = {f.casefold() for f in {"dump.txt", ".dump_cache.sqlite"}}
 EXCLUDE_EXTS = {e.casefold() for e in {"dll", "pdb", "cache", "log", "meta"}}
 EXCLUDE_GLOBS = {p.casefold() for p in {
     "**/Library/**", "**/Logs/**", "**/obj/**", "**/Temp/**", "**/Build/**",
@@ -95,37 +119,68 @@ SCRIPT_EXTS = {"cs", "js", "ts", "shader", "compute", "cginc", "hlsl", "glsl"}
 TREE_MAX_DEPTH = 3
 TREE_MAX_FILES_PER_DIR = 12
 
+# Cache výsledků analyze_script_text mezi běhy (SQLite vedle výstupu)
+USE_CACHE = True
+CACHE_FILE_NAME = ".dump_cache.sqlite"
+CACHE_MAX_AGE_DAYS = 30
+
+# Manifest skriptů (cesta, velikost, mtime, sha256) vedle výstupu a delta režim:
+# SINCE_MANIFEST = manifest předchozího dumpu -> jen přidané/změněné/smazané skripty
+# (lze zadat i jako --since-manifest PATH). WRITE_MANIFEST je volitelný: první
+# manifest hashuje všechny zahrnuté skripty, další už jen ty se změněnou
+# velikostí/mtime (delta režim manifest zapisuje vždy).
+WRITE_MANIFEST = False
+SINCE_MANIFEST = None
+
+# Formát výstupu: "txt" (Markdown-like) nebo "jsonl" (NDJSON, jeden záznam na řádek,
+# zapisuje se průběžně; přípona výstupu .jsonl). V jsonl se neuplatní rozpočty
+# MAX_TOTAL_LINES/MAX_TOTAL_CHARS – konzument si vybere záznamy sám.
+OUTPUT_FORMAT = "txt"
+
+# Shardy (jen txt): místo ořezání rozpočtem pokračuje výstup do dalších souborů
+# {název}_0001.txt, _0002.txt… po SHARD_MAX_BYTES bajtech / SHARD_MAX_LINES
+# řádcích. Kódový blok se nerozdělí, pokud se vejde do prázdného shardu;
+# {název}.index.json mapuje cestu -> shard, bajtový offset a řádek.
+# None = jeden soubor s rozpočty MAX_TOTAL_LINES / MAX_TOTAL_CHARS.
+SHARD_MAX_BYTES = None
+SHARD_MAX_LINES = None
+
+# Paralelní zpracování skriptů (analýza + ukázky bez komentářů) v procesech:
+# SCRIPT_WORKERS 1 = sériově v hlavním procesu, 0 = počet jader. Pool se spustí
+# až od SCRIPT_POOL_MIN_FILES skriptů (start procesů něco stojí) a skripty do něj
+# jdou po dávkách SCRIPT_CHUNK_SIZE. Pořadí, cache i rozpočty zůstávají
+# v hlavním procesu, výstup je shodný se sériovým během.
+SCRIPT_WORKERS = 1
+SCRIPT_POOL_MIN_FILES = 64
+SCRIPT_CHUNK_SIZE = 16
+
 # ===================== UTIL FUNKCE =====================
 
-def norm_lower(s: str) -> str: return s.casefold()
+_EXCLUDE_MATCHER = None
+
+def exclude_matcher() -> ExcludeMatcher:
+    # sestaví se až při prvním použití, aby šla makra přepsat před main()
+    global _EXCLUDE_MATCHER
+    if _EXCLUDE_MATCHER is None:
+        _EXCLUDE_MATCHER = ExcludeMatcher(EXCLUDE_DIRS, EXCLUDE_FILES, EXCLUDE_EXTS, EXCLUDE_GLOBS)
+    return _EXCLUDE_MATCHER
 
 def is_excluded(rel_path: Path) -> bool:
-    for part in rel_path.parts:
-        if norm_lower(part) in EXCLUDE_DIRS:
-            return True
-    if norm_lower(rel_path.name) in EXCLUDE_FILES:
-        return True
-    if rel_path.suffix and rel_path.suffix.lstrip(".").casefold() in EXCLUDE_EXTS:
-        return True
-    rel_posix = norm_lower(rel_path.as_posix())
-    for pattern in EXCLUDE_GLOBS:
-        if fnmatch.fnmatch(rel_posix, pattern):
-            return True
-    return False
+    return exclude_matcher()(rel_path)
 
-def match_any_glob(rel_path: Path, patterns: set[str]) -> bool:
-    rp_l = rel_path.as_posix().casefold()
-    for pat in patterns:
-        if fnmatch.fnmatch(rp_l, pat.casefold()):
-            return True
-    return False
+# Počítadla průchodu (vypisují se do patičky dumpu)
+WALK_STATS = new_walk_stats()
+
+def scan_dir(abs_dir: str) -> list[os.DirEntry]:
+    return _scan_dir(abs_dir, WALK_STATS)
+
+def walk_files(root: Path):
+    """(relativní posix cesta, DirEntry) nevyloučených souborů; prořezaný průchod z dump_common.matcher."""
+    return _walk_files(root, exclude_matcher(), WALK_STATS)
 
 def iter_all_files(root: Path):
-    for p in root.rglob("*"):
-        if p.is_file():
-            rel = p.relative_to(root)
-            if not is_excluded(rel):
-                yield rel
+    for rel, _entry in walk_files(root):
+        yield Path(rel)
 
 def resolve_output_path(root: Path) -> Path:
     if OUTPUT_FILE is None:
@@ -139,6 +194,8 @@ def resolve_output_path(root: Path) -> Path:
             p = p / f"dump_{root.name}_{ts}.txt"
         elif not p.suffix:
             p = p / f"dump_{root.name}_{ts}.txt"
+    if OUTPUT_FORMAT == "jsonl":
+        p = p.with_suffix(".jsonl")
     p.parent.mkdir(parents=True, exist_ok=True)
     return p
 
@@ -147,15 +204,53 @@ def is_included_asset(rel: Path) -> bool:
         return rel.as_posix().startswith("Assets/")
     return False
 
+def open_cache(output: Path, root: Path) -> DerivedCache:
+    if not USE_CACHE:
+        return DerivedCache(None)
+    return DerivedCache(output.parent / CACHE_FILE_NAME, root, CACHE_MAX_AGE_DAYS)
+
+# Odhad tokenů ve stylu BPE tokenizérů: text se předrozdělí jako u GPT
+# (mezera se lepí na následující slovo, slova po částech camelCase, skupiny
+# max. 3 číslic, běhy interpunkce, zbylé mezery a konce řádků) a každý kus
+# stojí podle délky – krátké běžné kusy bývají ve slovníku celé, dlouhé se
+# rozpadnou. Jeden průchod regexem, bez slovníku; jde jen o odhad.
+_RE_PRETOKEN = re.compile(
+    r" ?[A-Z]?[a-z]+| ?[A-Z]+(?![a-z])| ?\d{1,3}| ?[^\x00-\x7f]+| ?[^\sA-Za-z\d\x80-\U0010ffff]+|\s+"
+)
+
+def estimate_tokens(text: str) -> int:
+    tokens = 0
+    for piece in _RE_PRETOKEN.findall(text):
+        c = piece[-1]
+        if c.isspace():
+            tokens += 1 + len(piece) // 16       # odsazení a konce řádků se slučují
+        elif c.isascii() and c.isalnum():
+            tokens += 1 + len(piece) // 9        # slovo / část identifikátoru / číslo
+        elif c.isascii():
+            tokens += (len(piece.lstrip(" ")) + 1) // 2  # "();", "=>", "{" …
+        else:
+            tokens += len(piece.encode("utf-8")) // 2 or 1  # diakritika apod. po bajtech
+    return tokens
+
 class BudgetWriter:
-    def __init__(self, stream, max_lines, max_chars):
+    def __init__(self, stream, max_lines, max_chars, max_tokens=None):
         self.s = stream
         self.rem_lines = max_lines
         self.rem_chars = max_chars
+        self.rem_tokens = max_tokens  # None = tokeny se nepočítají
         self.truncated = False
-    def write(self, text: str):
+        self.omitted = False  # něco se do rozpočtu nevešlo a vynechalo se celé
+    def write(self, text: str, tokens: int | None = None):
         if self.truncated:
             return
+        if self.rem_tokens is not None:
+            if tokens is None:
+                tokens = estimate_tokens(text)
+            if tokens > self.rem_tokens:
+                # poměrné zkrácení; přesnost tu nevadí, výstup stejně končí
+                text = text[:len(text) * self.rem_tokens // tokens]
+                self.truncated = True
+                tokens = self.rem_tokens
         if len(text) > self.rem_chars:
             text = text[:self.rem_chars]
             self.truncated = True
@@ -169,19 +264,374 @@ class BudgetWriter:
         self.s.write(text)
         self.rem_lines -= lines
         self.rem_chars -= len(text)
+        if self.rem_tokens is not None:
+            self.rem_tokens -= tokens
     def has_budget(self) -> bool:
-        return not self.truncated and self.rem_lines > 0 and self.rem_chars > 0
+        return (not self.truncated and self.rem_lines > 0 and self.rem_chars > 0
+                and (self.rem_tokens is None or self.rem_tokens > 0))
+    def write_note(self, text: str):
+        """Zápis mimo rozpočet – poznámka o zkrácení se musí vejít vždy."""
+        self.s.write(text)
+    # hranice bloku souboru; důležité jen pro ShardWriter
+    def begin_block(self, path: str):
+        pass
+    def end_block(self):
+        pass
 
-# Bezpečné zapsání celého kódového bloku (aby se neuřízl bez koncového fence)
-def can_fit_block(out: BudgetWriter, text: str) -> bool:
-    return (not out.truncated) and (out.rem_lines >= text.count("\n")) and (out.rem_chars >= len(text))
+class ShardWriter:
+    """
+    Náhrada BudgetWriteru bez ořezávání: po max_bytes / max_lines pokračuje do
+    {stem}_0002{ext} atd. Text mezi begin_block a end_block (stejné rozhraní
+    jako ShardWriter v android_dump/dump33.py) jde celý do jednoho shardu; přes
+    hranici se dělí po řádcích, jen když je větší než celý shard.
+    """
+    truncated = omitted = False
+    # bez rozpočtu: can_fit_block projde vždy
+    rem_lines = rem_chars = math.inf
+    rem_tokens = None
+
+    def __init__(self, out_dir: Path, stem: str, ext: str, max_bytes, max_lines):
+        self.out_dir = out_dir
+        self.stem = stem
+        self.ext = ext
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.shards = []
+        self.files = {}
+        self.block = None  # (cesta, [text]) rozepsaného bloku
+        self.s = None
+        self._next_shard()
+
+    def _next_shard(self):
+        if self.s is not None:
+            self.s.close()
+        name = f"{self.stem}_{len(self.shards) + 1:04d}{self.ext}"
+        self.s = (self.out_dir / name).open("wb")
+        self.shards.append({"file": name, "bytes": 0, "lines": 0})
+
+    def _fits(self, nbytes: int, nlines: int) -> bool:
+        cur = self.shards[-1]
+        return ((self.max_bytes is None or cur["bytes"] + nbytes <= self.max_bytes)
+                and (self.max_lines is None or cur["lines"] + nlines <= self.max_lines))
+
+    def _write(self, data: bytes, nlines: int):
+        if self.shards[-1]["bytes"] and not self._fits(len(data), nlines):
+            self._next_shard()
+        cur = self.shards[-1]
+        self.s.write(data)
+        cur["bytes"] += len(data)
+        cur["lines"] += nlines
+
+    def write(self, text: str, tokens: int | None = None):
+        if self.block is not None:
+            self.block[1].append(text)
+        else:
+            self._write(text.encode("utf-8", errors="replace"), text.count("\n"))
+
+    def write_note(self, text: str):
+        self.write(text)
 
-def write_code_block(out: BudgetWriter, lang: str, header: str, body: str) -> bool:
-    block = f"{header}\n```{lang}\n{body}```\n\n"
-    if can_fit_block(out, block):
-        out.write(block)
+    def begin_block(self, path: str):
+        self.end_block()
+        self.block = (path, [])
+
+    def end_block(self):
+        if self.block is None:
+            return
+        path, parts = self.block
+        self.block = None
+        text = "".join(parts)
+        data = text.encode("utf-8", errors="replace")
+        nlines = text.count("\n")
+        if self.shards[-1]["bytes"] and not self._fits(len(data), nlines):
+            self._next_shard()
+        first = len(self.shards)
+        cur = self.shards[-1]
+        entry = {"shard": cur["file"], "offset": cur["bytes"], "line": cur["lines"] + 1, "bytes": len(data)}
+        if self._fits(len(data), nlines):
+            self._write(data, nlines)
+        else:
+            for line in text.splitlines(keepends=True):
+                self._write(line.encode("utf-8", errors="replace"), line.count("\n"))
+        if len(self.shards) > first:
+            entry["continues_in"] = [s["file"] for s in self.shards[first:]]
+        self.files[path] = entry
+
+    def has_budget(self) -> bool:
         return True
-    return False
+
+    def close(self, index_path: Path, root: Path):
+        self.end_block()
+        self.s.close()
+        # shardy navíc z delšího předchozího běhu by mátly konzumenty
+        n = len(self.shards) + 1
+        while (self.out_dir / f"{self.stem}_{n:04d}{self.ext}").is_file():
+            (self.out_dir / f"{self.stem}_{n:04d}{self.ext}").unlink()
+            n += 1
+        index = {
+            "root": str(root.resolve()),
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "max_bytes": self.max_bytes,
+            "max_lines": self.max_lines,
+            "shards": self.shards,
+            "files": self.files,
+        }
+        index_path.write_text(json.dumps(index, ensure_ascii=False, indent=1), encoding="utf-8")
+
+def shard_index_path(output: Path) -> Path:
+    return output.with_name(output.stem + ".index.json")
+
+def written_path(output: Path) -> Path:
+    """Co vypsat uživateli: výstupní soubor, nebo index shardů."""
+    if SHARD_MAX_BYTES is None and SHARD_MAX_LINES is None:
+        return output
+    return shard_index_path(output)
+
+@contextlib.contextmanager
+def text_writer(output: Path, root: Path):
+    """BudgetWriter do jednoho souboru, nebo ShardWriter, když je nastaven SHARD_MAX_*."""
+    if SHARD_MAX_BYTES is None and SHARD_MAX_LINES is None:
+        with output.open("w", encoding="utf-8", errors="replace") as f:
+            yield BudgetWriter(f, MAX_TOTAL_LINES, MAX_TOTAL_CHARS, MAX_TOTAL_TOKENS)
+        return
+    out = ShardWriter(output.parent, output.stem, output.suffix, SHARD_MAX_BYTES, SHARD_MAX_LINES)
+    try:
+        yield out
+    finally:
+        out.close(shard_index_path(output), root)
+
+# Bezpečné zapsání celého kódového bloku (aby se neuřízl bez koncového fence)
+def can_fit_block(out: BudgetWriter, text: str, tokens: int | None = None) -> bool:
+    if out.truncated or out.rem_lines < text.count("\n") or out.rem_chars < len(text):
+        return False
+    if out.rem_tokens is not None:
+        return out.rem_tokens >= (estimate_tokens(text) if tokens is None else tokens)
+    return True
+
+def code_block(lang: str, header: str, body: str) -> str:
+    return f"{header}\n```{lang}\n{body}```\n\n"
+
+def write_code_block(out: BudgetWriter, lang: str, header: str, body: str, path: str | None = None) -> bool:
+    block = code_block(lang, header, body)
+    tokens = estimate_tokens(block) if out.rem_tokens is not None else None
+    if not can_fit_block(out, block, tokens):
+        return False
+    out.begin_block(path or header)
+    out.write(block, tokens)
+    out.end_block()
+    return True
+
+# ===================== DUPLICITY =====================
+
+def file_digest(path: Path, max_bytes: int) -> bytes | None:
+    """SHA-256 souboru do max_bytes; None, když je delší, binární nebo nečitelný."""
+    try:
+        with path.open("rb") as f:
+            data = f.read(max_bytes + 1)
+    except OSError:
+        return None
+    if len(data) > max_bytes or b"\x00" in data:
+        return None
+    return hashlib.sha256(data).digest()
+
+def duplicate_paths(root: Path, rel_paths: list[str]) -> dict[str, str]:
+    """
+    rel -> první dřívější rel se stejným obsahem. Soubory se třídí podle
+    velikosti a hashují se jen ty, jejichž velikost se opakuje – unikátní
+    velikost (většina) se navíc nečte vůbec. Soubory nad MAX_SCRIPT_BYTES
+    se neporovnávají ani nečtou.
+    """
+    if not DEDUP_SNIPPETS:
+        return {}
+    by_size: dict[int, list[str]] = {}
+    for rel in rel_paths:
+        try:
+            size = (root / rel).stat().st_size
+        except OSError:
+            continue
+        if DEDUP_MIN_BYTES <= size <= MAX_SCRIPT_BYTES:
+            by_size.setdefault(size, []).append(rel)
+
+    dups = {}
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        first_by_digest: dict[bytes, str] = {}
+        for rel in same_size:
+            digest = file_digest(root / rel, MAX_SCRIPT_BYTES)
+            if digest is None:
+                continue
+            first = first_by_digest.setdefault(digest, rel)
+            if first != rel:
+                dups[rel] = first
+    return dups
+
+def duplicate_block(rel: str, first: str) -> str:
+    return f"### {rel}\n(stejný obsah jako {first})\n\n"
+
+# ===================== PLÁNOVÁNÍ ROZPOČTU =====================
+
+def plan_choices(groups: list[list[tuple[int, int]]], capacity: int) -> list[int | None]:
+    """
+    Knapsack s výběrem z více možností: z každé skupiny nejvýš jedna volba
+    (cena, hodnota), součet cen <= capacity, maximální součet hodnot.
+    Vrací index zvolené možnosti pro každou skupinu (None = nic).
+    O(skupiny * možnosti * capacity); řádek DP se počítá po celých řezech
+    (map v C), pro zpětný průchod se drží jen bajtová maska zlepšení.
+    """
+    best = [0] * (capacity + 1)   # best[c] = max. hodnota s cenou <= c
+    masks = []                    # pro skupinu: [(cena, maska)] po možnostech
+    for options in groups:
+        new = best[:]
+        group_masks = []
+        for cost, value in options:
+            if cost > capacity:
+                group_masks.append((cost, b""))
+                continue
+            cand = [v + value for v in best[:capacity + 1 - cost]]
+            head = new[cost:]
+            group_masks.append((cost, bytes(map(operator.gt, cand, head))))
+            new[cost:] = map(max, cand, head)
+        best = new
+        masks.append(group_masks)
+
+    chosen: list[int | None] = [None] * len(groups)
+    c = capacity
+    for i in range(len(groups) - 1, -1, -1):
+        # vyhrála poslední možnost, která na kapacitě c zlepšila výsledek
+        for k in range(len(masks[i]) - 1, -1, -1):
+            cost, mask = masks[i][k]
+            if c >= cost and mask and mask[c - cost]:
+                chosen[i] = k
+                c -= cost
+                break
+    return chosen
+
+def _fits(used: list[int], need: tuple, limits: tuple) -> bool:
+    return all(u + n <= lim for u, n, lim in zip(used, need, limits))
+
+def choose_blocks(groups: list[list[tuple[tuple, int]]], limits: tuple) -> list[int | None]:
+    """
+    Volba ukázek: skupina = [((řádků, znaků, tokenů), hodnota)], limits =
+    zbývající (řádky, znaky, tokeny). Knapsack běží nad rozpočtem, který váže
+    nejvíc, v jeho vlastních jednotkách (nad PLAN_RESOLUTION se zhrubí);
+    ostatní rozpočty se pak ověří po blocích, nevejde-li se volba, zkusí se
+    menší. Zbylé místo se dorovná hladově a výsledek se porovná s původním
+    hladovým plněním – vrátí se lepší z obou.
+    """
+    dims = range(len(limits))
+    by_value = [sorted(range(len(g)), key=lambda k, g=g: -g[k][1]) for g in groups]
+    biggest = [[g[k][0] for k in order[:1]] for g, order in zip(groups, by_value)]
+    demand = [sum(need[0][d] for need in biggest if need) for d in dims]
+    if all(demand[d] <= limits[d] for d in dims):
+        return [order[0] if order else None for order in by_value]
+
+    d = max(dims, key=lambda d: demand[d] / max(limits[d], 1))
+    scale = max(1, math.ceil(limits[d] / PLAN_RESOLUTION))
+    dp_groups = [[(math.ceil(need[d] / scale), value) for need, value in g] for g in groups]
+    chosen = plan_choices(dp_groups, limits[d] // scale)
+
+    # ověření všech rozpočtů; co se nevejde, zmenší se nebo vypadne
+    used = [0] * len(limits)
+    for i, g in enumerate(groups):
+        if chosen[i] is None:
+            continue
+        value = g[chosen[i]][1]
+        chosen[i] = next((k for k in by_value[i] if g[k][1] <= value and _fits(used, g[k][0], limits)), None)
+        if chosen[i] is not None:
+            used = [u + n for u, n in zip(used, g[chosen[i]][0])]
+
+    # dorovnání zbytku: nejdřív nepokryté skripty, pak větší ukázky
+    for upgrade in (False, True):
+        for i, g in enumerate(groups):
+            cur = chosen[i]
+            if (cur is None) == upgrade:
+                continue
+            base = [u - n for u, n in zip(used, g[cur][0])] if upgrade else used
+            for k in by_value[i]:
+                if upgrade and g[k][1] <= g[cur][1]:
+                    break
+                if _fits(base, g[k][0], limits):
+                    chosen[i] = k
+                    used = [u + n for u, n in zip(base, g[k][0])]
+                    break
+
+    # původní hladové plnění (celý blok, jinak malý, jinak konec) jako spodní mez
+    greedy: list[int | None] = [None] * len(groups)
+    used = [0] * len(limits)
+    for i, g in enumerate(groups):
+        k = next((k for k in range(len(g)) if _fits(used, g[k][0], limits)), None)
+        if k is None:
+            break
+        greedy[i] = k
+        used = [u + n for u, n in zip(used, g[k][0])]
+
+    def total(choice):
+        return sum(g[k][1] for g, k in zip(groups, choice) if k is not None)
+    return greedy if total(greedy) > total(chosen) else chosen
+
+def plan_snippets(root: Path, out: BudgetWriter, rel_paths: list[str]) -> list[tuple[str, int | None]]:
+    """
+    Změří bloky (plný / head+tail a malý 20+8 řádků) všech kandidátů a vybere je
+    knapsackem; hodnota = pokrytý skript (váha větší než součet všech řádků
+    navíc, takže počet pokrytých skriptů má přednost) + počet řádků ukázky.
+    Odkazy na duplicitní kopie jsou součástí ceny i hodnoty originálu.
+    Vrací ([(blok, tokeny)] v pořadí rel_paths, počet kandidátů, kteří se
+    do rozpočtu nevešli).
+    """
+    def measure(block: str):
+        return block, (estimate_tokens(block) if out.rem_tokens is not None else None)
+
+    dups = duplicate_paths(root, rel_paths)
+    candidates = {}  # rel -> [(blok, tokeny, řádků ukázky)]
+    for rel in rel_paths:
+        if rel in dups:
+            continue
+        snippet = snippet_for(root, rel)
+        if snippet is None:
+            continue
+        text, body, _kind = snippet
+        lang = Path(rel).suffix.lstrip(".") or ""
+        header = f"### {rel}"
+        bodies = [body]
+        tiny = code_snippet(text, 20, 8)
+        if tiny != body:
+            bodies.append(tiny)
+        candidates[rel] = [(*measure(code_block(lang, header, b)), min(b.count("\n"), 999)) for b in bodies]
+
+    refs: dict[str, list] = {}  # originál -> [(odkaz, tokeny)] jeho kopií
+    for rel, first in dups.items():
+        if first in candidates:
+            refs.setdefault(first, []).append(measure(duplicate_block(rel, first)))
+
+    # rezerva na poznámky za ukázkami ([Průchod], [Cache])
+    reserve_lines, reserve_chars = 4, 400
+    if out.rem_lines <= reserve_lines or out.rem_chars <= reserve_chars:
+        return [], min(len(candidates), MAX_SNIPPETS)
+    cover = 1000 * (len(candidates) + len(dups))
+    groups = []
+    for rel, options in list(candidates.items())[:MAX_SNIPPETS]:
+        extra = refs.get(rel, [])
+        extra_text = "".join(b for b, _t in extra)
+        extra_tokens = sum(t for _b, t in extra) if out.rem_tokens is not None else 0
+        group = []
+        for block, tokens, shown in options:
+            full = block + extra_text
+            need = (full.count("\n"), len(full), (tokens or 0) + extra_tokens)
+            group.append((need, cover * (1 + len(extra)) + shown))
+        groups.append(group)
+    limits = (out.rem_lines - reserve_lines, out.rem_chars - reserve_chars,
+              out.rem_tokens if out.rem_tokens is not None else math.inf)
+    chosen = choose_blocks(groups, limits)
+
+    picked = {rel: options[k][:2] for (rel, options), k in zip(candidates.items(), chosen) if k is not None}
+    blocks = []
+    for rel in rel_paths:
+        if rel in picked:
+            blocks.append(picked[rel])
+        elif dups.get(rel) in picked:
+            blocks.append(measure(duplicate_block(rel, dups[rel])))
+    return blocks, chosen.count(None)
 
 # ===================== UNITY POMOCNÍCI =====================
 
@@ -251,44 +701,331 @@ def largest_files(root: Path, k=20):
 
 # ===================== SKRIPTY: PARS/METRIKY =====================
 
-RE_CLASS = re.compile(r'^\s*(?:public|internal|protected|private)?\s*(?:abstract\s+|static\s+|partial\s+)*class\s+([A-Za-z_]\w*)', re.MULTILINE)
-RE_STRUCT = re.compile(r'^\s*(?:public|internal|protected|private)?\s*struct\s+([A-Za-z_]\w*)', re.MULTILINE)
-RE_ENUM = re.compile(r'^\s*(?:public|internal|protected|private)?\s*enum\s+([A-Za-z_]\w*)', re.MULTILINE)
-RE_INTERFACE = re.compile(r'^\s*(?:public|internal|protected|private)?\s*interface\s+([A-Za-z_]\w*)', re.MULTILINE)
-RE_METHOD = re.compile(r'\b(?:public|private|protected|internal)?\s*(?:static\s+)?(?:async\s+)?[A-Za-z_\<\>\[\],\s]+\s+([A-Za-z_]\w*)\s*\(', re.MULTILINE)
-RE_MONO = re.compile(r'class\s+([A-Za-z_]\w*)\s*:\s*MonoBehaviour\b')
-RE_SCRIPTABLE = re.compile(r'class\s+([A-Za-z_]\w*)\s*:\s*ScriptableObject\b')
+# druh záznamu analýzy v DerivedCache; při změně formátu výsledku zvýšit verzi,
+# aby se staré záznamy nepoužily
+ANALYSIS_KIND = "analysis-v2"
+
+# Analýza C# jedním lineárním průchodem. Tokeny se čtou jen na úrovni
+# deklarací (soubor, namespace, tělo typu); těla metod, accessorů, enumů
+# a inicializátory se přeskočí jedním regexem (_RE_BLOCK_RUN), deklarace
+# typů ani metod v nich nejsou. Žádný regex tu nemůže backtrackovat přes
+# celý řádek, čas je lineární v délce souboru.
+_RE_CS_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<comment>//[^\n]*|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/\*.*|\#[^\n]*)
+      | (?P<string>[$@]*"|')
+      | (?P<ident>@?[A-Za-z_]\w*)
+      | (?P<number>\d[\w.]*)
+      | (?P<op>=>|::|[=!<>]=|&&|\|\||\S)
+    )""", re.S | re.X)
+# obsah bloku { … } až po další závorku, komentář nebo string se stavem
+_RE_BLOCK_RUN = re.compile(
+    r'(?:[^/"\'$@{}]+|/(?![/*])|"(?!"")[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\'|[$@](?![$@]*"))*'
+)
+_RE_BLOCK_SPECIAL = re.compile(r'/[/*]|[$@]*"|\'|[{}]')
+
+# klíčové slovo -> seznam ve výsledku analýzy
+_TYPE_KEYWORDS = {"class": "classes", "record": "classes", "struct": "structs",
+                  "interface": "interfaces", "enum": "enums"}
+# před ( nejde o jméno metody (řídicí konstrukce, operátory, modifikátory)
+_NOT_METHOD_NAMES = frozenset("""
+    if for foreach while switch catch using lock fixed return new nameof typeof
+    sizeof default base this checked unchecked when await throw void var
+    public private protected internal static virtual override abstract sealed
+    async extern unsafe readonly partial const volatile event operator implicit explicit
+""".split())
+# tato slova před jménem znamenají výraz, ne návratový typ
+_NOT_BEFORE_METHOD = frozenset("""
+    return new await throw else in is as case yield using goto typeof nameof
+    sizeof default when and or not operator lock
+""".split())
 
 def is_script(rel: Path) -> bool:
     return rel.suffix and rel.suffix.lstrip(".").casefold() in SCRIPT_EXTS
 
+_SCRIPT_GLOBS = None
+
+def script_globs() -> tuple[GlobSet, GlobSet, GlobSet]:
+    global _SCRIPT_GLOBS
+    if _SCRIPT_GLOBS is None:
+        _SCRIPT_GLOBS = (
+            GlobSet(SCRIPTS_INCLUDE_GLOBS),
+            GlobSet(SCRIPTS_EXCLUDE_GLOBS),
+            GlobSet(NOISY_EXTRA_EXCLUDE_GLOBS),
+        )
+    return _SCRIPT_GLOBS
+
 def is_included_script(rel: Path) -> bool:
     # musí být skript dle přípony
     if not is_script(rel):
         return False
+    include, exclude, noisy = script_globs()
     # musí odpovídat základním „include“ globům
-    if not match_any_glob(rel, SCRIPTS_INCLUDE_GLOBS):
+    if not match_any_glob(rel, include):
         return False
     # obecné skriptové excludy
-    if match_any_glob(rel, SCRIPTS_EXCLUDE_GLOBS):
+    if match_any_glob(rel, exclude):
         return False
     # pokud je vypnuté NOISY, odfiltruj shadery a spol.
-    if not INCLUDE_NOISY and match_any_glob(rel, NOISY_EXTRA_EXCLUDE_GLOBS):
+    if not INCLUDE_NOISY and match_any_glob(rel, noisy):
         return False
     return True
 
+def _is_ident(tok: str) -> bool:
+    return tok[0].isalpha() or tok[0] in "_@"
+
+def _string_end(text: str, start: int, tok: str) -> int:
+    """Pozice za stringem / znakem, který začíná na start prefixem tok."""
+    n = len(text)
+    if tok == "'":
+        return min(_RE_CHAR_BODY.match(text, start + 1).end() + 1, n)
+    kind, i = _string_kind(text, tok[:-1], start + len(tok))
+    holes = []
+    i = _skip_string(text, i, kind, holes)
+    while holes and i < n:
+        # uvnitř interpolační díry: vnořené závorky, stringy a komentáře
+        m = _RE_HOLE_SPECIAL.search(text, i)
+        if m is None:
+            return n
+        t = m.group()
+        i = m.end()
+        if t == "{":
+            holes[-1][0] += 1
+        elif t == "}":
+            if holes[-1][0]:
+                holes[-1][0] -= 1
+            else:
+                i = _skip_string(text, i, holes.pop()[1], holes)
+        elif t == "//":
+            e = text.find("\n", i)
+            i = n if e < 0 else e
+        elif t == "/*":
+            e = text.find("*/", i)
+            i = n if e < 0 else e + 2
+        elif t == "'":
+            i = min(_RE_CHAR_BODY.match(text, i).end() + 1, n)
+        else:
+            # vnořený string: jeho díry jdou na stejný zásobník, bez rekurze
+            kind, k = _string_kind(text, t[:-1], i)
+            i = _skip_string(text, k, kind, holes)
+    return min(i, n)
+
+def _block_end(text: str, i: int) -> int:
+    """Pozice za } k { těsně před i (komentáře a stringy se přeskakují)."""
+    n = len(text)
+    depth = 1
+    while i < n:
+        i = _RE_BLOCK_RUN.match(text, i).end()
+        m = _RE_BLOCK_SPECIAL.match(text, i)
+        if m is None:
+            return n
+        t = m.group()
+        i = m.end()
+        if t == "{":
+            depth += 1
+        elif t == "}":
+            depth -= 1
+            if not depth:
+                return i
+        elif t == "//":
+            e = text.find("\n", i)
+            i = n if e < 0 else e
+        elif t == "/*":
+            e = text.find("*/", i)
+            i = n if e < 0 else e + 2
+        else:
+            i = _string_end(text, m.start(), t)
+    return n
+
+def _method_name(stmt: list, in_type: bool, lt: int):
+    """
+    Jméno deklarované metody, pokud deklarace stmt končí těsně před (.
+    lt = index < odpovídajícího poslednímu > ve stmt (-1 = žádný); hledá ho
+    analyze_script_text průběžně, zpětné procházení by bylo kvadratické.
+    """
+    k = len(stmt) - 1
+    if k >= 0 and stmt[k] == ">":
+        # generické parametry Foo<T>( – jméno je před odpovídajícím <
+        k = lt - 1
+    if k < 1:
+        return None
+    name, prev = stmt[k], stmt[k - 1]
+    if not _is_ident(name) or name in _NOT_METHOD_NAMES:
+        return None
+    if _is_ident(prev):
+        return None if prev in _NOT_BEFORE_METHOD else name
+    # návratový typ List<int>, int[], int?, int*; (int, int) jen v těle typu;
+    # IFoo.Bar( jen v těle typu (explicitní implementace rozhraní)
+    if prev in (">", "]", "?", "*") or (in_type and prev in (")", ".")):
+        return name
+    return None
+
 def analyze_script_text(text: str):
-    lines = text.splitlines()
-    return {
-        "lines": len(lines),
-        "classes": RE_CLASS.findall(text),
-        "structs": RE_STRUCT.findall(text),
-        "enums": RE_ENUM.findall(text),
-        "interfaces": RE_INTERFACE.findall(text),
-        "methods": RE_METHOD.findall(text),
-        "is_mono": bool(RE_MONO.search(text)),
-        "is_scriptable": bool(RE_SCRIPTABLE.search(text)),
+    info = {
+        "lines": len(text.splitlines()),
+        "classes": [],
+        "structs": [],
+        "enums": [],
+        "interfaces": [],
+        "methods": [],
+        "is_mono": False,
+        "is_scriptable": False,
+        "bases": {},
+        "attributes": [],
     }
+    bases, attributes = info["bases"], info["attributes"]
+    n = len(text)
+    scopes = []             # "type" / "namespace" pro každou otevřenou { deklarací
+    stmt = []               # tokeny rozpracované deklarace
+    angles = []             # indexy dosud neuzavřených < ve stmt
+    last_lt = -1            # index < k poslednímu > ve stmt (-1 = bez páru)
+    type_kw = None          # klíčové slovo typu čekající na jméno
+    declared = None         # (klíč výsledku, jméno) deklarovaného typu
+    header = 0              # 1 = za jménem typu, 2 = seznam bází, 0 = jinak
+    angle = paren = 0       # vnoření <…> a (…) v hlavičce typu
+    base = []               # tokeny právě čtené báze
+    closed = False          # deklarace už má = / => / delegate / parametry metody
+    attr_depth = 0          # vnoření [ ( uvnitř atributu
+    attr_name = None        # čtené jméno atributu (i s tečkami)
+    attr_next = False       # další identifikátor začíná jméno atributu
+
+    def end_base():
+        if base and declared:
+            text_ = "".join(base)
+            bases.setdefault(declared[1], []).append(text_)
+            if declared[0] == "classes" and len(bases[declared[1]]) == 1:
+                last = text_.split("<", 1)[0].rsplit(".", 1)[-1]
+                if last == "MonoBehaviour":
+                    info["is_mono"] = True
+                elif last == "ScriptableObject":
+                    info["is_scriptable"] = True
+        base.clear()
+
+    i = 0
+    while True:
+        m = _RE_CS_TOKEN.match(text, i)
+        if m is None:
+            break
+        i = m.end()
+        kind = m.lastgroup
+        if kind == "comment":
+            continue
+        tok = m.group(kind)
+        if kind == "string":
+            i = _string_end(text, m.start(kind), tok)
+            tok = '""'
+
+        if attr_depth:
+            if tok in ("[", "(") and kind == "op":
+                if attr_depth == 1 and attr_name:
+                    attributes.append(attr_name)
+                    attr_name = None
+                attr_depth += 1
+            elif tok in ("]", ")") and kind == "op":
+                if attr_depth == 1 and attr_name:
+                    attributes.append(attr_name)
+                    attr_name = None
+                attr_depth -= 1
+            elif attr_depth == 1:
+                if tok == ",":
+                    if attr_name:
+                        attributes.append(attr_name)
+                    attr_name, attr_next = None, True
+                elif tok == ":":
+                    # cíl atributu (field:, return:, assembly:)
+                    attr_name, attr_next = None, True
+                elif tok == "." and attr_name:
+                    attr_name += "."
+                elif kind == "ident" and (attr_next or (attr_name and attr_name.endswith("."))):
+                    attr_name = tok if attr_next else attr_name + tok
+                    attr_next = False
+            continue
+
+        if kind == "op":
+            if tok == "[" and not stmt:
+                attr_depth, attr_name, attr_next = 1, None, True
+                continue
+            if tok in ("{", ";", "}"):
+                end_base()
+                if tok == "{":
+                    if declared and declared[0] != "enums":
+                        scopes.append("type")
+                    elif stmt and stmt[0] == "namespace" and not closed:
+                        scopes.append("namespace")
+                    else:
+                        i = _block_end(text, i)
+                elif tok == "}" and scopes:
+                    scopes.pop()
+                stmt.clear()
+                angles.clear()
+                type_kw = declared = None
+                header = angle = paren = 0
+                closed = False
+                continue
+
+        if header:
+            if tok in ("<", "(", "[") and kind == "op":
+                if tok == "<":
+                    angle += 1
+                else:
+                    paren += 1
+            elif tok in (">", ")", "]") and kind == "op":
+                if tok == ">":
+                    angle -= 1
+                else:
+                    paren -= 1
+                if header == 2 and tok == ">" and not paren:
+                    base.append(tok)
+                continue
+            elif not angle and not paren:
+                if tok == ":" and header == 1:
+                    header = 2
+                elif tok == "where":
+                    # omezení generických parametrů až po { nebo ;
+                    end_base()
+                    header = 0
+                elif tok == "," and header == 2:
+                    end_base()
+                elif header == 2:
+                    base.append(tok)
+                stmt.append(tok)
+                continue
+            if header == 2 and not paren and (tok == "<" or angle):
+                base.append(tok)
+            stmt.append(tok)
+            continue
+
+        if kind == "ident":
+            if type_kw:
+                if type_kw == "record" and tok in ("class", "struct"):
+                    type_kw = tok
+                else:
+                    key = _TYPE_KEYWORDS[type_kw]
+                    info[key].append(tok)
+                    declared = (key, tok)
+                    header = 1
+                    type_kw = None
+                stmt.append(tok)
+                continue
+            if tok in _TYPE_KEYWORDS and not closed and not declared:
+                type_kw = tok
+            elif tok == "delegate":
+                closed = True
+        else:
+            type_kw = None
+            if tok in ("=", "=>"):
+                closed = True
+            elif tok == "(" and not closed and not declared:
+                name = _method_name(stmt, bool(scopes) and scopes[-1] == "type", last_lt)
+                if name:
+                    info["methods"].append(name)
+                    closed = True
+            elif tok == "<":
+                angles.append(len(stmt))
+            elif tok == ">":
+                last_lt = angles.pop() if angles else -1
+        stmt.append(tok)
+    return info
 
 def code_snippet(text: str, head=30, tail=10):
     lines = text.splitlines()
@@ -300,101 +1037,230 @@ def code_snippet(text: str, head=30, tail=10):
 
 # ===================== ODSTRANĚNÍ KOMENTÁŘŮ PRO UKÁZKY =====================
 
-def strip_comments_c_like(code: str) -> str:
+# Skener skáče regexem/str.find jen mezi významnými místy (začátek komentáře,
+# stringu, znaku; uvnitř interpolace i závorky) a kód kopíruje po celých úsecích.
+_RE_CODE_SPECIAL = re.compile(r'/[/*]|[$@]*"|\'')
+# běžný kód včetně jednoduchých "…" a '…' najednou; zastaví se až na komentáři
+# nebo na stringu, který potřebuje stav ($, @, raw, neukončený)
+_RE_CODE_RUN = re.compile(
+    r'(?:[^/"\'$@]+|/(?![/*])|"(?!"")[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\'|[$@](?![$@]*"))*'
+)
+_RE_HOLE_SPECIAL = re.compile(r'/[/*]|[$@]*"|\'|[{}]')
+# totéž pro ostatní jazyky (.js, .ts, shadery): jen "…" a '…' s \-escapy,
+# $ a @ před uvozovkou nic neznamenají
+_RE_PLAIN_SPECIAL = re.compile(r'/[/*]|"|\'')
+_RE_PLAIN_RUN = re.compile(
+    r'(?:[^/"\']+|/(?![/*])|"[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\')*'
+)
+_PLAIN_STRING = (False, 0, 0)  # kind pro _skip_string: běžný "…"
+# tělo stringu až po (nezkonzumovanou) koncovou uvozovku / začátek díry {
+_RE_REGULAR_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+_RE_CHAR_BODY = re.compile(r"[^'\\]*(?:\\.[^'\\]*)*", re.S)
+_RE_VERBATIM_BODY = re.compile(r'[^"]*(?:""[^"]*)*')
+_RE_INTERP_BODY = re.compile(r'[^"\\{]*(?:(?:\\.|\{\{)[^"\\{]*)*', re.S)
+_RE_INTERP_VERBATIM_BODY = re.compile(r'[^"{]*(?:(?:""|\{\{)[^"{]*)*')
+
+def _string_kind(code: str, prefix: str, k: int) -> tuple[tuple, int]:
     """
-    Odstraní C-like komentáře (// a /* */), ale nechává obsah stringů.
-    Je to zjednodušené, ale pro běžné Unity skripty by mělo stačit.
+    Druh stringu podle prefixu ($, @) a počtu uvozovek od pozice k (za první
+    uvozovkou): ((verbatim, raw_quotes, dollars), začátek obsahu).
     """
-    result = []
-    i = 0
+    quotes = 0
+    if "@" not in prefix and code.startswith('""', k):
+        e = k + 2
+        while e < len(code) and code[e] == '"':
+            e += 1
+        quotes = e - k + 1
+        k = e
+    return ("@" in prefix, quotes, prefix.count("$")), k
+
+_RAW_INTERP_SPECIAL: dict[tuple[int, int], re.Pattern] = {}
+
+def _raw_interp_special(quotes: int, dollars: int) -> re.Pattern:
+    """Regex na konec raw interpolovaného stringu nebo začátek jeho díry."""
+    pattern = _RAW_INTERP_SPECIAL.get((quotes, dollars))
+    if pattern is None:
+        pattern = re.compile('"{%d}|\\{{%d}' % (quotes, dollars))
+        _RAW_INTERP_SPECIAL[quotes, dollars] = pattern
+    return pattern
+
+def _skip_string(code: str, i: int, kind: tuple, holes: list) -> int:
+    """
+    Přeskočí string od pozice i (za otevírací uvozovkou, resp. za koncem díry).
+    kind = (verbatim, raw_quotes, dollars). Vrací index za koncem stringu;
+    narazí-li na díru interpolace, uloží kind na zásobník holes a vrátí index
+    za jejím {, aby se díra skenovala jako kód.
+    """
+    verbatim, quotes, dollars = kind
     n = len(code)
-
-    in_sl_comment = False   # //
-    in_ml_comment = False   # /* */
-    in_string = False
-    string_char = ''
-    escaped = False
-
+    if quotes:  # raw """...""" (C# 11), díra = `dollars` složených závorek
+        if not dollars:
+            end = code.find('"' * quotes, i)
+            return n if end < 0 else end + quotes
+        # konec i díra jedním hledáním – opakované find konce od každé díry
+        # by bylo kvadratické
+        m = _raw_interp_special(quotes, dollars).search(code, i)
+        if m is None:
+            return n
+        if m.group()[0] == "{":
+            holes.append([0, kind])
+        return m.end()
+    if not dollars:
+        body = _RE_VERBATIM_BODY if verbatim else _RE_REGULAR_BODY
+        return min(body.match(code, i).end() + 1, n)
+    body = _RE_INTERP_VERBATIM_BODY if verbatim else _RE_INTERP_BODY
+    j = body.match(code, i).end()
+    if j < n and code[j] == "{":
+        holes.append([0, kind])
+        return j + 1
+    return min(j + 1, n)
+
+def strip_comments_c_like(code: str, csharp: bool = True) -> str:
+    """
+    Odstraní C-like komentáře (// a /* */), ale nechává obsah stringů a konce
+    řádků. S csharp=True rozumí C# stringům: běžné "…" s \\-escapy, znaky '…',
+    verbatim @"…" (zdvojené ""), raw stringy v trojitých uvozovkách
+    a interpolované $"…{x}…", $@"…" i $$ raw (výraz v díře se skenuje jako kód,
+    takže může obsahovat další stringy). S csharp=False zná jen "…" a '…'.
+    """
+    code_run, code_special = (_RE_CODE_RUN, _RE_CODE_SPECIAL) if csharp else (_RE_PLAIN_RUN, _RE_PLAIN_SPECIAL)
+    out = []
+    n = len(code)
+    pos = 0        # začátek úseku, který se ještě nezkopíroval
+    i = 0
+    holes = []     # otevřené díry interpolace: [hloubka {, kind stringu]
     while i < n:
-        ch = code[i]
-        nxt = code[i + 1] if i + 1 < n else ''
-
-        # Jednořádkový komentář
-        if in_sl_comment:
-            if ch == "\n":
-                in_sl_comment = False
-                result.append(ch)  # zachováme konec řádku
-            i += 1
-            continue
-
-        # Víceřádkový komentář
-        if in_ml_comment:
-            if ch == "*" and nxt == "/":
-                in_ml_comment = False
-                i += 2
-            else:
-                if ch == "\n":
-                    result.append("\n")
-                i += 1
-            continue
-
-        # Uvnitř stringu
-        if in_string:
-            result.append(ch)
-            if escaped:
-                escaped = False
+        if not holes:
+            i = code_run.match(code, i).end()
+        m = (_RE_HOLE_SPECIAL if holes else code_special).search(code, i)
+        if m is None:
+            break
+        tok = m.group()
+        j = m.start()
+        if tok == "//":
+            out.append(code[pos:j])
+            e = code.find("\n", j + 2)
+            pos = i = n if e < 0 else e  # \n zůstává v dalším úseku
+        elif tok == "/*":
+            out.append(code[pos:j])
+            e = code.find("*/", j + 2)
+            e = n if e < 0 else e + 2
+            out.append("\n" * code.count("\n", j, e))
+            pos = i = e
+        elif tok == "'":
+            i = min(_RE_CHAR_BODY.match(code, j + 1).end() + 1, n)
+        elif tok == "{":
+            holes[-1][0] += 1
+            i = j + 1
+        elif tok == "}":
+            if holes[-1][0]:
+                holes[-1][0] -= 1
+                i = j + 1
             else:
-                if ch == "\\":
-                    escaped = True
-                elif ch == string_char:
-                    in_string = False
-                    string_char = ''
-            i += 1
-            continue
-
-        # Mimo string i komentáře
-        if ch in ('"', "'"):
-            in_string = True
-            string_char = ch
-            result.append(ch)
-            i += 1
-        elif ch == "/" and nxt == "/":
-            in_sl_comment = True
-            i += 2
-        elif ch == "/" and nxt == "*":
-            in_ml_comment = True
-            i += 2
+                i = _skip_string(code, j + 1, holes.pop()[1], holes)
+        elif csharp:
+            kind, k = _string_kind(code, tok[:-1], m.end())
+            i = _skip_string(code, k, kind, holes)
         else:
-            result.append(ch)
-            i += 1
-
-    return "".join(result)
+            i = _skip_string(code, m.end(), _PLAIN_STRING, holes)
+    out.append(code[pos:])
+    return "".join(out)
 
 def strip_comments_for_path(rel: Path, text: str) -> str:
     """
-    Pro vybrané skriptové přípony odstraní C-like komentáře,
-    pro ostatní soubory vrací text beze změny.
+    Pro vybrané skriptové přípony odstraní C-like komentáře (pravidla C#
+    stringů jen pro .cs), pro ostatní soubory vrací text beze změny.
     """
     ext = rel.suffix.casefold()
-    if ext in {".cs", ".js", ".ts", ".shader", ".compute", ".cginc", ".hlsl", ".glsl"}:
+    if ext == ".cs":
         return strip_comments_c_like(text)
+    if ext in {".js", ".ts", ".shader", ".compute", ".cginc", ".hlsl", ".glsl"}:
+        return strip_comments_c_like(text, csharp=False)
     return text
 
+# ===================== PARALELNÍ ZPRACOVÁNÍ =====================
+
+def script_job(job):
+    """
+    Jeden skript v procesu poolu: jedno čtení, analýza (pokud není v cache)
+    a ukázka. Makra přichází v jobu – při spawn (Windows) se v procesu poolu
+    modul načte znovu a přepsané hodnoty by v něm nebyly.
+    Vrací (info | {"error": ...} | None, výsledek jako snippet_for).
+    """
+    root, rel, need_info, (max_bytes, full_under, head, tail) = job
+    abs_path = os.path.join(root, rel)
+    try:
+        size = os.stat(abs_path).st_size
+        with open(abs_path, encoding="utf-8", errors="replace") as f:
+            raw_text = f.read()
+    except Exception as e:
+        return ({"error": str(e)} if need_info else None), None
+    info = analyze_script_text(raw_text) if need_info else None
+    if size > max_bytes:
+        return info, None
+    text = strip_comments_for_path(Path(rel), raw_text)
+    if size <= full_under:
+        return info, (text, (text if text.endswith("\n") else text + "\n"), "full")
+    return info, (text, code_snippet(text, head, tail), "snippet")
+
+# rel_posix -> (info | None, snippet | None), naplněné prepare_scripts
+_PREPARED: dict[str, tuple] = {}
+
+def script_workers() -> int:
+    return (os.cpu_count() or 1) if SCRIPT_WORKERS == 0 else SCRIPT_WORKERS
+
+def prepare_scripts(root: Path, rel_paths: list[str], cache: DerivedCache | None):
+    """
+    Při SCRIPT_WORKERS > 1 zpracuje všechny skripty předem v ProcessPoolExecutor
+    (map s chunksize, výsledky ve vstupním pořadí). cache=None = stačí ukázky.
+    Jinak nic – sériové funkce pak čtou soubory líně jako dřív.
+    """
+    _PREPARED.clear()
+    workers = script_workers()
+    if workers <= 1 or len(rel_paths) < SCRIPT_POOL_MIN_FILES:
+        return
+
+    infos, sigs = {}, {}
+    if cache is not None:
+        for rel in rel_paths:
+            try:
+                st = (root / rel).stat()
+            except OSError as e:
+                infos[rel] = {"error": str(e)}
+                continue
+            sigs[rel] = (st.st_size, st.st_mtime_ns, st.st_ino)
+            infos[rel] = cache.get(ANALYSIS_KIND, rel, sigs[rel])
+
+    limits = (MAX_SCRIPT_BYTES, FULL_FILE_IF_UNDER_BYTES, MAX_SNIPPET_HEAD, MAX_SNIPPET_TAIL)
+    jobs = [(str(root), rel, cache is not None and infos[rel] is None, limits) for rel in rel_paths]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(script_job, jobs, chunksize=SCRIPT_CHUNK_SIZE))
+    except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+        # modul načtený ze souboru mimo sys.modules / sys.path nejde v procesu
+        # poolu naimportovat (pickle funkce je jen odkaz modul + jméno)
+        print(f"[Pool] nelze použít ({e}), skripty se zpracují sériově")
+        return
+
+    for rel, (info, snippet) in zip(rel_paths, results):
+        if info is not None and "error" not in info:
+            cache.put(ANALYSIS_KIND, rel, sigs[rel], info)
+        _PREPARED[rel] = (infos.get(rel) or info, snippet)
+
 # ===================== RENDER SEKCÍ =====================
 
 def write_tree_limited(root: Path, out, max_depth, files_per_dir):
-    def list_entries(d: Path):
-        try:
-            ents = [e for e in d.iterdir() if not is_excluded(e.relative_to(root))]
-        except Exception:
-            return []
+    matcher = exclude_matcher()
+
+    def list_entries(abs_dir: str, rel_dir: str):
+        ents = [e for e in scan_dir(abs_dir) if not matcher.match_posix(rel_dir + e.name)]
         ents.sort(key=lambda e: (e.is_file(), e.name.casefold()))
         return ents
 
-    def rec(d: Path, prefix: str, depth: int):
+    def rec(abs_dir: str, rel_dir: str, prefix: str, depth: int):
         if depth > max_depth:
             return
-        entries = list_entries(d)
+        entries = list_entries(abs_dir, rel_dir)
         dirs = [e for e in entries if e.is_dir()]
         files = [e for e in entries if e.is_file()][:files_per_dir]
         leftover = max(0, len(entries) - (len(dirs) + len(files)))
@@ -404,33 +1270,57 @@ def write_tree_limited(root: Path, out, max_depth, files_per_dir):
             connector = "└── " if i == total - 1 and leftover == 0 else "├── "
             out.write(f"{prefix}{connector}{e.name}\n")
             if e.is_dir():
+                if matcher.prunes_dir(rel_dir + e.name):
+                    WALK_STATS["pruned_dirs"] += 1
+                    continue
                 extension = "    " if (i == total - 1 and leftover == 0) else "│   "
-                rec(e, prefix + extension, depth + 1)
+                rec(e.path, rel_dir + e.name + "/", prefix + extension, depth + 1)
         if leftover > 0:
             out.write(f"{prefix}└── … +{leftover} dalších položek\n")
 
     out.write(f"{root.name}\n")
-    rec(root, "", 1)
+    rec(str(root), "", "", 1)
 
-def write_scripts_section(root: Path, out: BudgetWriter):
-    out.write("# Skripty (souhrn + ukázky)\n")
+def included_scripts(root: Path) -> list[Path]:
     included = [p for p in iter_all_files(root) if is_included_script(p)]
     included.sort(key=lambda p: p.as_posix().casefold())
+    return included
 
-    out.write(f"Celkem nalezených skriptů (po filtrech): {len(included)}\n\n")
-
-    summaries = []
-    total_lines = 0
+def iter_script_summaries(root: Path, included: list[Path], cache: DerivedCache):
+    """(rel_posix, výsledek analyze_script_text | {"error": ...}) ve vstupním pořadí."""
     for rel in included:
+        prepared = _PREPARED.get(rel.as_posix())
+        if prepared is not None and prepared[0] is not None:
+            yield rel.as_posix(), prepared[0]
+            continue
         abs_path = root / rel
         try:
-            txt = abs_path.read_text(encoding="utf-8", errors="replace")
-        except Exception as e:
-            summaries.append((rel.as_posix(), {"error": str(e)}))
+            st = abs_path.stat()
+        except OSError as e:
+            yield rel.as_posix(), {"error": str(e)}
             continue
-        info = analyze_script_text(txt)
-        total_lines += info["lines"]
-        summaries.append((rel.as_posix(), info))
+        sig = (st.st_size, st.st_mtime_ns, st.st_ino)
+        info = cache.get(ANALYSIS_KIND, rel.as_posix(), sig)
+        if info is None:
+            try:
+                txt = abs_path.read_text(encoding="utf-8", errors="replace")
+            except Exception as e:
+                yield rel.as_posix(), {"error": str(e)}
+                continue
+            info = analyze_script_text(txt)
+            cache.put(ANALYSIS_KIND, rel.as_posix(), sig, info)
+        yield rel.as_posix(), info
+
+def write_scripts_section(root: Path, out: BudgetWriter, cache: DerivedCache) -> list[Path]:
+    """Souhrn a ukázky skriptů; vrací seznam zahrnutých skriptů (pro manifest)."""
+    out.write("# Skripty (souhrn + ukázky)\n")
+    included = included_scripts(root)
+
+    out.write(f"Celkem nalezených skriptů (po filtrech): {len(included)}\n\n")
+
+    prepare_scripts(root, [rel.as_posix() for rel in included], cache)
+    summaries = list(iter_script_summaries(root, included, cache))
+    total_lines = sum(info["lines"] for _path, info in summaries if "error" not in info)
 
     for path, info in summaries[:200]:
         if "error" in info:
@@ -451,43 +1341,141 @@ def write_scripts_section(root: Path, out: BudgetWriter):
     out.write(f"\nSouhrn řádků ve skriptech: ~{total_lines}\n\n")
 
     out.write("## Ukázky kódu (head/tail)\n")
+    write_snippets(root, out, [rel for rel, _info in summaries])
+    return included
+
+def snippet_for(root: Path, rel: str):
+    """
+    (text bez komentářů, tělo ukázky, "full" | "snippet") nebo None, pokud
+    soubor nejde přečíst nebo přesahuje MAX_SCRIPT_BYTES.
+    """
+    if rel in _PREPARED:
+        return _PREPARED[rel][1]
+    abs_path = root / rel
+    try:
+        size = abs_path.stat().st_size
+    except:
+        return None
+    if size > MAX_SCRIPT_BYTES:
+        return None
+    try:
+        raw_text = abs_path.read_text(encoding="utf-8", errors="replace")
+    except:
+        return None
+
+    # ⬇️ tady ořežeme komentáře jen pro skripty
+    text = strip_comments_for_path(Path(rel), raw_text)
+
+    # Plný výpis pro malé soubory, jinak snippet
+    if size <= FULL_FILE_IF_UNDER_BYTES:
+        return text, (text if text.endswith("\n") else text + "\n"), "full"
+    return text, code_snippet(text, MAX_SNIPPET_HEAD, MAX_SNIPPET_TAIL), "snippet"
+
+def write_snippets(root: Path, out: BudgetWriter, rel_paths: list[str]):
+    if PLAN_SNIPPETS and isinstance(out, BudgetWriter):
+        blocks, dropped = plan_snippets(root, out, rel_paths)
+        for block, tokens in blocks:
+            out.write(block, tokens)
+        out.omitted |= dropped > 0
+        return
+
+    dups = duplicate_paths(root, rel_paths)
+    written = set()
     shown = 0
-    for rel, info in summaries:
+    for rel in rel_paths:
         if shown >= MAX_SNIPPETS or not out.has_budget():
             break
-        abs_path = root / rel
-        try:
-            size = abs_path.stat().st_size
-        except:
-            size = None
-        if size is None:
-            continue
-        try:
-            raw_text = abs_path.read_text(encoding="utf-8", errors="replace")
-        except:
+        if dups.get(rel) in written:
+            out.write(duplicate_block(rel, dups[rel]))
             continue
-
-        # ⬇️ tady ořežeme komentáře jen pro skripty
-        text = strip_comments_for_path(Path(rel), raw_text)
-
-        # Plný výpis pro malé soubory, jinak snippet
-        if size <= FULL_FILE_IF_UNDER_BYTES:
-            body = text if text.endswith("\n") else text + "\n"
-        elif size <= MAX_SCRIPT_BYTES:
-            body = code_snippet(text, MAX_SNIPPET_HEAD, MAX_SNIPPET_TAIL)
-        else:
+        snippet = snippet_for(root, rel)
+        if snippet is None:
             continue
+        text, body, _kind = snippet
 
         lang = Path(rel).suffix.lstrip(".") or ""
         header = f"### {rel}"
-        if not write_code_block(out, lang, header, body):
+        if not write_code_block(out, lang, header, body, rel):
             # fallback menší snippet, když se celý blok nevejde
             tiny = code_snippet(text, 20, 8)
-            if not write_code_block(out, lang, header, tiny):
-                break  # ani tiny se nevejde — končíme
+            if not write_code_block(out, lang, header, tiny, rel):
+                out.omitted = True  # ani tiny se nevejde — končíme
+                break
 
+        written.add(rel)
         shown += 1
 
+# ===================== MANIFEST / DELTA =====================
+
+def manifest_path_for(output: Path) -> Path:
+    return output.with_name(output.stem + ".manifest.json")
+
+def load_manifest(path: Path) -> dict[str, list]:
+    """rel_posix -> [size, mtime_ns, sha256]; chybějící/poškozený manifest = prázdný."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def save_manifest(path: Path, root: Path, files: dict[str, list]) -> None:
+    data = {
+        "root": str(root.resolve()),
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "files": files,
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+def build_script_manifest(root: Path, cache: DerivedCache, previous: dict[str, list],
+                          included: list[Path] | None = None):
+    """
+    Manifest zahrnutých skriptů; stejná velikost + mtime_ns jako minule => bez čtení.
+    `included` = seznam už nalezený sekcí skriptů (jinak se strom projde znovu).
+    """
+    files = {}
+    for rel in included if included is not None else included_scripts(root):
+        key = rel.as_posix()
+        try:
+            st = (root / rel).stat()
+        except OSError:
+            continue
+        old = previous.get(key)
+        if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+            files[key] = old
+            continue
+        sig = (st.st_size, st.st_mtime_ns, st.st_ino)
+        digest = cache.get("sha256", key, sig)
+        if digest is None:
+            try:
+                digest = hashlib.sha256((root / rel).read_bytes()).hexdigest()
+            except OSError:
+                continue
+            cache.put("sha256", key, sig, digest)
+        files[key] = [st.st_size, st.st_mtime_ns, digest]
+    return files
+
+def diff_manifests(old: dict[str, list], new: dict[str, list]):
+    added = sorted(new.keys() - old.keys(), key=str.casefold)
+    deleted = sorted(old.keys() - new.keys(), key=str.casefold)
+    modified = sorted((k for k in new.keys() & old.keys() if new[k][2] != old[k][2]), key=str.casefold)
+    return added, modified, deleted
+
+def write_delta_section(root: Path, out: BudgetWriter, cache: DerivedCache, previous: dict[str, list]):
+    files = build_script_manifest(root, cache, previous)
+    added, modified, deleted = diff_manifests(previous, files)
+    out.write("# Změny skriptů od předchozího dumpu\n")
+    out.write(f"Přidáno: {len(added)}, změněno: {len(modified)}, smazáno: {len(deleted)}, "
+              f"beze změny: {len(files) - len(added) - len(modified)}\n\n")
+    for title, paths in (("Přidané", added), ("Změněné", modified), ("Smazané", deleted)):
+        out.write(f"## {title}\n")
+        for p in paths:
+            out.write(f"- {p}\n")
+        out.write("\n" if paths else "(žádné)\n\n")
+    out.write("## Ukázky kódu (přidané a změněné)\n")
+    changed = sorted(added + modified, key=str.casefold)
+    prepare_scripts(root, changed, None)
+    write_snippets(root, out, changed)
+    return files
+
 def write_yaml_assets_section(root: Path, out: BudgetWriter):
     out.write("## YAML Assets (.prefab/.unity/.anim/.controller/.asset/.mat)\n")
     assets = [p for p in iter_all_files(root) if is_included_asset(p)]
@@ -506,10 +1494,11 @@ def write_yaml_assets_section(root: Path, out: BudgetWriter):
         lines = txt.splitlines()
         view = "\n".join(lines[:400]) + ("\n" if txt.endswith("\n") else "\n")
         header = f"### {rel.as_posix()}"
-        if not write_code_block(out, "yaml", header, view):
+        if not write_code_block(out, "yaml", header, view, rel.as_posix()):
             # ještě menší fallback
             tiny = "\n".join(lines[:120]) + "\n"
-            if not write_code_block(out, "yaml", header, tiny):
+            if not write_code_block(out, "yaml", header, tiny, rel.as_posix()):
+                out.omitted = True
                 break
 
 def sha1_of_paths(root: Path):
@@ -523,17 +1512,168 @@ def sha1_of_paths(root: Path):
         h.update(str(st).encode("ascii"))
     return h.hexdigest()
 
+# ===================== JSON LINES =====================
+
+class JsonlWriter:
+    """Proudový zápis NDJSON: každý záznam je jeden řádek, nic se nedrží v paměti."""
+    def __init__(self, stream):
+        self.s = stream
+        self.count = 0
+    def emit(self, record: dict):
+        self.s.write(json.dumps(record, ensure_ascii=False))
+        self.s.write("\n")
+        self.count += 1
+
+def emit_scripts(root: Path, out: JsonlWriter, included: list[Path], cache: DerivedCache):
+    """Záznam "script" = analýza + ukázka (bez komentářů, plná/ořezaná jako v txt)."""
+    rel_paths = [rel.as_posix() for rel in included]
+    prepare_scripts(root, rel_paths, cache)
+    dups = duplicate_paths(root, rel_paths)
+    for path, info in iter_script_summaries(root, included, cache):
+        record = {"type": "script", "path": path, **info}
+        if path in dups:
+            record["content_kind"] = "duplicate"
+            record["duplicate_of"] = dups[path]
+        elif "error" not in info:
+            snippet = snippet_for(root, path)
+            if snippet is None:
+                record["content_kind"] = "skipped"
+            else:
+                _text, body, kind = snippet
+                record["content_kind"] = kind
+                record["content"] = body
+        out.emit(record)
+
+def write_jsonl_full(root: Path, out: JsonlWriter, cache: DerivedCache) -> list[Path] | None:
+    out.emit({"type": "dump", "tool": "unity_dump/dump_scripts22", "mode": "full",
+              "root": str(root.resolve()), "generated": datetime.now().isoformat(timespec="seconds"),
+              "fingerprint": sha1_of_paths(root)})
+    project = {"type": "project"}
+    if INCLUDE_UNITY_VERSION:
+        project["unity_version"] = read_unity_version(root)
+    if INCLUDE_SCENES_LIST:
+        project["scenes"] = list_scenes(root)
+    if INCLUDE_BUILD_SETTINGS:
+        project["build_scenes"] = scenes_in_build(root)
+    out.emit(project)
+
+    if INCLUDE_TREE:
+        seen_dirs = set()
+        for rel in iter_all_files(root):
+            parents = []
+            for parent in rel.parents:
+                key = parent.as_posix()
+                if key == "." or key in seen_dirs:
+                    break
+                seen_dirs.add(key)
+                parents.append(key)
+            for key in reversed(parents):
+                out.emit({"type": "dir", "path": key})
+            out.emit({"type": "file", "path": rel.as_posix()})
+
+    if INCLUDE_ASSET_SUMMARY:
+        total, top = asset_extension_summary(root)
+        out.emit({"type": "asset_summary", "total": total, "by_ext": dict(top)})
+
+    if INCLUDE_LARGEST_FILES:
+        for size, path in largest_files(root, 20):
+            out.emit({"type": "largest_file", "path": path, "size": size})
+
+    included = None
+    if INCLUDE_SCRIPTS:
+        included = included_scripts(root)
+        emit_scripts(root, out, included, cache)
+
+    if INCLUDE_YAML_ASSETS:
+        assets = [p for p in iter_all_files(root) if is_included_asset(p)]
+        assets.sort(key=lambda p: p.as_posix().casefold())
+        for rel in assets:
+            try:
+                txt = (root / rel).read_text(encoding="utf-8", errors="replace")
+            except Exception as e:
+                out.emit({"type": "yaml_asset", "path": rel.as_posix(), "error": str(e)})
+                continue
+            lines = txt.splitlines()
+            out.emit({"type": "yaml_asset", "path": rel.as_posix(), "lines": len(lines),
+                      "content": "\n".join(lines[:400]) + "\n"})
+    return included
+
+def write_jsonl_delta(root: Path, out: JsonlWriter, cache: DerivedCache, since: Path):
+    out.emit({"type": "dump", "tool": "unity_dump/dump_scripts22", "mode": "delta",
+              "root": str(root.resolve()), "since": str(since.resolve()),
+              "generated": datetime.now().isoformat(timespec="seconds")})
+    previous = load_manifest(since)
+    files = build_script_manifest(root, cache, previous)
+    added, modified, deleted = diff_manifests(previous, files)
+    for status, paths in (("added", added), ("modified", modified), ("deleted", deleted)):
+        for p in paths:
+            out.emit({"type": "change", "status": status, "path": p})
+    emit_scripts(root, out, [Path(p) for p in sorted(added + modified, key=str.casefold)], cache)
+    out.emit({"type": "delta", "added": len(added), "modified": len(modified), "deleted": len(deleted),
+              "unchanged": len(files) - len(added) - len(modified)})
+    return files
+
+def emit_stats(out: JsonlWriter, cache: DerivedCache):
+    record = {"type": "stats", "listed_dirs": WALK_STATS["listed_dirs"],
+              "pruned_dirs": WALK_STATS["pruned_dirs"]}
+    if USE_CACHE:
+        record.update(cache_hits=cache.hits, cache_misses=cache.misses, cache_evicted=cache.evicted)
+    out.emit(record)
+
 # ===================== MAIN =====================
 
 def main():
     root = ROOT_DIR
     if not root.exists() or not root.is_dir():
         raise SystemExit(f"Chyba: '{root}' neexistuje nebo to není složka.")
+    if OUTPUT_FORMAT not in ("txt", "jsonl"):
+        raise SystemExit(f"Chyba: neznámý OUTPUT_FORMAT {OUTPUT_FORMAT!r} (txt nebo jsonl).")
+    if OUTPUT_FORMAT == "jsonl" and (SHARD_MAX_BYTES is not None or SHARD_MAX_LINES is not None):
+        raise SystemExit("Chyba: shardy (SHARD_MAX_BYTES / SHARD_MAX_LINES) jsou jen pro OUTPUT_FORMAT txt.")
 
     output = resolve_output_path(root)
-    with output.open("w", encoding="utf-8", errors="replace") as f:
-        out = BudgetWriter(f, MAX_TOTAL_LINES, MAX_TOTAL_CHARS)
-
+    manifest_path = manifest_path_for(output)
+
+    if OUTPUT_FORMAT == "jsonl":
+        since = Path(SINCE_MANIFEST) if SINCE_MANIFEST else None
+        if since is not None and not since.is_file():
+            raise SystemExit(f"Chyba: manifest '{since}' neexistuje.")
+        with output.open("w", encoding="utf-8", errors="replace") as f:
+            out = JsonlWriter(f)
+            cache = open_cache(output, root)
+            if since is not None:
+                files = write_jsonl_delta(root, out, cache, since)
+            else:
+                included = write_jsonl_full(root, out, cache)
+                files = None
+                if WRITE_MANIFEST:
+                    files = build_script_manifest(root, cache, load_manifest(manifest_path), included)
+            cache.close()
+            emit_stats(out, cache)
+        if files is not None:
+            save_manifest(manifest_path, root, files)
+        print(f"Hotovo. Výstup zapsán do: {output.resolve()}")
+        return
+
+    if SINCE_MANIFEST:
+        since = Path(SINCE_MANIFEST)
+        if not since.is_file():
+            raise SystemExit(f"Chyba: manifest '{since}' neexistuje.")
+        with text_writer(output, root) as out:
+            out.write("# Delta Project Dump (scripts-focused)\n")
+            out.write(f"Kořenová složka: {root.resolve()}\n")
+            out.write(f"Vygenerováno: {datetime.now().isoformat(timespec='seconds')}\n")
+            out.write(f"Proti manifestu: {since.resolve()}\n\n")
+            cache = open_cache(output, root)
+            files = write_delta_section(root, out, cache, load_manifest(since))
+            if out.omitted or not out.has_budget():
+                out.write_note("\n[Poznámka] Výstup byl zkrácen (dosažen rozpočet).\n")
+            cache.close()
+        save_manifest(manifest_path, root, files)
+        print(f"Hotovo. Delta výstup zapsán do: {written_path(output).resolve()}")
+        return
+
+    with text_writer(output, root) as out:
         out.write("# Unified Project Dump (scripts-focused)\n")
         out.write(f"Kořenová složka: {root.resolve()}\n")
         out.write(f"Vygenerováno: {datetime.now().isoformat(timespec='seconds')}\n")
@@ -582,16 +1722,32 @@ def main():
                 out.write(f"- {size:>10} B  {path}\n")
             out.write("\n")
 
+        cache = open_cache(output, root)
+        included = None
         if INCLUDE_SCRIPTS:
-            write_scripts_section(root, out)
+            included = write_scripts_section(root, out, cache)
 
         if INCLUDE_YAML_ASSETS and out.has_budget():
             write_yaml_assets_section(root, out)
 
-        if not out.has_budget():
-            out.write("\n[Poznámka] Výstup byl zkrácen (dosažen rozpočet).\n")
+        if WRITE_MANIFEST:
+            save_manifest(manifest_path, root,
+                          build_script_manifest(root, cache, load_manifest(manifest_path), included))
+
+        if out.omitted or not out.has_budget():
+            out.write_note("\n[Poznámka] Výstup byl zkrácen (dosažen rozpočet).\n")
+        else:
+            out.write(f"\n[Průchod] vylistováno složek: {WALK_STATS['listed_dirs']}, "
+                      f"přeskočeno vyloučených: {WALK_STATS['pruned_dirs']}\n")
+        cache.close()
+        if USE_CACHE:
+            out.write(f"[Cache] hit: {cache.hits}, miss: {cache.misses}, smazáno: {cache.evicted}\n")
 
-    print(f"Hotovo. Výstup zapsán do: {output.resolve()}")
+    print(f"Hotovo. Výstup zapsán do: {written_path(output).resolve()}")
 
 if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--since-manifest":
+        SINCE_MANIFEST = sys.argv[2]
+    elif len(sys.argv) > 1:
+        raise SystemExit("Použití: dump_scripts22.py [--since-manifest CESTA]")
     main()
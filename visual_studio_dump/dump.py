@@ -1,4 +1,14 @@
+import codecs
+import io
 import os
+import sys
+
+# sdílené moduly (dump_common/) leží v kořeni repozitáře
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common import sniff
+from dump_common.sniff import sniff_magic
 
 # ==========================================
 #              KONFIGURACE (MAKRA)
@@ -22,75 +32,151 @@ IGNORE_FILES = {OUTPUT_FILENAME, '.DS_Store'}
 # nebo např. {'.py', '.js', '.html'} pro specifické)
 ALLOWED_EXTENSIONS = set() 
 
+# Detekce textu podle prvních bajtů: podíl "textových" bajtů musí dosáhnout prahu.
+TEXT_DETECT_BYTES = 1024
+TEXT_MIN_PRINTABLE_RATIO = 0.85
+
+# Kopírování obsahu po blocích (paměť nezávisí na velikosti souboru).
+# Soubor větší než MAX_FILE_BYTES se vypíše jen jako začátek a konec (EXCERPT_BYTES každý).
+COPY_CHUNK_BYTES = 64 * 1024
+MAX_FILE_BYTES = 2 * 1024 * 1024
+EXCERPT_BYTES = 64 * 1024
+
 # ==========================================
 #              LOGIKA SKRIPTU
 # ==========================================
 
-def is_text_file(file_path):
-    """Zkusí přečíst začátek souboru, aby zjistil, zda jde o text nebo binárku."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            f.read(1024)
-            return True
-    except (UnicodeDecodeError, IOError):
-        return False
-
-def generate_tree(start_path, output_file):
-    """Zapíše vizuální stromovou strukturu do souboru."""
-    output_file.write("="*50 + "\n")
-    output_file.write(f"STRUKTURA ADRESÁŘE: {os.path.abspath(start_path)}\n")
-    output_file.write("="*50 + "\n\n")
+def is_probably_text(head):
+    # ASCII tisknutelné + bajty >= 0x80 (UTF-8); stejné pravidlo jako android_dump
+    return sniff.is_probably_text(head, TEXT_MIN_PRINTABLE_RATIO)
+
+def text_decoder(encoding):
+    # neplatné bajty -> U+FFFD: hlavička souboru už je zapsaná, obsah se nesmí utrhnout
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors="replace"),
+                                        translate=True)
+
+def iter_text_chunks(f, size):
+    """
+    Postupně dekóduje otevřený binární soubor po blocích COPY_CHUNK_BYTES
+    (konce řádků jako v textovém režimu). Soubor nad MAX_FILE_BYTES se zkrátí
+    na prvních a posledních EXCERPT_BYTES bajtů.
+    """
+    decoder = text_decoder('utf-8-sig')  # BOM u VS souborů
+    if size <= MAX_FILE_BYTES:
+        while True:
+            chunk = f.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+        return
+
+    # Příliš velký soubor: začátek, značka vynechání, konec
+    remaining = EXCERPT_BYTES
+    while remaining > 0:
+        chunk = f.read(min(COPY_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield decoder.decode(chunk)
+    yield f"\n... [VYNECHÁNO {size - 2 * EXCERPT_BYTES} B z {size} B] ...\n"
+
+    # Konec začíná uprostřed souboru: přeskočit useknutou UTF-8 sekvenci
+    f.seek(size - EXCERPT_BYTES)
+    decoder = text_decoder("utf-8")
+    chunk = f.read(COPY_CHUNK_BYTES)
+    skip = 0
+    while skip < 3 and skip < len(chunk) and 0x80 <= chunk[skip] < 0xC0:
+        skip += 1
+    chunk = chunk[skip:]
+    while chunk:
+        yield decoder.decode(chunk)
+        chunk = f.read(COPY_CHUNK_BYTES)
+    yield decoder.decode(b"", final=True)
+
+def scan_project(start_path):
+    """
+    Jediný průchod os.walk: vrátí řádky stromu a seznam souborů k výpisu
+    ve tvaru (plná cesta, relativní cesta).
+    """
+    tree_lines = []
+    files_to_dump = []
 
     for root, dirs, files in os.walk(start_path):
         # Filtrace ignorovaných složek
         dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
+
         level = root.replace(start_path, '').count(os.sep)
         indent = ' ' * 4 * (level)
-        output_file.write(f"{indent}[{os.path.basename(root)}/]\n")
+        tree_lines.append(f"{indent}[{os.path.basename(root)}/]")
         subindent = ' ' * 4 * (level + 1)
-        for f in files:
-            if f not in IGNORE_FILES:
-                output_file.write(f"{subindent}{f}\n")
-    
-    output_file.write("\n" + "="*50 + "\n\n")
-
-def dump_contents(start_path, output_file):
-    """Projiteruje soubory a vypíše jejich obsah."""
-    output_file.write("OBSAH SOUBORŮ:\n\n")
-    
-    for root, dirs, files in os.walk(start_path):
-        # Filtrace ignorovaných složek
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-
         for filename in files:
             if filename in IGNORE_FILES:
                 continue
+            tree_lines.append(f"{subindent}{filename}")
 
             # Kontrola přípony (pokud je definována)
             if ALLOWED_EXTENSIONS:
                 _, ext = os.path.splitext(filename)
                 if ext not in ALLOWED_EXTENSIONS:
                     continue
-
             file_path = os.path.join(root, filename)
-            relative_path = os.path.relpath(file_path, start_path)
+            files_to_dump.append((file_path, os.path.relpath(file_path, start_path)))
 
-            # Zápis obsahu
-            if is_text_file(file_path):
-                output_file.write("-" * 80 + "\n")
-                output_file.write(f"SOUBOR: {relative_path}\n")
-                output_file.write("-" * 80 + "\n")
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        output_file.write(content + "\n\n")
-                except Exception as e:
-                    output_file.write(f"[CHYBA PŘI ČTENÍ SOUBORU: {e}]\n\n")
-            else:
+    return tree_lines, files_to_dump
+
+def generate_tree(start_path, tree_lines, output_file):
+    """Zapíše vizuální stromovou strukturu do souboru."""
+    output_file.write("="*50 + "\n")
+    output_file.write(f"STRUKTURA ADRESÁŘE: {os.path.abspath(start_path)}\n")
+    output_file.write("="*50 + "\n\n")
+
+    for line in tree_lines:
+        output_file.write(line + "\n")
+
+    output_file.write("\n" + "="*50 + "\n\n")
+
+def dump_contents(files_to_dump, output_file):
+    """Vypíše obsah souborů; každý soubor se otevře jen jednou."""
+    output_file.write("OBSAH SOUBORŮ:\n\n")
+
+    for file_path, relative_path in files_to_dump:
+        try:
+            f = open(file_path, 'rb')
+        except OSError:
+            output_file.write(f"SOUBOR: {relative_path} (BINÁRNÍ - OBSAH VYNECHÁN)\n\n")
+            continue
+
+        with f:
+            head = f.read(TEXT_DETECT_BYTES)
+
+            # Známý binární formát podle signatury -> jen metadata
+            magic = sniff_magic(head) if head else None
+            if magic is not None:
+                output_file.write(f"SOUBOR: {relative_path} (BINÁRNÍ {magic} - OBSAH VYNECHÁN)\n\n")
+                continue
+
+            if not is_probably_text(head):
                 # Pokud je to binární soubor (obrázek, exe), jen ho zmíníme
                 output_file.write(f"SOUBOR: {relative_path} (BINÁRNÍ - OBSAH VYNECHÁN)\n\n")
+                continue
+
+            # Zápis obsahu
+            output_file.write("-" * 80 + "\n")
+            output_file.write(f"SOUBOR: {relative_path}\n")
+            output_file.write("-" * 80 + "\n")
+
+            # Stejný deskriptor: vrátit se na začátek a kopírovat po blocích
+            wrote = False
+            try:
+                f.seek(0)
+                for text in iter_text_chunks(f, os.fstat(f.fileno()).st_size):
+                    output_file.write(text)
+                    wrote = True
+                output_file.write("\n\n")
+            except Exception as e:
+                prefix = "\n" if wrote else ""
+                output_file.write(f"{prefix}[CHYBA PŘI ČTENÍ SOUBORU: {e}]\n\n")
 
 def main():
     # Absolutní cesta k výstupnímu souboru
@@ -100,11 +186,14 @@ def main():
     
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
+            # Jeden průchod složkou pro strom i seznam souborů
+            tree_lines, files_to_dump = scan_project(SOURCE_FOLDER)
+
             # 1. Krok: Vykreslení hierarchie
-            generate_tree(SOURCE_FOLDER, f)
+            generate_tree(SOURCE_FOLDER, tree_lines, f)
             
             # 2. Krok: Dump obsahu souborů
-            dump_contents(SOURCE_FOLDER, f)
+            dump_contents(files_to_dump, f)
             
         print(f"HOTOVO! Výstup byl uložen do: {output_path}")
     except Exception as e:
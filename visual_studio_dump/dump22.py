@@ -1,3 +1,5 @@
+import codecs
+import io
 import os
 
 # ==========================================
@@ -34,6 +36,12 @@ IGNORE_FILES_SUFFIX = (
     'AssemblyInfo.cs' # Často jen metadata, pokud je chcete vidět, smažte tento řádek
 )
 
+# 4. VELKÉ SOUBORY: obsah se kopíruje po blocích; soubor nad MAX_FILE_BYTES
+#    se vypíše jen jako začátek a konec (EXCERPT_BYTES každý).
+COPY_CHUNK_BYTES = 64 * 1024
+MAX_FILE_BYTES = 2 * 1024 * 1024
+EXCERPT_BYTES = 64 * 1024
+
 # ==========================================
 #              LOGIKA SKRIPTU
 # ==========================================
@@ -55,11 +63,57 @@ def should_process_file(filename):
         
     return True
 
-def generate_tree(start_path, output_file):
-    """Vykreslí strom, ale vynechá ignorované složky."""
-    output_file.write("="*60 + "\n")
-    output_file.write(f"STRUKTURA PROJEKTU (Bez bin/obj a balastu)\n")
-    output_file.write("="*60 + "\n\n")
+def text_decoder(encoding):
+    # neplatné bajty -> U+FFFD: hlavička souboru už je zapsaná, obsah se nesmí utrhnout
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors="replace"),
+                                        translate=True)
+
+def iter_text_chunks(f, size):
+    """
+    Postupně dekóduje otevřený binární soubor po blocích COPY_CHUNK_BYTES
+    (konce řádků jako v textovém režimu). Soubor nad MAX_FILE_BYTES se zkrátí
+    na prvních a posledních EXCERPT_BYTES bajtů.
+    """
+    decoder = text_decoder('utf-8-sig')
+    if size <= MAX_FILE_BYTES:
+        while True:
+            chunk = f.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+        return
+
+    # Příliš velký soubor: začátek, značka vynechání, konec
+    remaining = EXCERPT_BYTES
+    while remaining > 0:
+        chunk = f.read(min(COPY_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield decoder.decode(chunk)
+    yield f"\n... [VYNECHÁNO {size - 2 * EXCERPT_BYTES} B z {size} B] ...\n"
+
+    # Konec začíná uprostřed souboru: přeskočit useknutou UTF-8 sekvenci
+    f.seek(size - EXCERPT_BYTES)
+    decoder = text_decoder("utf-8")
+    chunk = f.read(COPY_CHUNK_BYTES)
+    skip = 0
+    while skip < 3 and skip < len(chunk) and 0x80 <= chunk[skip] < 0xC0:
+        skip += 1
+    chunk = chunk[skip:]
+    while chunk:
+        yield decoder.decode(chunk)
+        chunk = f.read(COPY_CHUNK_BYTES)
+    yield decoder.decode(b"", final=True)
+
+def scan_project(start_path):
+    """
+    Jediný průchod os.walk: vrátí řádky stromu a seznam povolených souborů
+    ve tvaru (plná cesta, relativní cesta).
+    """
+    tree_lines = []
+    files_to_dump = []
 
     for root, dirs, files in os.walk(start_path):
         # Modifikace seznamu 'dirs' in-place, aby os.walk nelezl do ignorovaných složek
@@ -67,45 +121,49 @@ def generate_tree(start_path, output_file):
         
         level = root.replace(start_path, '').count(os.sep)
         indent = ' ' * 4 * (level)
-        output_file.write(f"{indent}[{os.path.basename(root)}/]\n")
+        tree_lines.append(f"{indent}[{os.path.basename(root)}/]")
         
         subindent = ' ' * 4 * (level + 1)
         for f in files:
             if should_process_file(f):
-                output_file.write(f"{subindent}{f}\n")
+                tree_lines.append(f"{subindent}{f}")
+                file_path = os.path.join(root, f)
+                files_to_dump.append((file_path, os.path.relpath(file_path, start_path)))
+
+    return tree_lines, files_to_dump
+
+def generate_tree(tree_lines, output_file):
+    """Vykreslí strom z řádků připravených v scan_project."""
+    output_file.write("="*60 + "\n")
+    output_file.write(f"STRUKTURA PROJEKTU (Bez bin/obj a balastu)\n")
+    output_file.write("="*60 + "\n\n")
+
+    for line in tree_lines:
+        output_file.write(line + "\n")
     
     output_file.write("\n" + "="*60 + "\n\n")
 
-def dump_contents(start_path, output_file):
+def dump_contents(files_to_dump, output_file):
     """Vypíše obsah pouze povolených souborů."""
     output_file.write("OBSAH ZDROJOVÝCH KÓDŮ:\n\n")
-    
-    files_processed_count = 0
-
-    for root, dirs, files in os.walk(start_path):
-        # Důležité: Zamezí vstupu do bin/obj i v této fázi
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-
-        for filename in files:
-            if not should_process_file(filename):
-                continue
 
-            file_path = os.path.join(root, filename)
-            relative_path = os.path.relpath(file_path, start_path)
-            
-            files_processed_count += 1
-            
-            output_file.write("-" * 80 + "\n")
-            output_file.write(f"SOUBOR: {relative_path}\n")
-            output_file.write("-" * 80 + "\n")
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8-sig') as f: # utf-8-sig řeší BOM u VS souborů
-                    output_file.write(f.read() + "\n\n")
-            except Exception as e:
-                output_file.write(f"[CHYBA ČTENÍ: {e}]\n\n")
-
-    if files_processed_count == 0:
+    for file_path, relative_path in files_to_dump:
+        output_file.write("-" * 80 + "\n")
+        output_file.write(f"SOUBOR: {relative_path}\n")
+        output_file.write("-" * 80 + "\n")
+        
+        wrote = False
+        try:
+            with open(file_path, 'rb') as f:  # dekodér utf-8-sig řeší BOM u VS souborů
+                for text in iter_text_chunks(f, os.fstat(f.fileno()).st_size):
+                    output_file.write(text)
+                    wrote = True
+            output_file.write("\n\n")
+        except Exception as e:
+            prefix = "\n" if wrote else ""
+            output_file.write(f"{prefix}[CHYBA ČTENÍ: {e}]\n\n")
+
+    if not files_to_dump:
         output_file.write("Nebyly nalezeny žádné relevantní soubory (.cs, .xaml) ve zvolené složce.\n")
 
 def main():
@@ -115,8 +173,10 @@ def main():
     
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
-            generate_tree(SOURCE_FOLDER, f)
-            dump_contents(SOURCE_FOLDER, f)
+            # Jeden průchod složkou pro strom i seznam souborů
+            tree_lines, files_to_dump = scan_project(SOURCE_FOLDER)
+            generate_tree(tree_lines, f)
+            dump_contents(files_to_dump, f)
             
         print(f"HOTOVO! Vyčištěný dump uložen do: {output_path}")
     except Exception as e:
@@ -1,4 +1,16 @@
+import codecs
+import hashlib
+import io
+import json
 import os
+import sys
+from datetime import datetime
+
+# Shared modules (dump_common/) live in the repository root
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_DIR not in sys.path:
+    sys.path.insert(0, _REPO_DIR)
+from dump_common.output import check_compression, compressed_name, open_text_output
 
 # ==========================================
 #              CONFIGURATION
@@ -40,6 +52,38 @@ IGNORE_FILES_SUFFIX = (
     'AssemblyInfo.cs'
 )
 
+# 4. LARGE FILES: content is copied in chunks; a file larger than MAX_FILE_BYTES
+#    is dumped as its beginning and end only (EXCERPT_BYTES each).
+COPY_CHUNK_BYTES = 64 * 1024
+MAX_FILE_BYTES = 2 * 1024 * 1024
+EXCERPT_BYTES = 64 * 1024
+
+# 5. OUTPUT FORMAT: "txt" (readable dump) or "jsonl" (one JSON record per line:
+#    dump / dir / file / summary, written as it is produced; the .txt extension
+#    of OUTPUT_FILENAME is swapped for .jsonl)
+OUTPUT_FORMAT = "txt"
+
+# 6. COMPRESSION: None, "gzip", "xz" or "zstd" (needs the zstandard package).
+#    The dump is written compressed directly (.gz/.xz/.zst is appended), with no
+#    temporary plain file. COMPRESSION_THREADS > 1 works like pigz: blocks of
+#    COMPRESSION_BLOCK_BYTES are compressed independently on worker threads and
+#    written as separate gzip members / xz streams (plain gunzip and xz -d read
+#    them); zstd uses the library's own threads. 0 = number of CPU cores.
+OUTPUT_COMPRESSION = None
+COMPRESSION_LEVEL = None  # None = codec default
+COMPRESSION_THREADS = 0
+COMPRESSION_BLOCK_BYTES = 1024 * 1024
+
+# 7. DEDUPLICATION: files with identical content (same SHA-256) are dumped once;
+#    later copies become a one-line reference to the first path. Only files up
+#    to MAX_FILE_BYTES are compared; a file is hashed while it streams to the
+#    output, and read twice only when its size matches an earlier file's.
+#    Files below DEDUP_MIN_BYTES are always dumped in full. At most
+#    DEDUP_MAX_FILES digests are kept, so memory stays bounded.
+DEDUP_CONTENTS = True
+DEDUP_MIN_BYTES = 128
+DEDUP_MAX_FILES = 20_000
+
 # ==========================================
 #              SCRIPT LOGIC
 # ==========================================
@@ -61,62 +105,221 @@ def should_process_file(filename):
         
     return True
 
-def generate_tree(start_path, output_file):
-    """Writes the directory tree, skipping ignored folders."""
-    output_file.write("="*60 + "\n")
-    output_file.write(f"PROJECT STRUCTURE (Excluding bin/obj and artifacts)\n")
-    output_file.write("="*60 + "\n\n")
+def text_decoder(encoding):
+    # invalid bytes -> U+FFFD: the file header is already written, never stop mid-file
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors="replace"),
+                                        translate=True)
+
+def iter_text_chunks(f, size):
+    """
+    Incrementally decodes an open binary file in COPY_CHUNK_BYTES chunks
+    (newlines translated as in text mode). A file above MAX_FILE_BYTES is cut
+    down to its first and last EXCERPT_BYTES bytes.
+    """
+    decoder = text_decoder('utf-8-sig')
+    if size <= MAX_FILE_BYTES:
+        while True:
+            chunk = f.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+        return
+
+    # Oversized file: head, omission marker, tail
+    remaining = EXCERPT_BYTES
+    while remaining > 0:
+        chunk = f.read(min(COPY_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield decoder.decode(chunk)
+    yield f"\n... [OMITTED {size - 2 * EXCERPT_BYTES} B of {size} B] ...\n"
+
+    # The tail starts mid-file: skip a cut UTF-8 sequence
+    f.seek(size - EXCERPT_BYTES)
+    decoder = text_decoder("utf-8")
+    chunk = f.read(COPY_CHUNK_BYTES)
+    skip = 0
+    while skip < 3 and skip < len(chunk) and 0x80 <= chunk[skip] < 0xC0:
+        skip += 1
+    chunk = chunk[skip:]
+    while chunk:
+        yield decoder.decode(chunk)
+        chunk = f.read(COPY_CHUNK_BYTES)
+    yield decoder.decode(b"", final=True)
+
+class HashingReader:
+    """Binary file wrapper that feeds every byte read through it into SHA-256."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def read(self, n=-1):
+        chunk = self.f.read(n)
+        self.sha.update(chunk)
+        return chunk
+
+class ContentDedup:
+    """
+    Finds files whose content was already dumped. Only whole files of
+    min_bytes..MAX_FILE_BYTES are compared. Identical files have identical
+    sizes, so a file is hashed up front (one extra read) only when an earlier
+    file had the same size; otherwise it is hashed while it is written out
+    and remembered afterwards. After max_files digests new files are no longer
+    remembered (earlier ones still match).
+    """
+
+    def __init__(self, min_bytes, max_files):
+        self.min_bytes = min_bytes
+        self.max_files = max_files
+        self.first = {}  # SHA-256 -> label of the first file
+        self.sizes = set()  # sizes of the remembered files
+
+    def wants(self, size):
+        return self.min_bytes <= size <= MAX_FILE_BYTES
+
+    def earlier_copy(self, f, size):
+        """Label of an earlier file with the same content as f, or None; f is rewound."""
+        if size not in self.sizes:
+            return None
+        sha = hashlib.sha256()
+        for chunk in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+            sha.update(chunk)
+        f.seek(0)
+        return self.first.get(sha.digest())
+
+    def remember(self, reader, size, label):
+        """Stores the digest of a file that was read to the end through reader."""
+        digest = reader.sha.digest()
+        if digest not in self.first and len(self.first) < self.max_files:
+            self.first[digest] = label
+            self.sizes.add(size)
+
+def new_dedup():
+    return ContentDedup(DEDUP_MIN_BYTES, DEDUP_MAX_FILES) if DEDUP_CONTENTS else None
+
+def scan_project(start_path):
+    """
+    Single os.walk pass: returns the tree lines, the list of allowed files
+    as (full path, relative path) pairs and the visited directories.
+    """
+    tree_lines = []
+    files_to_dump = []
+    dirs_seen = []
 
     for root, dirs, files in os.walk(start_path):
         # Modify 'dirs' in-place so os.walk doesn't enter ignored directories
         dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        dirs_seen.append(os.path.relpath(root, start_path))
         
         level = root.replace(start_path, '').count(os.sep)
         indent = ' ' * 4 * (level)
-        output_file.write(f"{indent}[{os.path.basename(root)}/]\n")
+        tree_lines.append(f"{indent}[{os.path.basename(root)}/]")
         
         subindent = ' ' * 4 * (level + 1)
         for f in files:
             if should_process_file(f):
-                output_file.write(f"{subindent}{f}\n")
+                tree_lines.append(f"{subindent}{f}")
+                file_path = os.path.join(root, f)
+                files_to_dump.append((file_path, os.path.relpath(file_path, start_path)))
+
+    return tree_lines, files_to_dump, dirs_seen
+
+def generate_tree(tree_lines, output_file):
+    """Writes the directory tree collected by scan_project."""
+    output_file.write("="*60 + "\n")
+    output_file.write(f"PROJECT STRUCTURE (Excluding bin/obj and artifacts)\n")
+    output_file.write("="*60 + "\n\n")
+
+    for line in tree_lines:
+        output_file.write(line + "\n")
     
     output_file.write("\n" + "="*60 + "\n\n")
 
-def dump_contents(start_path, output_file):
+def dump_contents(files_to_dump, output_file):
     """Dumps the content of allowed files only."""
     output_file.write("SOURCE CODE CONTENTS:\n\n")
-    
-    files_processed_count = 0
+    dedup = new_dedup()
 
-    for root, dirs, files in os.walk(start_path):
-        # Prevent entering ignored directories
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-
-        for filename in files:
-            if not should_process_file(filename):
-                continue
+    for file_path, relative_path in files_to_dump:
+        output_file.write("-" * 80 + "\n")
+        output_file.write(f"FILE: {relative_path}\n")
+        output_file.write("-" * 80 + "\n")
+        
+        wrote = False
+        try:
+            # The utf-8-sig decoder handles the BOM often found in Visual Studio files
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                src = f
+                if dedup and dedup.wants(size):
+                    original = dedup.earlier_copy(f, size)
+                    if original:
+                        output_file.write(f"[DUPLICATE of {original}]\n\n")
+                        continue
+                    src = HashingReader(f)
+                for text in iter_text_chunks(src, size):
+                    output_file.write(text)
+                    wrote = True
+                if src is not f:
+                    dedup.remember(src, size, relative_path)
+            output_file.write("\n\n")
+        except Exception as e:
+            prefix = "\n" if wrote else ""
+            output_file.write(f"{prefix}[READ ERROR: {e}]\n\n")
 
-            file_path = os.path.join(root, filename)
-            # Relative path is calculated from SOURCE_FOLDER for readability
-            relative_path = os.path.relpath(file_path, start_path)
-            
-            files_processed_count += 1
-            
-            output_file.write("-" * 80 + "\n")
-            output_file.write(f"FILE: {relative_path}\n")
-            output_file.write("-" * 80 + "\n")
-            
-            try:
-                # utf-8-sig handles the BOM often found in Visual Studio files
-                with open(file_path, 'r', encoding='utf-8-sig') as f:
-                    output_file.write(f.read() + "\n\n")
-            except Exception as e:
-                output_file.write(f"[READ ERROR: {e}]\n\n")
-
-    if files_processed_count == 0:
+    if not files_to_dump:
         output_file.write("No relevant files (.cs, .xaml) found in the selected folder.\n")
 
+def dump_jsonl(start_path, files_to_dump, dirs_seen, output_file):
+    """Same content as generate_tree + dump_contents, as one JSON record per line."""
+    def emit(record):
+        output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    emit({"type": "dump", "tool": "visual_studio_dump/dump33", "root": os.path.abspath(start_path),
+          "generated": datetime.now().isoformat(timespec="seconds")})
+    for rel_dir in dirs_seen:
+        emit({"type": "dir", "path": rel_dir.replace(os.sep, "/")})
+
+    dedup = new_dedup()
+    for file_path, relative_path in files_to_dump:
+        record = {"type": "file", "path": relative_path.replace(os.sep, "/")}
+        parts = []
+        try:
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                record["size"] = size
+                src = f
+                if dedup and dedup.wants(size):
+                    original = dedup.earlier_copy(f, size)
+                    if original:
+                        record["duplicate_of"] = original
+                        emit(record)
+                        continue
+                    src = HashingReader(f)
+                record["truncated"] = size > MAX_FILE_BYTES
+                # Bounded by MAX_FILE_BYTES (or two excerpts), so joining is safe
+                for text in iter_text_chunks(src, size):
+                    parts.append(text)
+                if src is not f:
+                    dedup.remember(src, size, record["path"])
+            record["content"] = "".join(parts)
+        except Exception as e:
+            record["error"] = str(e)
+        emit(record)
+
+    emit({"type": "summary", "dirs": len(dirs_seen), "files": len(files_to_dump)})
+
+def open_output(path):
+    """Text stream writing to path, compressed according to OUTPUT_COMPRESSION."""
+    return open_text_output(path, OUTPUT_COMPRESSION, COMPRESSION_LEVEL, COMPRESSION_THREADS,
+                            COMPRESSION_BLOCK_BYTES, COPY_CHUNK_BYTES)
+
 def main():
+    check_compression(OUTPUT_COMPRESSION)
+
     # Determine the final output directory
     final_output_dir = OUTPUT_FOLDER if OUTPUT_FOLDER else SOURCE_FOLDER
 
@@ -130,15 +333,26 @@ def main():
             return
 
     output_path = os.path.join(final_output_dir, OUTPUT_FILENAME)
+    if OUTPUT_FORMAT == "jsonl":
+        output_path = os.path.splitext(output_path)[0] + ".jsonl"
+    elif OUTPUT_FORMAT != "txt":
+        print(f"Critical Error: unknown OUTPUT_FORMAT {OUTPUT_FORMAT!r} (txt or jsonl).")
+        return
+    output_path = compressed_name(output_path, OUTPUT_COMPRESSION)
 
     print(f"Scanning folder: {os.path.abspath(SOURCE_FOLDER)}")
     print(f"Ignoring folders: {', '.join(IGNORE_DIRS)}")
     print(f"Target file: {output_path}")
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            generate_tree(SOURCE_FOLDER, f)
-            dump_contents(SOURCE_FOLDER, f)
+        with open_output(output_path) as f:
+            # One directory walk for both the tree and the file list
+            tree_lines, files_to_dump, dirs_seen = scan_project(SOURCE_FOLDER)
+            if OUTPUT_FORMAT == "jsonl":
+                dump_jsonl(SOURCE_FOLDER, files_to_dump, dirs_seen, f)
+            else:
+                generate_tree(tree_lines, f)
+                dump_contents(files_to_dump, f)
             
         print(f"DONE! Clean dump saved successfully.")
     except Exception as e: